@@ -0,0 +1,37 @@
+"""add lookup indexes
+
+Revision ID: 3c1f8e2a7b90
+Revises: 59aefb6db558
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c1f8e2a7b90'
+down_revision: Union[str, None] = '59aefb6db558'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Student-side lookups: composite keys lead with class_id / session_id,
+    # so "everything for one student" scans without these
+    op.execute("CREATE INDEX IF NOT EXISTS ix_class_students_student_id ON class_students (student_id);")
+    op.execute("CREATE INDEX IF NOT EXISTS ix_attendance_student_id ON attendance (student_id);")
+    op.execute("CREATE INDEX IF NOT EXISTS ix_notifications_student_created ON notifications (student_id, created_at);")
+
+    # Signed-in students are resolved by either email column
+    op.execute("CREATE INDEX IF NOT EXISTS ix_students_email ON students (email);")
+    op.execute("CREATE INDEX IF NOT EXISTS ix_students_dtu_email ON students (dtu_email);")
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_students_dtu_email;")
+    op.execute("DROP INDEX IF EXISTS ix_students_email;")
+    op.execute("DROP INDEX IF EXISTS ix_notifications_student_created;")
+    op.execute("DROP INDEX IF EXISTS ix_attendance_student_id;")
+    op.execute("DROP INDEX IF EXISTS ix_class_students_student_id;")
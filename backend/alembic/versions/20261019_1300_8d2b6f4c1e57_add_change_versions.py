@@ -0,0 +1,34 @@
+"""add change versions
+
+Revision ID: 8d2b6f4c1e57
+Revises: 3c1f8e2a7b90
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d2b6f4c1e57'
+down_revision: Union[str, None] = '3c1f8e2a7b90'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Per-class / per-student counters behind the ETags of read endpoints
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS change_versions (
+            scope text NOT NULL,
+            key text NOT NULL,
+            version bigint NOT NULL DEFAULT 1,
+            updated_at timestamptz NOT NULL DEFAULT now(),
+            PRIMARY KEY (scope, key)
+        );
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE IF EXISTS change_versions;")
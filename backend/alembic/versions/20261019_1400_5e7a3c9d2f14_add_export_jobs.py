@@ -0,0 +1,40 @@
+"""add export jobs
+
+Revision ID: 5e7a3c9d2f14
+Revises: 8d2b6f4c1e57
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e7a3c9d2f14'
+down_revision: Union[str, None] = '8d2b6f4c1e57'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Background exports written to blob storage (GET /exports/attendance)
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS export_jobs (
+            job_id uuid PRIMARY KEY,
+            kind varchar(50) NOT NULL,
+            format varchar(20) NOT NULL,
+            filters jsonb NOT NULL DEFAULT '{}'::jsonb,
+            status varchar(20) NOT NULL DEFAULT 'pending',
+            requested_by_user_id integer REFERENCES users(user_id) ON DELETE SET NULL,
+            row_count bigint,
+            blob_name text,
+            error text,
+            created_at timestamptz NOT NULL DEFAULT now(),
+            finished_at timestamptz
+        );
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE IF EXISTS export_jobs;")
@@ -0,0 +1,46 @@
+"""split notification recipients
+
+Revision ID: b4f1d8e6a3c2
+Revises: 5e7a3c9d2f14
+Create Date: 2026-10-19 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b4f1d8e6a3c2'
+down_revision: Union[str, None] = '5e7a3c9d2f14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Shared messages (student_id IS NULL, audience set) say who receives
+    # them. No FK on audience_class_id: a deleted class's broadcast simply reaches nobody.
+    op.execute("ALTER TABLE notifications ADD COLUMN IF NOT EXISTS audience text;")
+    op.execute("ALTER TABLE notifications ADD COLUMN IF NOT EXISTS audience_class_id uuid;")
+    op.execute("""
+        CREATE INDEX IF NOT EXISTS ix_notifications_audience
+        ON notifications (audience, audience_class_id);
+    """)
+
+    # Recipient lists and sparse read markers for shared messages
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS notification_receipts (
+            notification_id integer NOT NULL REFERENCES notifications(notification_id) ON DELETE CASCADE,
+            student_id integer NOT NULL REFERENCES students(student_id) ON DELETE CASCADE,
+            read_at timestamptz,
+            PRIMARY KEY (notification_id, student_id)
+        );
+    """)
+    op.execute("CREATE INDEX IF NOT EXISTS ix_notification_receipts_student_id ON notification_receipts (student_id);")
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE IF EXISTS notification_receipts;")
+    op.execute("DROP INDEX IF EXISTS ix_notifications_audience;")
+    op.execute("ALTER TABLE notifications DROP COLUMN IF EXISTS audience_class_id;")
+    op.execute("ALTER TABLE notifications DROP COLUMN IF EXISTS audience;")
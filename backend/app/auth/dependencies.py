@@ -15,6 +15,7 @@ from app.auth.jwt import verify_jwt, JWTError as JWTVerificationError
 
 # HTTP Bearer token security scheme
 security = HTTPBearer()
+optional_security = HTTPBearer(auto_error=False)
 
 
 class UserContext:
@@ -75,7 +76,7 @@ async def get_current_user(
         )
     
     # Load user from database to ensure they still exist
-    user = db.query(User).filter(User.id == user_id).first()
+    user = db.query(User).filter(User.uuid == user_id).first()
     
     if not user:
         raise HTTPException(
@@ -87,6 +88,29 @@ async def get_current_user(
     return UserContext(user_id=user_id, email=email, role=role, user=user)
 
 
+async def get_optional_user(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security),
+    db: Session = Depends(get_db)
+) -> Optional[UserContext]:
+    """
+    FastAPI dependency for endpoints that work anonymously but can use auth.
+    
+    Args:
+        credentials: Optional HTTP Bearer token from Authorization header
+        db: Database session
+        
+    Returns:
+        UserContext if a token was sent, otherwise None
+        
+    Raises:
+        HTTPException: If a token was sent but is invalid
+    """
+    if credentials is None:
+        return None
+    
+    return await get_current_user(credentials, db)
+
+
 async def require_admin(
     current_user: UserContext = Depends(get_current_user)
 ) -> UserContext:
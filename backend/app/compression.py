@@ -0,0 +1,168 @@
+"""
+Response compression.
+
+Brotli or gzip (whichever the client prefers, brotli on a tie) for complete
+responses of an allowlisted content type and at least
+settings.compression_min_bytes. Streaming responses (SSE, NDJSON progress)
+pass through untouched so each chunk still reaches the client immediately.
+Bodies of settings.compression_thread_min_bytes or more are compressed in
+the threadpool instead of on the event loop.
+"""
+import gzip
+from typing import Dict, List, Optional
+
+import anyio
+import brotli
+
+from app.config import settings
+
+
+def _compress_br(body: bytes) -> bytes:
+    return brotli.compress(body, quality=settings.compression_brotli_quality)
+
+
+def _compress_gzip(body: bytes) -> bytes:
+    return gzip.compress(body, compresslevel=settings.compression_gzip_level, mtime=0)
+
+
+COMPRESSORS = {"br": _compress_br, "gzip": _compress_gzip}
+
+
+def accepted_encodings(header: str) -> Dict[str, float]:
+    """Parse Accept-Encoding into {coding: q}."""
+    weights: Dict[str, float] = {}
+    for part in header.split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[coding] = q
+    return weights
+
+
+def choose_encoding(header: str) -> Optional[str]:
+    """Best coding we support with q > 0, or None for identity."""
+    weights = accepted_encodings(header)
+    wildcard = weights.get("*", 0.0)
+    best, best_q = None, 0.0
+    for coding in COMPRESSORS:
+        q = weights.get(coding, wildcard)
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+def _content_type(headers: List) -> str:
+    return next(
+        (value for name, value in headers if name.lower() == b"content-type"), b""
+    ).decode("latin-1").split(";")[0].strip().lower()
+
+
+def with_vary_accept_encoding(headers: List) -> List:
+    """Headers with Accept-Encoding merged into Vary (added if there is none)."""
+    merged, found = [], False
+    for name, value in headers:
+        if name.lower() == b"vary":
+            found = True
+            tokens = {token.strip().lower() for token in value.split(b",")}
+            if b"*" not in tokens and b"accept-encoding" not in tokens:
+                value = value + b", Accept-Encoding"
+        merged.append((name, value))
+    if not found:
+        merged.append((b"vary", b"Accept-Encoding"))
+    return merged
+
+
+class CompressionMiddleware:
+    """Pure ASGI middleware compressing complete, allowlisted responses."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope["headers"])
+        encoding = choose_encoding(headers.get(b"accept-encoding", b"").decode("latin-1"))
+        if encoding is None:
+            # Not compressed for this client, but the representation still
+            # depends on Accept-Encoding, so caches must know
+            async def send_identity(message):
+                if message["type"] == "http.response.start":
+                    response_headers = list(message.get("headers", []))
+                    if _content_type(response_headers) in settings.compression_content_types:
+                        message = {**message, "headers": with_vary_accept_encoding(response_headers)}
+                await send(message)
+
+            await self.app(scope, receive, send_identity)
+            return
+
+        start: Optional[dict] = None
+        passthrough = False
+
+        async def send_compressed(message):
+            nonlocal start, passthrough
+            if passthrough:
+                await send(message)
+                return
+
+            if message["type"] == "http.response.start":
+                start = message
+                return
+
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            response_headers: List = list(start.get("headers", []))
+            names = {name.lower() for name, _ in response_headers}
+            compressible = _content_type(response_headers) in settings.compression_content_types
+
+            if compressible:
+                response_headers = with_vary_accept_encoding(response_headers)
+
+            if (
+                not compressible
+                or message.get("more_body", False)  # streaming: leave chunks alone
+                or b"content-encoding" in names
+                or len(body) < settings.compression_min_bytes
+            ):
+                passthrough = True
+                await send({**start, "headers": response_headers})
+                await send(message)
+                return
+
+            compress = COMPRESSORS[encoding]
+            if len(body) >= settings.compression_thread_min_bytes:
+                body = await anyio.to_thread.run_sync(compress, body)
+            else:
+                body = compress(body)
+
+            rewritten = []
+            for name, value in response_headers:
+                lowered = name.lower()
+                if lowered == b"content-length":
+                    continue
+                # A compressed body is a different representation
+                if lowered == b"etag" and not value.startswith(b"W/"):
+                    value = b"W/" + value
+                rewritten.append((name, value))
+            rewritten += [
+                (b"content-encoding", encoding.encode("latin-1")),
+                (b"content-length", str(len(body)).encode("latin-1")),
+            ]
+            passthrough = True
+            await send({**start, "headers": rewritten})
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_compressed)
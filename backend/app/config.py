@@ -35,9 +35,62 @@ class Settings(BaseSettings):
     azure_storage_connection_string: Optional[str] = None
     azure_storage_account_name: str = "aimsattendanceapp"
     
+    # Request instrumentation
+    request_log_enabled: bool = True
+    server_timing_enabled: bool = True
+    slow_query_ms: float = 200.0
+    slow_query_sample_rate: float = 1.0
+    metrics_enabled: bool = True
+    loop_watchdog_enabled: bool = True
+    loop_lag_interval_ms: float = 100.0
+    loop_block_threshold_ms: float = 250.0
+    
+    # Profiling (admin endpoints under /admin/profiling)
+    profile_max_seconds: float = 60.0
+    profile_routes: list[str] = []
+    profile_route_sample_rate: float = 0.01
+    profile_route_keep: int = 20
+    
+    # Response compression
+    compression_enabled: bool = True
+    compression_min_bytes: int = 1024
+    compression_thread_min_bytes: int = 256 * 1024
+    compression_gzip_level: int = 6
+    compression_brotli_quality: int = 4
+    compression_content_types: list[str] = [
+        "application/json",
+        "text/csv",
+        "text/plain",
+        "text/html",
+    ]
+    
+    # Bulk exports (GET /exports/attendance)
+    export_batch_rows: int = 10000
+    export_stream_max_rows: int = 500000
+    export_spool_max_bytes: int = 64 * 1024 * 1024
+    export_link_hours: int = 1
+    
+    # Roster uploads
+    roster_upload_batch_size: int = 500
+    roster_upload_max_bytes: int = 50 * 1024 * 1024
+    
     # Face Recognition Service
     face_api_service_url: Optional[str] = None
     
+    # BT Check-in Sidecar
+    bt_sidecar_url: Optional[str] = None
+    bt_sidecar_api_key: Optional[str] = None
+    bt_sidecar_timeout_seconds: float = 5.0
+    
+    # OnDemand.io AI agents
+    ondemand_api_key: Optional[str] = None
+    ondemand_url: str = "https://api.on-demand.io/chat/v1/sessions/query"
+    ondemand_timeout_seconds: float = 30.0
+    ondemand_max_concurrency: int = 4
+    ondemand_cache_ttl_seconds: int = 300
+    ondemand_cache_max_entries: int = 256
+    ondemand_context_token_budget: int = 1500
+    
     model_config = SettingsConfigDict(
         env_file=".env",
         env_file_encoding="utf-8",
@@ -0,0 +1,187 @@
+"""
+Per-request SQL instrumentation.
+
+SQLAlchemy cursor events attribute every statement (count, time, rows) to
+the request that issued it, through a context variable set by
+RequestStatsMiddleware. The totals go out as a Server-Timing header and a
+structured log line per request; statements slower than
+settings.slow_query_ms are logged, sampled, with normalized SQL and the
+shape (never the values) of their bound parameters.
+"""
+import json
+import logging
+import random
+import re
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.config import settings
+
+
+logger = logging.getLogger("app.requests")
+slow_query_logger = logging.getLogger("app.slow_queries")
+
+
+@dataclass
+class RequestStats:
+    """SQL totals for one request."""
+    statements: int = 0
+    db_seconds: float = 0.0
+    rows: int = 0
+
+
+# Set for the duration of a request. Threadpool work (sync dependencies,
+# streaming generators) runs in a copy of the context, which still points
+# at the same RequestStats object, so their statements are counted too.
+_current_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def current_request_stats() -> Optional[RequestStats]:
+    """SQL totals of the request being handled, if any."""
+    return _current_stats.get()
+
+
+def route_template(scope: dict) -> str:
+    """The matched route's path template (/classes/{class_id}), or the raw path when unmatched."""
+    route = scope.get("route")
+    return getattr(route, "path", None) or scope.get("path", "")
+
+
+# ----- SQL normalization -----
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_sql(statement: str) -> str:
+    """Collapse whitespace and replace inline literals with ?, so equal queries log alike."""
+    statement = _STRING_LITERAL.sub("?", statement)
+    statement = _NUMBER_LITERAL.sub("?", statement)
+    return _WHITESPACE.sub(" ", statement).strip()
+
+
+def _value_shape(value: Any) -> str:
+    if isinstance(value, (list, tuple)):
+        return f"{type(value).__name__}[{len(value)}]"
+    if isinstance(value, (str, bytes)):
+        return f"{type(value).__name__}({len(value)})"
+    return type(value).__name__
+
+
+def parameter_shape(parameters: Any, executemany: bool) -> Any:
+    """Types and sizes of bound parameters; values are never logged."""
+    if executemany:
+        rows = list(parameters or [])
+        return {"rows": len(rows), "each": parameter_shape(rows[0], False) if rows else None}
+    if isinstance(parameters, dict):
+        return {name: _value_shape(value) for name, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [_value_shape(value) for value in parameters]
+    return None
+
+
+# ----- SQLAlchemy hooks -----
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["query_started"].pop()
+    elapsed = time.perf_counter() - started
+
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.statements += 1
+        stats.db_seconds += elapsed
+        # rowcount is rows returned for SELECTs, rows affected otherwise
+        if cursor.rowcount > 0:
+            stats.rows += cursor.rowcount
+
+    elapsed_ms = elapsed * 1000
+    if elapsed_ms >= settings.slow_query_ms and random.random() < settings.slow_query_sample_rate:
+        slow_query_logger.warning(json.dumps({
+            "event": "slow_query",
+            "duration_ms": round(elapsed_ms, 2),
+            "rows": cursor.rowcount,
+            "sql": normalize_sql(statement),
+            "params": parameter_shape(parameters, executemany),
+        }, default=str))
+
+
+def _handle_error(exception_context):
+    # A failed statement never reaches after_cursor_execute
+    connection = exception_context.connection
+    if connection is not None and connection.info.get("query_started"):
+        connection.info["query_started"].pop()
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Attach the timing hooks to an engine (idempotent)."""
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(engine, "handle_error", _handle_error)
+
+
+# ----- ASGI middleware -----
+
+class RequestStatsMiddleware:
+    """
+    Pure ASGI middleware (no body buffering, safe for streaming responses).
+
+    Adds `Server-Timing: db;dur=..;desc="N queries", app;dur=..` to each
+    HTTP response and logs one JSON line per request with the route
+    template, status, duration and SQL totals. Statements issued after the
+    headers are sent (streaming bodies) still count towards the log line.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _current_stats.set(stats)
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_with_timing(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if settings.server_timing_enabled:
+                    elapsed_ms = (time.perf_counter() - started) * 1000
+                    timing = (
+                        f'db;dur={stats.db_seconds * 1000:.1f};desc="{stats.statements} queries", '
+                        f"app;dur={elapsed_ms:.1f}"
+                    )
+                    message["headers"] = list(message.get("headers", [])) + [
+                        (b"server-timing", timing.encode("latin-1"))
+                    ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current_stats.reset(token)
+            if settings.request_log_enabled:
+                logger.info(json.dumps({
+                    "event": "request",
+                    "method": scope["method"],
+                    "route": route_template(scope),
+                    "status": status_code,
+                    "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+                    "db_statements": stats.statements,
+                    "db_ms": round(stats.db_seconds * 1000, 2),
+                    "db_rows": stats.rows,
+                }))
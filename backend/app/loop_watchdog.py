@@ -0,0 +1,146 @@
+"""
+Event loop lag monitoring and blocking-call detection.
+
+A coroutine wakes up every settings.loop_lag_interval_ms and records how
+late it ran (event_loop_lag_seconds). Each wake-up is also a heartbeat for a
+watchdog thread: when the heartbeat is older than
+settings.loop_block_threshold_ms, the loop is stuck in sync code right now,
+so the thread logs the loop thread's current stack and the route of the
+request whose task is running, once per stall, on the "app.event_loop"
+logger.
+"""
+import asyncio
+import json
+import logging
+import sys
+import threading
+import time
+import traceback
+from typing import Dict, Optional
+
+from app.config import settings
+from app.instrumentation import route_template
+from app.metrics import EVENT_LOOP_BLOCKS, EVENT_LOOP_LAG, UNMATCHED_ROUTE
+
+
+logger = logging.getLogger("app.event_loop")
+
+STACK_LIMIT = 40
+
+# Request scope per asyncio task, so the watchdog thread can name the route
+# that is blocking the loop. Written only on the loop thread.
+_request_scopes: Dict[asyncio.Task, dict] = {}
+
+
+class RequestTaskMiddleware:
+    """Pure ASGI middleware remembering which task is serving which request."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        task = asyncio.current_task()
+        if scope["type"] != "http" or task is None:
+            await self.app(scope, receive, send)
+            return
+
+        _request_scopes[task] = scope
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _request_scopes.pop(task, None)
+
+
+class LoopWatchdog:
+    """Lag sampler task plus the thread that catches the loop while it is blocked."""
+
+    def __init__(self, interval: float, threshold: float):
+        self.interval = interval
+        self.threshold = threshold
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._heartbeat = time.monotonic()
+        self._task: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+
+    def start(self) -> None:
+        """Start monitoring the running loop (call from a coroutine on it)."""
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._stopped.clear()
+        self._task = self._loop.create_task(self._tick())
+        self._thread = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._thread.start()
+
+    async def stop(self) -> None:
+        self._stopped.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        if self._thread is not None:
+            await asyncio.to_thread(self._thread.join)
+
+    async def _tick(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            EVENT_LOOP_LAG.observe(max(0.0, loop.time() - expected))
+            self._heartbeat = time.monotonic()
+
+    def _watch(self) -> None:
+        reported_heartbeat = None
+        while not self._stopped.wait(self.threshold / 2):
+            heartbeat = self._heartbeat
+            # The tick itself sleeps for one interval between heartbeats
+            blocked = time.monotonic() - heartbeat - self.interval
+            if blocked < self.threshold or heartbeat == reported_heartbeat:
+                continue
+            reported_heartbeat = heartbeat
+            self._report(blocked)
+
+    def _report(self, blocked: float) -> None:
+        frame = sys._current_frames().get(self._loop_thread_id)
+        stack = traceback.format_list(traceback.extract_stack(frame, limit=STACK_LIMIT)) if frame else []
+
+        task = asyncio.current_task(self._loop)
+        scope = _request_scopes.get(task) if task is not None else None
+        route = route_template(scope) if scope is not None and scope.get("route") is not None else UNMATCHED_ROUTE
+        EVENT_LOOP_BLOCKS.labels(route).inc()
+
+        logger.warning(json.dumps({
+            "event": "event_loop_blocked",
+            "blocked_ms": round(blocked * 1000, 1),
+            "method": scope.get("method") if scope else None,
+            "route": route,
+            "path": scope.get("path") if scope else None,
+            "task": task.get_name() if task is not None else None,
+            "stack": [line.rstrip() for line in stack],
+        }))
+
+
+_watchdog: Optional[LoopWatchdog] = None
+
+
+def start_loop_watchdog() -> None:
+    """Start the watchdog for this worker's loop, if enabled."""
+    global _watchdog
+    if not settings.loop_watchdog_enabled or _watchdog is not None:
+        return
+    _watchdog = LoopWatchdog(
+        interval=settings.loop_lag_interval_ms / 1000,
+        threshold=settings.loop_block_threshold_ms / 1000,
+    )
+    _watchdog.start()
+
+
+async def stop_loop_watchdog() -> None:
+    global _watchdog
+    if _watchdog is not None:
+        await _watchdog.stop()
+        _watchdog = None
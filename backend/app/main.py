@@ -3,12 +3,19 @@ AIMS Attendance Backend - Main FastAPI Application
 """
 from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse
 from contextlib import asynccontextmanager
 import logging
 
+from app.compression import CompressionMiddleware
 from app.config import settings
 from app.db import engine, Base
+from app.instrumentation import RequestStatsMiddleware, instrument_engine
+from app.loop_watchdog import RequestTaskMiddleware, start_loop_watchdog, stop_loop_watchdog
+from app.metrics import MetricsMiddleware, instrument_pool, metrics_response
+from app.profiling import RouteProfilerMiddleware
+from app.services.bt_sidecar import close_sidecar_client
+from app.services.ondemand_client import close_ondemand_client
 from app.routes import (
     auth_routes,
     user_routes,
@@ -21,6 +28,8 @@ from app.routes import (
     notification_routes,
     leaderboard_routes,
     ondemand_routes,
+    profiling_routes,
+    export_routes,
 )
 
 # Configure logging
@@ -40,10 +49,15 @@ async def lifespan(app: FastAPI):
     # Create tables (for development; in production use Alembic migrations)
     # Base.metadata.create_all(bind=engine)
     
+    start_loop_watchdog()
+    
     yield
     
     # Shutdown
     logger.info("Shutting down AIMS Attendance Backend...")
+    await stop_loop_watchdog()
+    await close_sidecar_client()
+    await close_ondemand_client()
 
 
 # Create FastAPI app
@@ -53,9 +67,30 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/docs",
     redoc_url="/redoc",
+    default_response_class=ORJSONResponse,
     lifespan=lifespan
 )
 
+# Per-request SQL totals: Server-Timing header, request and slow-query logs
+instrument_engine(engine)
+app.add_middleware(RequestStatsMiddleware)
+
+# Prometheus metrics (GET /metrics)
+if settings.metrics_enabled:
+    instrument_pool(engine)
+    app.add_middleware(MetricsMiddleware)
+    app.add_route("/metrics", metrics_response, include_in_schema=False)
+
+# Event loop lag histogram; logs the stack and route of loop-blocking calls
+app.add_middleware(RequestTaskMiddleware)
+
+# Opt-in cProfile capture for PROFILE_ROUTES (see /admin/profiling)
+app.add_middleware(RouteProfilerMiddleware)
+
+# gzip/brotli for large, complete JSON/text responses
+if settings.compression_enabled:
+    app.add_middleware(CompressionMiddleware)
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -63,6 +98,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 
@@ -101,6 +137,8 @@ app.include_router(student_routes.router)
 app.include_router(notification_routes.router)
 app.include_router(leaderboard_routes.router)
 app.include_router(ondemand_routes.router)
+app.include_router(profiling_routes.router)
+app.include_router(export_routes.router)
 app.include_router(notification_routes.router)
 app.include_router(leaderboard_routes.router)
 
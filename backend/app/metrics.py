@@ -0,0 +1,257 @@
+"""
+Prometheus metrics.
+
+Exposed at GET /metrics in the text exposition format. Under gunicorn (or
+any multi-worker server) set PROMETHEUS_MULTIPROC_DIR to an empty,
+writable directory shared by the workers: every worker then writes its
+samples there and /metrics aggregates all of them, whichever worker
+serves the scrape (see gunicorn.conf.py for the worker-exit cleanup).
+
+Recording is a dict lookup and a lock-free add per sample, so the request
+middleware stays cheap on the hot path.
+"""
+import asyncio
+import functools
+import os
+import time
+from contextlib import contextmanager
+from typing import Any, BinaryIO, Callable, Union
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.requests import Request
+from starlette.responses import Response
+
+from app.instrumentation import route_template
+
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ["method", "route", "status"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+HTTP_REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress",
+    "HTTP requests currently being handled",
+    multiprocess_mode="livesum",
+)
+
+DB_POOL_SIZE = Gauge(
+    "db_pool_size",
+    "Configured connections per pool (summed over workers)",
+    multiprocess_mode="livesum",
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out",
+    "Pooled connections currently checked out",
+    multiprocess_mode="livesum",
+)
+DB_POOL_CONNECTIONS = Gauge(
+    "db_pool_connections",
+    "Open database connections, in use or idle",
+    multiprocess_mode="livesum",
+)
+
+CACHE_REQUESTS = Counter(
+    "cache_requests_total",
+    "Cache lookups by cache and result (hit ratio = hit / (hit + miss))",
+    ["cache", "result"],
+)
+
+EVENT_LOOP_LAG = Histogram(
+    "event_loop_lag_seconds",
+    "How late the event loop ran a scheduled wake-up",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+EVENT_LOOP_BLOCKS = Counter(
+    "event_loop_blocks_total",
+    "Event loop stalls over the watchdog threshold, by the route running at the time",
+    ["route"],
+)
+
+BACKGROUND_JOBS_PENDING = Gauge(
+    "background_jobs_pending",
+    "Background jobs queued or running",
+    ["job"],
+    multiprocess_mode="livesum",
+)
+BACKGROUND_JOB_DURATION = Histogram(
+    "background_job_duration_seconds",
+    "Background job run time",
+    ["job", "outcome"],
+    buckets=(0.1, 0.5, 1.0, 5.0, 15.0, 60.0, 300.0, 900.0, 3600.0),
+)
+
+BLOB_UPLOAD_BYTES = Counter(
+    "blob_upload_bytes_total",
+    "Bytes uploaded to blob storage",
+    ["container"],
+)
+BLOB_UPLOAD_DURATION = Histogram(
+    "blob_upload_duration_seconds",
+    "Blob upload latency",
+    ["container", "outcome"],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0),
+)
+
+
+# ----- /metrics -----
+
+def metrics_response(request: Request) -> Response:
+    """Render every metric, aggregated over workers in multiprocess mode."""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        body = generate_latest(registry)
+    else:
+        body = generate_latest()
+    return Response(body, headers={"Content-Type": CONTENT_TYPE_LATEST})
+
+
+# ----- HTTP -----
+
+class MetricsMiddleware:
+    """Pure ASGI middleware recording latency per route template and in-flight requests."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        HTTP_REQUESTS_IN_PROGRESS.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            HTTP_REQUESTS_IN_PROGRESS.dec()
+            # Raw paths of unmatched requests would explode label cardinality
+            route = route_template(scope) if scope.get("route") is not None else UNMATCHED_ROUTE
+            HTTP_REQUEST_DURATION.labels(scope["method"], route, str(status_code)).observe(
+                time.perf_counter() - started
+            )
+
+
+# ----- Database pool -----
+
+def instrument_pool(engine: Engine) -> None:
+    """Track pool capacity and checked-out/open connections through pool events."""
+    pool = engine.pool
+    size = getattr(pool, "size", None)
+    if callable(size):
+        DB_POOL_SIZE.set(size())
+
+    @event.listens_for(engine, "connect")
+    def _connect(dbapi_connection, connection_record):
+        DB_POOL_CONNECTIONS.inc()
+
+    @event.listens_for(engine, "close")
+    def _close(dbapi_connection, connection_record):
+        DB_POOL_CONNECTIONS.dec()
+
+    @event.listens_for(engine, "checkout")
+    def _checkout(dbapi_connection, connection_record, connection_proxy):
+        DB_POOL_CHECKED_OUT.inc()
+
+    @event.listens_for(engine, "checkin")
+    def _checkin(dbapi_connection, connection_record):
+        DB_POOL_CHECKED_OUT.dec()
+
+
+# ----- Caches -----
+
+def record_cache_lookup(cache: str, hit: bool) -> None:
+    CACHE_REQUESTS.labels(cache, "hit" if hit else "miss").inc()
+
+
+# ----- Background jobs -----
+
+def tracked_job(name: str, func: Callable) -> Callable:
+    """
+    Wrap a background job so it counts as pending from now until it finishes.
+
+    Call when scheduling, e.g. background_tasks.add_task(tracked_job("x", fn), ...).
+    Works for sync and async callables.
+    """
+    BACKGROUND_JOBS_PENDING.labels(name).inc()
+
+    def _finish(started: float, outcome: str) -> None:
+        BACKGROUND_JOBS_PENDING.labels(name).dec()
+        BACKGROUND_JOB_DURATION.labels(name, outcome).observe(time.perf_counter() - started)
+
+    if asyncio.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def run_async(*args, **kwargs):
+            started = time.perf_counter()
+            outcome = "error"
+            try:
+                result = await func(*args, **kwargs)
+                outcome = "ok"
+                return result
+            finally:
+                _finish(started, outcome)
+        return run_async
+
+    @functools.wraps(func)
+    def run(*args, **kwargs):
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            result = func(*args, **kwargs)
+            outcome = "ok"
+            return result
+        finally:
+            _finish(started, outcome)
+    return run
+
+
+# ----- Blob storage -----
+
+def payload_size(data: Union[bytes, BinaryIO, Any]) -> int:
+    """Size of an upload payload without consuming it (0 when unknown)."""
+    if isinstance(data, (bytes, bytearray, memoryview)):
+        return len(data)
+    try:
+        position = data.tell()
+        data.seek(0, os.SEEK_END)
+        size = data.tell()
+        data.seek(position)
+        return size - position
+    except (AttributeError, OSError):
+        return 0
+
+
+@contextmanager
+def observe_blob_upload(container: str, data: Any):
+    """Time one blob upload and count its bytes on success."""
+    size = payload_size(data)
+    started = time.perf_counter()
+    outcome = "error"
+    try:
+        yield
+        outcome = "ok"
+        BLOB_UPLOAD_BYTES.labels(container).inc(size)
+    finally:
+        BLOB_UPLOAD_DURATION.labels(container, outcome).observe(time.perf_counter() - started)
@@ -5,7 +5,9 @@ from app.models.user import User, AllowedEmail, UserRole
 from app.models.student import Student
 from app.models.class_model import Class, ClassSchedule, ClassReschedule, ClassStudent
 from app.models.attendance import AttendanceSession, AttendanceStatusRecord, AttendanceStatus
-from app.models.notification import Notification
+from app.models.notification import Notification, NotificationReceipt
+from app.models.change_version import ChangeVersion
+from app.models.export_job import ExportJob
 
 __all__ = [
     "User",
@@ -20,4 +22,7 @@ __all__ = [
     "AttendanceStatusRecord",
     "AttendanceStatus",
     "Notification",
+    "NotificationReceipt",
+    "ChangeVersion",
+    "ExportJob",
 ]
@@ -3,7 +3,7 @@ Attendance session and status models.
 """
 import enum
 import uuid
-from sqlalchemy import Column, String, Text, DateTime, ForeignKey, Date, Boolean, Numeric, UniqueConstraint, Integer
+from sqlalchemy import Column, String, Text, DateTime, ForeignKey, Date, Boolean, Numeric, UniqueConstraint, Integer, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -67,6 +67,7 @@ class AttendanceStatusRecord(Base):
     
     __table_args__ = (
         UniqueConstraint('session_id', 'student_id', name='uq_attendance_session_student'),
+        Index('ix_attendance_student_id', 'student_id'),
     )
     
     # Relationships
@@ -0,0 +1,26 @@
+"""
+Change counters behind the ETags of read-heavy endpoints.
+"""
+from sqlalchemy import Column, Text, DateTime, BigInteger
+from sqlalchemy.sql import func
+
+from app.db import Base
+
+
+class ChangeVersion(Base):
+    """
+    A counter bumped whenever data behind a cached read changes.
+
+    scope "class" is keyed by class id (roster, schedule, reschedules,
+    sessions and statuses of that class); scope "student" by student_id
+    (that student's notifications).
+    """
+    __tablename__ = "change_versions"
+    
+    scope = Column(Text, primary_key=True)
+    key = Column(Text, primary_key=True)
+    version = Column(BigInteger, nullable=False, default=1)
+    updated_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    
+    def __repr__(self):
+        return f"<ChangeVersion({self.scope}:{self.key}={self.version})>"
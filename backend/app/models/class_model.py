@@ -1,7 +1,7 @@
 """
 Class and related models (schedules, reschedules, class_students).
 """
-from sqlalchemy import Column, String, Text, DateTime, ForeignKey, UniqueConstraint, Time, Date, Integer, SmallInteger, CheckConstraint, BigInteger
+from sqlalchemy import Column, String, Text, DateTime, ForeignKey, UniqueConstraint, Time, Date, Integer, SmallInteger, CheckConstraint, BigInteger, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -96,6 +96,11 @@ class ClassStudent(Base):
     student_id = Column(Integer, ForeignKey("students.student_id"), primary_key=True)
     added_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
     
+    # The primary key covers lookups by class; this one covers "classes of a student"
+    __table_args__ = (
+        Index('ix_class_students_student_id', 'student_id'),
+    )
+    
     # Relationships
     class_obj = relationship("Class", back_populates="student_enrollments")
     student = relationship("Student", back_populates="class_enrollments")
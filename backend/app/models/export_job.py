@@ -0,0 +1,34 @@
+"""
+Background export jobs.
+"""
+import uuid
+from sqlalchemy import Column, String, Text, DateTime, BigInteger, Integer, ForeignKey
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+from sqlalchemy.sql import func
+
+from app.db import Base
+
+
+class ExportJob(Base):
+    """
+    An export too large to stream in one request, written to blob storage
+    by a background task (see app/services/attendance_export.py).
+
+    status goes pending -> running -> done | failed.
+    """
+    __tablename__ = "export_jobs"
+    
+    job_id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    kind = Column(String(50), nullable=False)       # e.g. "attendance"
+    format = Column(String(20), nullable=False)     # csv, parquet
+    filters = Column(JSONB, nullable=False, default=dict)
+    status = Column(String(20), nullable=False, default="pending")
+    requested_by_user_id = Column(Integer, ForeignKey("users.user_id", ondelete="SET NULL"), nullable=True)
+    row_count = Column(BigInteger, nullable=True)
+    blob_name = Column(Text, nullable=True)
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+    
+    def __repr__(self):
+        return f"<ExportJob({self.job_id}, {self.kind}/{self.format}, {self.status})>"
@@ -1,7 +1,7 @@
 """
 Notification model for student notifications.
 """
-from sqlalchemy import Column, String, Text, DateTime, Boolean, ForeignKey, Integer, Float
+from sqlalchemy import Column, String, Text, DateTime, Boolean, ForeignKey, Integer, Float, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -11,6 +11,14 @@ from app.db import Base
 class Notification(Base):
     """
     Notifications sent to students based on attendance percentage or manually by admin.
+    
+    A row with student_id set is a direct notification to that student, with
+    its read state inline. A row without one is a message stored once for
+    many students; audience says who gets it:
+    - "recipients": the students listed in notification_receipts
+    - "all": every student
+    - "class": students enrolled in audience_class_id
+    Read state for those lives in NotificationReceipt.
     """
     __tablename__ = "notifications"
     
@@ -25,12 +33,38 @@ class Notification(Base):
     is_read = Column(Boolean, nullable=False, default=False)
     created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
     read_at = Column(DateTime(timezone=True), nullable=True)
+    audience = Column(Text, nullable=True)           # recipients, all, class (NULL: direct)
+    audience_class_id = Column(UUID(as_uuid=True), nullable=True)    # audience "class"; no FK, a deleted class's broadcast reaches nobody
+    
+    __table_args__ = (
+        Index('ix_notifications_student_created', 'student_id', 'created_at'),
+        Index('ix_notifications_audience', 'audience', 'audience_class_id'),
+    )
     
     # Relationships
     student = relationship("Student", back_populates="notifications")
     sender = relationship("User")
     
     def __repr__(self):
-        return f"<Notification(id={self.id}, student_id={self.student_id}, title='{self.title}', is_read={self.is_read})>"
+        return f"<Notification(id={self.notification_id}, student_id={self.student_id}, title='{self.title}', is_read={self.is_read})>"
+
 
 
+
+class NotificationReceipt(Base):
+    """
+    Per-student state of a shared (student_id IS NULL) notification.
+    
+    For audience "recipients" a row with read_at NULL is the delivery and
+    read_at is set once read; for "all" and "class" broadcasts rows only
+    exist for students who have read the message.
+    """
+    __tablename__ = "notification_receipts"
+    
+    notification_id = Column(Integer, ForeignKey("notifications.notification_id", ondelete="CASCADE"), primary_key=True)
+    student_id = Column(Integer, ForeignKey("students.student_id", ondelete="CASCADE"), primary_key=True)
+    read_at = Column(DateTime(timezone=True), nullable=True)
+    
+    __table_args__ = (
+        Index('ix_notification_receipts_student_id', 'student_id'),
+    )
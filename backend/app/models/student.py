@@ -30,8 +30,8 @@ class Student(Base):
     semester = Column(Integer)
     status = Column(Text)
     duration = Column(Text)
-    email = Column(Text)
-    dtu_email = Column(Text)
+    email = Column(Text, index=True)
+    dtu_email = Column(Text, index=True)
     phone = Column(Text)
     section_id = Column(Integer, ForeignKey("sections.section_id"), nullable=True)
     created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
@@ -0,0 +1,283 @@
+"""
+On-demand profiling of a live worker.
+
+StackSampler is a statistical profiler: a background thread snapshots every
+thread's Python stack through sys._current_frames() at a fixed interval and
+counts identical stacks. It costs one GIL acquisition per sample and needs
+no tracing hooks, so it is safe to run against production traffic. The
+event loop thread shows up as "MainThread"; a loop blocked by a sync call
+(blob uploads, HTTP clients) appears as a hot non-idle stack under it.
+
+RouteProfilerMiddleware captures full cProfile profiles for an opt-in set of
+route templates, for a sampled fraction of their requests, and keeps the
+most recent ones in memory for the admin endpoints.
+"""
+import cProfile
+import io
+import itertools
+import os
+import pstats
+import random
+import sys
+import sysconfig
+import threading
+import time
+from collections import Counter, deque
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Deque, Dict, List, Optional, Tuple
+
+from starlette.routing import Match
+
+from app.config import settings
+
+
+# (qualified name, file, first line)
+Frame = Tuple[str, str, int]
+Stack = Tuple[Frame, ...]
+
+# Leaf frames of threads that are parked rather than working
+IDLE_LEAVES = {
+    ("selectors.py", "select"),
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("queue.py", "get"),
+}
+
+_SITE_PACKAGES = f"{os.sep}site-packages{os.sep}"
+_STDLIB = sysconfig.get_paths()["stdlib"] + os.sep
+
+
+def _short_path(filename: str) -> str:
+    if _SITE_PACKAGES in filename:
+        return filename.split(_SITE_PACKAGES, 1)[1]
+    for prefix in (_STDLIB, os.getcwd() + os.sep):
+        if filename.startswith(prefix):
+            return filename[len(prefix):]
+    return filename
+
+
+def _frame_label(frame: Frame) -> str:
+    name, filename, line = frame
+    return f"{name} ({filename}:{line})".replace(";", ":")
+
+
+# ----- Sampling profiler -----
+
+class ProfilerBusy(Exception):
+    """Another sampling run is already in progress in this worker."""
+
+
+_sampler_lock = threading.Lock()
+
+
+@dataclass
+class StackSampler:
+    """Counts identical (thread, stack) pairs seen every `interval` seconds."""
+    interval: float = 0.01
+    include_idle: bool = False
+    counts: Counter = field(default_factory=Counter)
+    samples: int = 0
+    elapsed: float = 0.0
+
+    def _stack(self, frame) -> Stack:
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            stack.append((getattr(code, "co_qualname", code.co_name), _short_path(code.co_filename), code.co_firstlineno))
+            frame = frame.f_back
+        stack.reverse()
+        return tuple(stack)
+
+    def _is_idle(self, stack: Stack) -> bool:
+        name, filename, _ = stack[-1]
+        return (os.path.basename(filename), name.rsplit(".", 1)[-1]) in IDLE_LEAVES
+
+    def sample_once(self) -> None:
+        own = threading.get_ident()
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident == own:
+                continue
+            stack = self._stack(frame)
+            if not stack or (not self.include_idle and self._is_idle(stack)):
+                continue
+            self.counts[(names.get(ident, str(ident)), stack)] += 1
+        self.samples += 1
+
+    def run(self, seconds: float) -> "StackSampler":
+        """
+        Sample for `seconds` on the calling thread (run it off the event loop).
+
+        Raises:
+            ProfilerBusy: If another run is in progress in this process
+        """
+        if not _sampler_lock.acquire(blocking=False):
+            raise ProfilerBusy()
+        try:
+            started = time.perf_counter()
+            deadline = started + seconds
+            next_sample = started
+            while True:
+                now = time.perf_counter()
+                if now >= deadline:
+                    break
+                if now >= next_sample:
+                    self.sample_once()
+                    next_sample += self.interval
+                    # Fell behind (long GIL hold): skip missed ticks instead of bursting
+                    if next_sample < now:
+                        next_sample = now + self.interval
+                time.sleep(max(0.0, min(next_sample, deadline) - time.perf_counter()))
+            self.elapsed = time.perf_counter() - started
+        finally:
+            _sampler_lock.release()
+        return self
+
+    def collapsed(self) -> str:
+        """Brendan Gregg's collapsed format (thread;root;...;leaf count), for flamegraph.pl and speedscope."""
+        lines = [
+            ";".join([thread, *(_frame_label(frame) for frame in stack)]) + f" {count}"
+            for (thread, stack), count in self.counts.most_common()
+        ]
+        return "\n".join(lines) + "\n"
+
+    def speedscope(self) -> dict:
+        """Speedscope file format: one sampled profile per thread, weights in seconds."""
+        frame_index: Dict[Frame, int] = {}
+        frames: List[dict] = []
+        profiles: Dict[str, dict] = {}
+
+        for (thread, stack), count in self.counts.most_common():
+            indexes = []
+            for frame in stack:
+                if frame not in frame_index:
+                    frame_index[frame] = len(frames)
+                    name, filename, line = frame
+                    frames.append({"name": name, "file": filename, "line": line})
+                indexes.append(frame_index[frame])
+            profile = profiles.setdefault(thread, {
+                "type": "sampled",
+                "name": thread,
+                "unit": "seconds",
+                "startValue": 0,
+                "endValue": round(self.elapsed, 6),
+                "samples": [],
+                "weights": [],
+            })
+            profile["samples"].append(indexes)
+            profile["weights"].append(round(count * self.interval, 6))
+
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": f"pid {os.getpid()}, {self.samples} samples over {self.elapsed:.1f}s",
+            "exporter": "aims-backend",
+            "activeProfileIndex": 0,
+            "shared": {"frames": frames},
+            "profiles": sorted(profiles.values(), key=lambda p: p["name"] != "MainThread"),
+        }
+
+
+# ----- Per-route cProfile capture -----
+
+@dataclass
+class RouteProfile:
+    """One captured request profile."""
+    id: int
+    method: str
+    route: str
+    path: str
+    status: int
+    duration_ms: float
+    captured_at: datetime
+    profile: cProfile.Profile
+
+    def render(self, sort: str = "cumulative", limit: int = 50) -> str:
+        out = io.StringIO()
+        pstats.Stats(self.profile, stream=out).strip_dirs().sort_stats(sort).print_stats(limit)
+        return out.getvalue()
+
+
+_route_profiles: Deque[RouteProfile] = deque(maxlen=settings.profile_route_keep)
+_route_profile_ids = itertools.count(1)
+# cProfile hooks are per thread and Python 3.12+ allows only one active profiler
+_route_profiler_lock = threading.Lock()
+
+
+def recent_route_profiles() -> List[RouteProfile]:
+    """Captured profiles, newest first."""
+    return list(reversed(_route_profiles))
+
+
+def get_route_profile(profile_id: int) -> Optional[RouteProfile]:
+    return next((p for p in _route_profiles if p.id == profile_id), None)
+
+
+class RouteProfilerMiddleware:
+    """
+    Pure ASGI middleware running cProfile around a sampled fraction
+    (settings.profile_route_sample_rate) of requests whose route template is
+    in settings.profile_routes ("*" matches every route).
+
+    The profiler runs on the event loop thread, so it sees the handler plus
+    whatever other coroutines run while it awaits; sync dependencies that
+    Starlette moves to the threadpool are not included. At most one request
+    is profiled at a time per worker.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    def _route(self, scope) -> Optional[str]:
+        router = getattr(scope.get("app"), "router", None)
+        for route in getattr(router, "routes", []):
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                return route.path
+        return None
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or not settings.profile_routes
+            or random.random() >= settings.profile_route_sample_rate
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        route = self._route(scope)
+        if route is None or not ("*" in settings.profile_routes or route in settings.profile_routes):
+            await self.app(scope, receive, send)
+            return
+        if not _route_profiler_lock.acquire(blocking=False):
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        profile = cProfile.Profile()
+        started = time.perf_counter()
+        try:
+            profile.enable()
+            try:
+                await self.app(scope, receive, send_with_status)
+            finally:
+                profile.disable()
+        finally:
+            _route_profiler_lock.release()
+            _route_profiles.append(RouteProfile(
+                id=next(_route_profile_ids),
+                method=scope["method"],
+                route=route,
+                path=scope["path"],
+                status=status_code,
+                duration_ms=round((time.perf_counter() - started) * 1000, 2),
+                captured_at=datetime.now(timezone.utc),
+                profile=profile,
+            ))
@@ -2,8 +2,9 @@
 Attendance routes.
 """
 from fastapi import APIRouter, Depends, Query
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.orm import Session
-from typing import Optional
+from typing import Literal, Optional
 from uuid import UUID
 
 from app.db import get_db
@@ -11,13 +12,17 @@ from app.auth.dependencies import get_current_user, require_teacher_or_admin, Us
 from app.schemas.attendance import (
     CreateSessionRequest,
     SessionResponse,
-    UpdateStatusesRequest
+    UpdateStatusesRequest,
+    MergePresenceRequest
 )
 from app.services.attendance_service import (
     create_attendance_session,
     update_attendance_statuses,
-    get_attendance_sessions
+    get_attendance_sessions,
+    get_session_for_update,
+    merge_presence_into_session
 )
+from app.services.bt_sidecar import fetch_present_emails
 
 router = APIRouter(prefix="/attendance", tags=["Attendance"])
 
@@ -37,7 +42,7 @@ async def create_session(
     session = create_attendance_session(
         db,
         request.class_id,
-        current_user.user_id,
+        current_user.user.user_id,
         current_user.role,
         request.session_date,
         request.processed_image_url
@@ -63,7 +68,7 @@ async def update_statuses(
     statuses = update_attendance_statuses(
         db,
         session_id,
-        current_user.user_id,
+        current_user.user.user_id,
         current_user.role,
         request.updates
     )
@@ -71,27 +76,73 @@ async def update_statuses(
     return {"statuses": statuses}
 
 
+@router.post("/sessions/{session_id}/merge-presence")
+async def merge_presence(
+    session_id: UUID,
+    request: MergePresenceRequest,
+    current_user: UserContext = Depends(require_teacher_or_admin),
+    db: Session = Depends(get_db)
+):
+    """
+    Merge BT check-in presence with face-recognition results for a session.
+    
+    - Pulls the class's present set from the BT sidecar
+    - Maps emails and roll numbers against the class roster in bulk
+    - Writes all statuses with one bulk upsert
+    - Only session owner or admin can merge
+    """
+    # Authorize before calling out to the sidecar
+    session = get_session_for_update(db, session_id, current_user.user.user_id, current_user.role)
+    present_emails = await fetch_present_emails(str(session.class_id)) if session.class_id else set()
+    
+    return merge_presence_into_session(
+        db,
+        session,
+        present_emails,
+        request.face_results,
+        request.mark_absent
+    )
+
+
 @router.get("/sessions")
 async def get_sessions(
     class_id: UUID = Query(..., alias="classId"),
     from_date: Optional[str] = Query(None, alias="from"),
     to_date: Optional[str] = Query(None, alias="to"),
+    limit: int = Query(60, ge=1, le=200, description="Sessions per page"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page"),
+    format: Literal["nested", "columnar"] = Query("nested"),
     current_user: UserContext = Depends(require_teacher_or_admin),
     db: Session = Depends(get_db)
 ):
     """
-    Get attendance sessions for a class within a date range.
+    Get attendance sessions for a class within a date range, newest first.
     
     - Only class owner or admin can view sessions
-    - Returns sessions with all student statuses
+    - Returns at most `limit` sessions; when more follow, the X-Next-Cursor
+      header holds the `cursor` for the next page
+    - format=nested: a list of sessions, each with all student statuses
+    - format=columnar: the roster once, then per-session status arrays
+      aligned with it (also carries nextCursor in the body)
+    - Malformed `from`/`to` dates or cursor are rejected with 400
     """
-    sessions = get_attendance_sessions(
+    page, next_cursor = get_attendance_sessions(
         db,
         class_id,
-        current_user.user_id,
+        current_user.user.user_id,
         current_user.role,
         from_date,
-        to_date
+        to_date,
+        limit,
+        cursor,
+        columnar=format == "columnar"
     )
     
-    return sessions
+    headers = {}
+    if next_cursor:
+        headers["X-Next-Cursor"] = next_cursor
+    if format == "columnar":
+        page["nextCursor"] = next_cursor
+    
+    # Service output is already JSON-ready; skip FastAPI's re-encoding pass
+    return ORJSONResponse(page, headers=headers)
@@ -1,17 +1,36 @@
 """
 Class management routes.
 """
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status, UploadFile, File
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import Annotated, List, Optional
 from uuid import UUID
 from pydantic import BaseModel
 from datetime import time
+import json
+import tempfile
 
-from app.db import get_db
+from app.config import settings
+from app.db import get_db, SessionLocal
 from app.auth.dependencies import get_current_user, require_teacher_or_admin, UserContext
+from app.models.user import UserRole
 from app.schemas.classes import UpdateStudentsRequest
-from app.services.class_service import get_classes_for_user, update_class_students, create_class, delete_class
+from app.services.class_service import (
+    get_classes_for_user,
+    update_class_students,
+    create_class,
+    delete_class,
+    verify_class_ownership,
+)
+from app.services.roster_upload import check_roster_header, import_roster_upload
+from app.services.change_versions import (
+    bump_class_versions,
+    class_list_fingerprint,
+    make_etag,
+    not_modified,
+    set_validators,
+)
 from app.models.class_model import ClassSchedule
 
 router = APIRouter(prefix="/classes", tags=["Classes"])
@@ -88,6 +107,7 @@ async def add_class_schedule(
     )
     
     db.add(schedule)
+    bump_class_versions(db, [class_id])
     db.commit()
     
     return {"status": "success"}
@@ -95,6 +115,7 @@ async def add_class_schedule(
 
 @router.get("")
 async def list_classes(
+    request: Request,
     current_user: UserContext = Depends(require_teacher_or_admin),
     db: Session = Depends(get_db)
 ):
@@ -103,9 +124,20 @@ async def list_classes(
     
     - Teachers see only their own classes
     - Admins see all classes
+    - 304 for a matching If-None-Match while none of them changed
     """
-    classes = get_classes_for_user(db, current_user.user_id, current_user.role)
-    return classes
+    user_id = current_user.user.user_id
+    fingerprint = class_list_fingerprint(db, user_id, current_user.role == UserRole.ADMIN)
+    etag = make_etag("classes", user_id, current_user.role.value, fingerprint.classes, fingerprint.digest)
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
+    
+    classes = get_classes_for_user(db, user_id, current_user.role)
+    # Service output is already JSON-ready; skip FastAPI's re-encoding pass
+    response = ORJSONResponse(classes)
+    set_validators(response, etag)
+    return response
 
 
 
@@ -118,7 +150,7 @@ async def remove_class(
     """
     Delete a class and all related records.
     """
-    delete_class(db, class_id, current_user.user_id, current_user.role)
+    delete_class(db, class_id, current_user.user.user_id, current_user.role)
 
 
 @router.put("/{class_id}/students")
@@ -131,16 +163,71 @@ async def update_students(
     """
     Update the roster of students enrolled in a class.
     
-    - Upserts students based on roll number
+    - Upserts students based on university roll / roll number
     - Adds students to the class if not already enrolled
+    - Whitelists their emails for the student app
+    - Returns the roster plus an inserted/updated/skipped summary
     - Only class owner or admin can update
     """
-    students = update_class_students(
+    return update_class_students(
         db,
         class_id,
-        current_user.user_id,
+        current_user.user.user_id,
         current_user.role,
         request.students
     )
+
+
+@router.post("/{class_id}/students/upload")
+async def upload_students(
+    class_id: UUID,
+    file: Annotated[UploadFile, File(...)],
+    current_user: UserContext = Depends(require_teacher_or_admin),
+    db: Session = Depends(get_db)
+):
+    """
+    Import a roster file (CSV or XLSX) directly into a class.
+    
+    - Same merge as PUT /classes/{class_id}/students, in batches
+    - Header names follow the teacher app (name, rollno, email, dtu_email, ...)
+    - Streams NDJSON progress: one "progress" line per batch, then "done"
+      (with totals and row errors) or "error"
+    - Only class owner or admin can upload
+    """
+    verify_class_ownership(db, class_id, current_user.user.user_id, current_user.role)
+    
+    # Own copy of the upload: the request's file is closed once the
+    # handler returns, but the import keeps reading while streaming
+    spooled = tempfile.SpooledTemporaryFile(max_size=1024 * 1024)
+    size = 0
+    while chunk := await file.read(1024 * 1024):
+        size += len(chunk)
+        if size > settings.roster_upload_max_bytes:
+            spooled.close()
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail="File too large"
+            )
+        spooled.write(chunk)
+    
+    try:
+        check_roster_header(spooled, file.filename)
+    except HTTPException:
+        spooled.close()
+        raise
+    
+    filename = file.filename
+    
+    def progress():
+        # Runs in the threadpool after the request-scoped session is closed
+        import_db = SessionLocal()
+        try:
+            for event in import_roster_upload(
+                import_db, class_id, spooled, filename, settings.roster_upload_batch_size
+            ):
+                yield json.dumps(event) + "\n"
+        finally:
+            import_db.close()
+            spooled.close()
     
-    return {"students": students}
+    return StreamingResponse(progress(), media_type="application/x-ndjson")
@@ -0,0 +1,120 @@
+"""
+Bulk export routes (admins only).
+"""
+from datetime import date
+from typing import Literal, Optional
+from uuid import UUID
+
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, status
+from fastapi.responses import JSONResponse, StreamingResponse
+from sqlalchemy.orm import Session
+
+from app.auth.dependencies import require_admin, UserContext
+from app.config import settings
+from app.db import get_db
+from app.metrics import tracked_job
+from app.models.export_job import ExportJob
+from app.schemas.export import ExportJobResponse
+from app.services.attendance_export import (
+    AttendanceExport,
+    ExportFilters,
+    create_export_job,
+    estimate_rows,
+    export_filename,
+    run_export_job
+)
+from app.services.azure_storage import azure_storage
+
+router = APIRouter(prefix="/exports", tags=["Exports"])
+
+
+def _job_response(job: ExportJob) -> ExportJobResponse:
+    download_url = None
+    if job.status == "done" and job.blob_name and azure_storage:
+        download_url = azure_storage.generate_sas_url(
+            container_name=azure_storage.CONTAINER_EXPORTS,
+            blob_name=job.blob_name,
+            expiry_hours=settings.export_link_hours
+        )
+    return ExportJobResponse(
+        jobId=job.job_id,
+        status=job.status,
+        format=job.format,
+        filters=job.filters,
+        rowCount=job.row_count,
+        error=job.error,
+        createdAt=job.created_at,
+        finishedAt=job.finished_at,
+        downloadUrl=download_url
+    )
+
+
+@router.get("/attendance", responses={202: {"model": ExportJobResponse}})
+def export_attendance(
+    background_tasks: BackgroundTasks,
+    format: Literal["csv", "parquet"] = Query("csv"),
+    department: Optional[str] = Query(None, description="Students' department"),
+    class_id: Optional[UUID] = Query(None, alias="classId"),
+    from_date: Optional[date] = Query(None, alias="from"),
+    to_date: Optional[date] = Query(None, alias="to"),
+    background: bool = Query(False, description="Always run as a background job"),
+    current_user: UserContext = Depends(require_admin),
+    db: Session = Depends(get_db)
+):
+    """
+    Export attendance status rows (one per student per session) as CSV or Parquet.
+    
+    - Streams the file from a server-side cursor; rows are not sorted
+    - Scopes the planner estimates at more than EXPORT_STREAM_MAX_ROWS rows
+      (or background=true) run as a background job instead: 202 with the
+      job, whose downloadUrl appears at /exports/attendance/jobs/{jobId}
+      once it is done
+    """
+    if from_date and to_date and from_date > to_date:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="'from' must not be after 'to'"
+        )
+    filters = ExportFilters(department=department, class_id=class_id, from_date=from_date, to_date=to_date)
+    
+    if background and not azure_storage:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Azure Storage is not configured. Please set AZURE_STORAGE_CONNECTION_STRING in environment variables."
+        )
+    
+    # Without storage a large scope still streams; memory use is the same
+    if azure_storage and (background or estimate_rows(filters) > settings.export_stream_max_rows):
+        job = create_export_job(db, current_user.user.user_id, format, filters)
+        background_tasks.add_task(tracked_job("attendance_export", run_export_job), job.job_id)
+        return JSONResponse(
+            status_code=status.HTTP_202_ACCEPTED,
+            content=_job_response(job).model_dump(mode="json", by_alias=True)
+        )
+    
+    export = AttendanceExport(filters, format)
+    return StreamingResponse(
+        export,
+        media_type=export.content_type,
+        headers={"Content-Disposition": f'attachment; filename="{export_filename(format)}"'}
+    )
+
+
+@router.get("/attendance/jobs/{job_id}", response_model=ExportJobResponse)
+def get_export_job(
+    job_id: UUID,
+    current_user: UserContext = Depends(require_admin),
+    db: Session = Depends(get_db)
+):
+    """
+    State of a background export; downloadUrl is a short-lived link to the
+    artifact once status is "done".
+    """
+    job = db.query(ExportJob).filter(ExportJob.job_id == job_id).first()
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Export job not found"
+        )
+    
+    return _job_response(job)
@@ -1,29 +1,148 @@
 """
 Notification routes for students and admins.
 """
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.orm import Session
 from sqlalchemy import text
 from typing import List
-from uuid import UUID
 
 from app.db import get_db
 from app.models.notification import Notification
 from app.models.student import Student
-from app.models.class_model import ClassStudent
+from app.models.class_model import Class, ClassStudent
 from app.schemas.notifications import (
+    BroadcastNotificationRequest,
     NotificationCreate,
     NotificationResponse,
     SendNotificationToStudentsRequest
 )
 from app.auth.dependencies import get_current_user, UserContext
 from app.models.user import UserRole
+from app.services.change_versions import (
+    bump_broadcast_version,
+    bump_student_versions,
+    make_etag,
+    not_modified,
+    set_validators,
+    student_fingerprint,
+)
 
 router = APIRouter(prefix="/notifications", tags=["notifications"])
 
 
+# Attendance percentage (present / sessions held) of every enrollment in
+# one grouped pass, the way stats_service.CLASS_SUMMARY_QUERY counts it,
+# instead of a correlated subquery per enrollment. Students at or under
+# the threshold in any selected class receive one shared message: a single
+# notifications row plus one notification_receipts row each, written and
+# counted (and their change counters bumped) inside the database.
+SEND_LOW_ATTENDANCE_QUERY = text("""
+    WITH recipients AS (
+        SELECT DISTINCT student_id
+        FROM (
+            SELECT cs.student_id
+            FROM class_students cs
+            LEFT JOIN sessions ss ON ss.class_id = cs.class_id
+            LEFT JOIN attendance a ON a.session_id = ss.session_id AND a.student_id = cs.student_id
+            WHERE CAST(:class_id AS uuid) IS NULL OR cs.class_id = CAST(:class_id AS uuid)
+            GROUP BY cs.class_id, cs.student_id
+            HAVING CASE
+                WHEN COUNT(ss.session_id) = 0 THEN 0
+                ELSE (COUNT(*) FILTER (WHERE a.status = 'PRESENT')::float / COUNT(ss.session_id)::float) * 100
+            END <= :threshold
+        ) low
+    ),
+    message AS (
+        INSERT INTO notifications (sender_user_id, title, message, notification_type, attendance_threshold, is_read, audience)
+        SELECT :sender_user_id, :title, :message, 'attendance', :threshold, false, 'recipients'
+        WHERE EXISTS (SELECT 1 FROM recipients)
+        RETURNING notification_id
+    ),
+    delivered AS (
+        INSERT INTO notification_receipts (notification_id, student_id)
+        SELECT m.notification_id, r.student_id
+        FROM message m
+        CROSS JOIN recipients r
+        RETURNING student_id
+    ),
+    bumped AS (
+        INSERT INTO change_versions (scope, key, version)
+        SELECT 'student', student_id::text, 1
+        FROM delivered
+        ORDER BY student_id::text
+        ON CONFLICT (scope, key) DO UPDATE
+        SET version = change_versions.version + 1, updated_at = now()
+    )
+    SELECT COUNT(*) FROM delivered
+""")
+
+# A student's inbox: direct notifications, shared messages they are listed
+# on, and broadcasts to everyone or to a class they are enrolled in, with
+# read state from the direct row or their receipt
+MY_NOTIFICATIONS_QUERY = text("""
+    SELECT *
+    FROM (
+        SELECT
+            n.notification_id, n.student_id, n.title, n.message, n.notification_type,
+            n.attendance_threshold, n.is_read, n.created_at, n.read_at
+        FROM notifications n
+        WHERE n.student_id = :student_id
+        UNION ALL
+        SELECT
+            n.notification_id, r.student_id, n.title, n.message, n.notification_type,
+            n.attendance_threshold, r.read_at IS NOT NULL, n.created_at, r.read_at
+        FROM notification_receipts r
+        JOIN notifications n ON n.notification_id = r.notification_id
+        WHERE r.student_id = :student_id AND n.audience = 'recipients'
+        UNION ALL
+        SELECT
+            n.notification_id, CAST(:student_id AS integer), n.title, n.message, n.notification_type,
+            n.attendance_threshold, r.read_at IS NOT NULL, n.created_at, r.read_at
+        FROM notifications n
+        LEFT JOIN notification_receipts r ON r.notification_id = n.notification_id AND r.student_id = :student_id
+        WHERE n.audience = 'all'
+        UNION ALL
+        SELECT
+            n.notification_id, cs.student_id, n.title, n.message, n.notification_type,
+            n.attendance_threshold, r.read_at IS NOT NULL, n.created_at, r.read_at
+        FROM class_students cs
+        JOIN notifications n
+            ON n.audience = 'class' AND n.audience_class_id = cs.class_id
+        LEFT JOIN notification_receipts r ON r.notification_id = n.notification_id AND r.student_id = cs.student_id
+        WHERE cs.student_id = :student_id
+    ) inbox
+    WHERE NOT (CAST(:unread_only AS boolean) AND is_read)
+    ORDER BY created_at DESC, notification_id DESC
+""")
+
+# Read marker for a shared message the student can see; the first read wins
+MARK_SHARED_READ_QUERY = text("""
+    INSERT INTO notification_receipts (notification_id, student_id, read_at)
+    SELECT n.notification_id, :student_id, now()
+    FROM notifications n
+    WHERE n.notification_id = :notification_id
+      AND n.student_id IS NULL
+      AND (
+          n.audience = 'all'
+          OR (n.audience = 'class' AND EXISTS (
+              SELECT 1 FROM class_students cs
+              WHERE cs.class_id = n.audience_class_id AND cs.student_id = :student_id
+          ))
+          OR (n.audience = 'recipients' AND EXISTS (
+              SELECT 1 FROM notification_receipts r
+              WHERE r.notification_id = n.notification_id AND r.student_id = :student_id
+          ))
+      )
+    ON CONFLICT (notification_id, student_id) DO UPDATE
+    SET read_at = COALESCE(notification_receipts.read_at, EXCLUDED.read_at)
+    RETURNING notification_id
+""")
+
+
 @router.get("/me", response_model=List[NotificationResponse])
 async def get_my_notifications(
+    request: Request,
+    response: Response,
     current_user: UserContext = Depends(get_current_user),
     db: Session = Depends(get_db),
     unread_only: bool = False
@@ -31,6 +150,9 @@ async def get_my_notifications(
     """
     Get notifications for the current student.
     
+    Answers If-None-Match with 304 while the student's notifications are
+    unchanged.
+    
     Args:
         unread_only: If True, return only unread notifications
     """
@@ -40,28 +162,34 @@ async def get_my_notifications(
             detail="Only students can access their notifications"
         )
     
-    # Find student record
-    student = db.query(Student).filter(
-        (Student.email == current_user.email) | (Student.dtu_email == current_user.email)
-    ).first()
+    # Find student record, with its change counter
+    student = student_fingerprint(db, current_user.email)
     
     if not student:
         return []
     
-    # Query notifications
-    query = db.query(Notification).filter(Notification.student_id == student.id)
-    
-    if unread_only:
-        query = query.filter(Notification.is_read == False)
+    # Enrollments (not the classes' own counters) decide which class
+    # broadcasts reach the student
+    etag = make_etag(
+        "notifications", student.student_id, student.student_version,
+        student.broadcast_version, student.enrollments_digest, unread_only
+    )
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
+    set_validators(response, etag)
     
-    notifications = query.order_by(Notification.created_at.desc()).all()
+    rows = db.execute(MY_NOTIFICATIONS_QUERY, {
+        "student_id": student.student_id,
+        "unread_only": unread_only
+    }).fetchall()
     
-    return [NotificationResponse.model_validate(n) for n in notifications]
+    return [NotificationResponse.model_validate(row) for row in rows]
 
 
 @router.post("/me/{notification_id}/read")
 async def mark_notification_read(
-    notification_id: UUID,
+    notification_id: int,
     current_user: UserContext = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
@@ -83,22 +211,29 @@ async def mark_notification_read(
             detail="Student record not found"
         )
     
-    # Find notification
+    # Direct notification: read state is on the row itself
     notification = db.query(Notification).filter(
-        Notification.id == notification_id,
-        Notification.student_id == student.id
+        Notification.notification_id == notification_id,
+        Notification.student_id == student.student_id
     ).first()
     
-    if not notification:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Notification not found"
-        )
+    if notification:
+        notification.is_read = True
+        from datetime import datetime, timezone
+        notification.read_at = datetime.now(timezone.utc)
+    else:
+        # Shared message: record a read marker, if the student can see it
+        marked = db.execute(MARK_SHARED_READ_QUERY, {
+            "notification_id": notification_id,
+            "student_id": student.student_id
+        }).first()
+        if not marked:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Notification not found"
+            )
     
-    # Mark as read
-    notification.is_read = True
-    from datetime import datetime, timezone
-    notification.read_at = datetime.now(timezone.utc)
+    bump_student_versions(db, [student.student_id])
     db.commit()
     
     return {"message": "Notification marked as read"}
@@ -115,6 +250,9 @@ async def send_notification_to_students(
     
     Sends notification to all students (or students in a specific class) 
     whose attendance is below the specified threshold.
+    
+    - One statement selects the students, stores the message once and lists
+      them as its recipients; no rows come back to Python
     """
     if current_user.role != UserRole.ADMIN:
         raise HTTPException(
@@ -122,68 +260,13 @@ async def send_notification_to_students(
             detail="Only admins can send notifications"
         )
     
-    # Build query to find students with attendance <= threshold
-    if request.class_id:
-        # Limit to specific class
-        query = text("""
-            SELECT DISTINCT s.id, s.roll_no, s.name, s.email
-            FROM students s
-            JOIN class_students cs ON s.id = cs.student_id
-            JOIN classes c ON cs.class_id = c.id
-            WHERE c.id = :class_id
-            AND (
-                SELECT 
-                    CASE 
-                        WHEN COUNT(asess.id) = 0 THEN 0
-                        ELSE (COUNT(CASE WHEN asr.status = 'present' THEN 1 END)::float / COUNT(asess.id)::float) * 100
-                    END
-                FROM attendance_sessions asess
-                LEFT JOIN attendance_statuses asr ON asess.id = asr.session_id AND asr.student_id = s.id
-                WHERE asess.class_id = :class_id
-            ) <= :threshold
-        """)
-        result = db.execute(query, {
-            "class_id": str(request.class_id),
-            "threshold": request.attendance_threshold
-        })
-    else:
-        # All students across all classes
-        query = text("""
-            SELECT DISTINCT s.id, s.roll_no, s.name, s.email
-            FROM students s
-            JOIN class_students cs ON s.id = cs.student_id
-            WHERE (
-                SELECT 
-                    CASE 
-                        WHEN COUNT(asess.id) = 0 THEN 0
-                        ELSE (COUNT(CASE WHEN asr.status = 'present' THEN 1 END)::float / COUNT(asess.id)::float) * 100
-                    END
-                FROM attendance_sessions asess
-                LEFT JOIN attendance_statuses asr ON asess.id = asr.session_id AND asr.student_id = s.id
-                WHERE asess.class_id = cs.class_id
-            ) <= :threshold
-        """)
-        result = db.execute(query, {"threshold": request.attendance_threshold})
-    
-    students = result.fetchall()
-    
-    # Create notifications for each student
-    notifications_created = 0
-    from datetime import datetime, timezone
-    
-    for row in students:
-        student_id = row[0]
-        notification = Notification(
-            student_id=student_id,
-            title=request.title,
-            message=request.message,
-            notification_type="attendance",
-            attendance_threshold=request.attendance_threshold,
-            is_read=False
-        )
-        db.add(notification)
-        notifications_created += 1
-    
+    notifications_created = db.execute(SEND_LOW_ATTENDANCE_QUERY, {
+        "class_id": str(request.class_id) if request.class_id else None,
+        "threshold": request.attendance_threshold,
+        "sender_user_id": current_user.user.user_id,
+        "title": request.title,
+        "message": request.message
+    }).scalar()
     db.commit()
     
     return {
@@ -192,6 +275,51 @@ async def send_notification_to_students(
     }
 
 
+@router.post("/admin/broadcast", response_model=dict)
+async def broadcast_notification(
+    request: BroadcastNotificationRequest,
+    current_user: UserContext = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Admin endpoint: Send one message to every student, or to every student
+    enrolled in a class.
+    
+    - Stored once; each student's read state is kept only after they read it
+    - Students enrolled later also see class broadcasts
+    """
+    if current_user.role != UserRole.ADMIN:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only admins can send notifications"
+        )
+    
+    if request.class_id and not db.query(Class.id).filter(Class.id == request.class_id).first():
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Class not found"
+        )
+    
+    notification = Notification(
+        sender_user_id=current_user.user.user_id,
+        title=request.title,
+        message=request.message,
+        notification_type=request.notification_type or "manual",
+        is_read=False,
+        audience="class" if request.class_id else "all",
+        audience_class_id=request.class_id
+    )
+    db.add(notification)
+    bump_broadcast_version(db)
+    db.commit()
+    
+    return {
+        "message": "Broadcast sent",
+        "notification_id": notification.notification_id,
+        "audience": notification.audience
+    }
+
+
 @router.post("/admin/send-to-student", response_model=NotificationResponse)
 async def send_notification_to_student(
     request: NotificationCreate,
@@ -214,7 +342,7 @@ async def send_notification_to_student(
         )
     
     # Verify student exists
-    student = db.query(Student).filter(Student.id == request.student_id).first()
+    student = db.query(Student).filter(Student.uuid == request.student_id).first()
     if not student:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -223,7 +351,7 @@ async def send_notification_to_student(
     
     # Create notification
     notification = Notification(
-        student_id=request.student_id,
+        student_id=student.student_id,
         title=request.title,
         message=request.message,
         notification_type=request.notification_type or "manual",
@@ -231,6 +359,7 @@ async def send_notification_to_student(
         is_read=False
     )
     db.add(notification)
+    bump_student_versions(db, [student.student_id])
     db.commit()
     db.refresh(notification)
     
@@ -3,17 +3,26 @@ OnDemand.io Agent Integration for AIMS Attendance System
 Add this to your FastAPI backend
 """
 
-from fastapi import APIRouter, HTTPException
+import json
+
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-import requests
-from typing import Optional, List
-import os
+from sqlalchemy.orm import Session
+from typing import Callable, Dict, Optional, List, Tuple
+from uuid import UUID
+
+from app.auth.dependencies import get_optional_user, UserContext
+from app.config import settings
+from app.db import get_db
+from app.services.agent_context import build_attendance_context
+from app.services.ondemand_client import get_ondemand_client
 
 router = APIRouter(prefix="/ai-agents", tags=["AI Agents"])
 
-# OnDemand Configuration
-ONDEMAND_API_KEY = os.getenv("ONDEMAND_API_KEY", "eZnzc9TxDXN8LXVV0KI5srq1KYwReaIc")
-ONDEMAND_URL = "https://api.on-demand.io/chat/v1/sessions/query"
+# Upstream model endpoints
+GPT4O_ENDPOINT = "predefined-openai-gpt4o"
+CLAUDE_ENDPOINT = "predefined-claude-4-5-opus"
 
 # Plugin IDs (Tools)
 PLUGINS = {
@@ -26,6 +35,9 @@ class AgentRequest(BaseModel):
     agent_type: str = "gpt4"  # gpt4 or claude
     use_tools: bool = False
     tools: Optional[List[str]] = []
+    # Grounding (attendance-analyzer and report-generator only)
+    class_id: Optional[UUID] = None
+    roll_no: Optional[str] = None
 
 class AgentResponse(BaseModel):
     answer: str
@@ -35,73 +47,157 @@ class AgentResponse(BaseModel):
     status: str
 
 
-def call_ondemand_agent(query: str, endpoint: str, plugins: List[str] = None):
-    """Helper function to call OnDemand.io API"""
-    payload = {
-        "query": query,
-        "endpointId": endpoint,
-        "responseMode": "sync"
-    }
+async def call_ondemand_agent(query: str, endpoint: str, plugins: List[str] = None):
+    """Helper function to call OnDemand.io API without blocking the event loop"""
+    return await get_ondemand_client().query(query, endpoint, plugins)
+
+
+def to_agent_response(result: dict) -> AgentResponse:
+    """Map an OnDemand sync-mode result onto AgentResponse."""
+    data = result["data"]
+    return AgentResponse(
+        answer=data["answer"],
+        session_id=data["sessionId"],
+        tokens_used=data["metrics"]["totalTokens"],
+        time_taken=data["metrics"]["totalTimeSec"],
+        status=data["status"]
+    )
+
+
+# (query, endpoint, plugins) for an agent request
+AgentCall = Tuple[str, str, List[str]]
+
+# Agents that accept class_id / roll_no and get real attendance data
+GROUNDED_AGENTS = {"attendance-analyzer", "report-generator"}
+
+
+def ground_query(
+    query: str,
+    request: AgentRequest,
+    current_user: Optional[UserContext],
+    db: Session
+) -> str:
+    """
+    Prefix a query with precomputed attendance data when the request asks for it.
+    
+    Requests without class_id / roll_no pass through unchanged. Grounded
+    requests need a teacher or admin token, and see only what the stats
+    endpoints would show that user.
     
-    if plugins:
-        payload["pluginIds"] = plugins
+    Raises:
+        HTTPException: If not authenticated/authorized, or the class or student is not found
+    """
+    if request.class_id is None and not request.roll_no:
+        return query
     
-    try:
-        response = requests.post(
-            ONDEMAND_URL,
-            headers={
-                "apikey": ONDEMAND_API_KEY,
-                "Content-Type": "application/json"
-            },
-            json=payload,
-            timeout=30
+    if current_user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Authentication required for class or student data",
+            headers={"WWW-Authenticate": "Bearer"},
         )
-        response.raise_for_status()
-        return response.json()
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"OnDemand API error: {str(e)}")
+    if not (current_user.is_teacher() or current_user.is_admin()):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Teacher or admin access required"
+        )
+    
+    context = build_attendance_context(
+        db,
+        current_user.user.user_id,
+        current_user.role,
+        settings.ondemand_context_token_budget,
+        class_id=request.class_id,
+        roll_no=request.roll_no
+    )
+    return (
+        "Attendance data (P=present, A=absent, L=late, E=excused, pct=P/total):\n"
+        f"{context}\n\n{query}"
+    )
 
 
 # ===== 6 SPECIALIZED AGENTS FOR ATTENDANCE SYSTEM =====
+# Each agent is a function from the request to the upstream call, shared by
+# its sync route below and by the streaming route.
+
+def _attendance_analyzer_call(request: AgentRequest) -> AgentCall:
+    return request.query, GPT4O_ENDPOINT, []
+
+
+def _report_generator_call(request: AgentRequest) -> AgentCall:
+    return f"Generate a detailed attendance report: {request.query}", CLAUDE_ENDPOINT, []
+
+
+def _policy_researcher_call(request: AgentRequest) -> AgentCall:
+    plugins = [PLUGINS["web_search"]] if request.use_tools else []
+    return f"Research attendance policy: {request.query}", GPT4O_ENDPOINT, plugins
+
+
+def _sql_generator_call(request: AgentRequest) -> AgentCall:
+    return f"Generate PostgreSQL query: {request.query}", GPT4O_ENDPOINT, []
+
+
+def _student_advisor_call(request: AgentRequest) -> AgentCall:
+    return f"Provide student advice: {request.query}", CLAUDE_ENDPOINT, []
+
+
+def _multi_tool_call(request: AgentRequest) -> AgentCall:
+    plugins = []
+    if request.use_tools:
+        plugins = [PLUGINS["web_search"], PLUGINS["weather"]]
+    return request.query, GPT4O_ENDPOINT, plugins
+
+
+def _general_query_call(request: AgentRequest) -> AgentCall:
+    endpoint = GPT4O_ENDPOINT if request.agent_type == "gpt4" else CLAUDE_ENDPOINT
+    plugins = []
+    if request.use_tools and request.tools:
+        plugins = [PLUGINS.get(tool) for tool in request.tools if tool in PLUGINS]
+    return request.query, endpoint, plugins
+
+
+AGENT_CALLS: Dict[str, Callable[[AgentRequest], AgentCall]] = {
+    "attendance-analyzer": _attendance_analyzer_call,
+    "report-generator": _report_generator_call,
+    "policy-researcher": _policy_researcher_call,
+    "sql-generator": _sql_generator_call,
+    "student-advisor": _student_advisor_call,
+    "multi-tool": _multi_tool_call,
+    "general-query": _general_query_call,
+}
+
 
 @router.post("/agent/attendance-analyzer", response_model=AgentResponse)
-async def attendance_analyzer(request: AgentRequest):
+async def attendance_analyzer(
+    request: AgentRequest,
+    current_user: Optional[UserContext] = Depends(get_optional_user),
+    db: Session = Depends(get_db)
+):
     """
     AGENT 1: Analyzes attendance patterns and provides insights
-    """
-    result = call_ondemand_agent(
-        query=request.query,
-        endpoint="predefined-openai-gpt4o"
-    )
     
-    data = result["data"]
-    return AgentResponse(
-        answer=data["answer"],
-        session_id=data["sessionId"],
-        tokens_used=data["metrics"]["totalTokens"],
-        time_taken=data["metrics"]["totalTimeSec"],
-        status=data["status"]
-    )
+    Pass class_id and/or roll_no (with a teacher/admin token) to ground the
+    answer in that class's or student's actual attendance.
+    """
+    query, endpoint, plugins = _attendance_analyzer_call(request)
+    query = ground_query(query, request, current_user, db)
+    return to_agent_response(await call_ondemand_agent(query, endpoint, plugins))
 
 
 @router.post("/agent/report-generator", response_model=AgentResponse)
-async def report_generator(request: AgentRequest):
+async def report_generator(
+    request: AgentRequest,
+    current_user: Optional[UserContext] = Depends(get_optional_user),
+    db: Session = Depends(get_db)
+):
     """
     AGENT 2: Generates attendance reports and summaries
-    """
-    result = call_ondemand_agent(
-        query=f"Generate a detailed attendance report: {request.query}",
-        endpoint="predefined-claude-4-5-opus"
-    )
     
-    data = result["data"]
-    return AgentResponse(
-        answer=data["answer"],
-        session_id=data["sessionId"],
-        tokens_used=data["metrics"]["totalTokens"],
-        time_taken=data["metrics"]["totalTimeSec"],
-        status=data["status"]
-    )
+    Accepts class_id and/or roll_no for grounding, like the attendance analyzer.
+    """
+    query, endpoint, plugins = _report_generator_call(request)
+    query = ground_query(query, request, current_user, db)
+    return to_agent_response(await call_ondemand_agent(query, endpoint, plugins))
 
 
 @router.post("/agent/policy-researcher", response_model=AgentResponse)
@@ -109,22 +205,8 @@ async def policy_researcher(request: AgentRequest):
     """
     AGENT 3: Researches attendance policies using web search tool
     """
-    plugins = [PLUGINS["web_search"]] if request.use_tools else []
-    
-    result = call_ondemand_agent(
-        query=f"Research attendance policy: {request.query}",
-        endpoint="predefined-openai-gpt4o",
-        plugins=plugins
-    )
-    
-    data = result["data"]
-    return AgentResponse(
-        answer=data["answer"],
-        session_id=data["sessionId"],
-        tokens_used=data["metrics"]["totalTokens"],
-        time_taken=data["metrics"]["totalTimeSec"],
-        status=data["status"]
-    )
+    query, endpoint, plugins = _policy_researcher_call(request)
+    return to_agent_response(await call_ondemand_agent(query, endpoint, plugins))
 
 
 @router.post("/agent/sql-generator", response_model=AgentResponse)
@@ -132,19 +214,8 @@ async def sql_generator(request: AgentRequest):
     """
     AGENT 4: Generates SQL queries for attendance data
     """
-    result = call_ondemand_agent(
-        query=f"Generate PostgreSQL query: {request.query}",
-        endpoint="predefined-openai-gpt4o"
-    )
-    
-    data = result["data"]
-    return AgentResponse(
-        answer=data["answer"],
-        session_id=data["sessionId"],
-        tokens_used=data["metrics"]["totalTokens"],
-        time_taken=data["metrics"]["totalTimeSec"],
-        status=data["status"]
-    )
+    query, endpoint, plugins = _sql_generator_call(request)
+    return to_agent_response(await call_ondemand_agent(query, endpoint, plugins))
 
 
 @router.post("/agent/student-advisor", response_model=AgentResponse)
@@ -152,19 +223,8 @@ async def student_advisor(request: AgentRequest):
     """
     AGENT 5: Provides advice and recommendations to students
     """
-    result = call_ondemand_agent(
-        query=f"Provide student advice: {request.query}",
-        endpoint="predefined-claude-4-5-opus"
-    )
-    
-    data = result["data"]
-    return AgentResponse(
-        answer=data["answer"],
-        session_id=data["sessionId"],
-        tokens_used=data["metrics"]["totalTokens"],
-        time_taken=data["metrics"]["totalTimeSec"],
-        status=data["status"]
-    )
+    query, endpoint, plugins = _student_advisor_call(request)
+    return to_agent_response(await call_ondemand_agent(query, endpoint, plugins))
 
 
 @router.post("/agent/multi-tool", response_model=AgentResponse)
@@ -172,24 +232,8 @@ async def multi_tool_agent(request: AgentRequest):
     """
     AGENT 6: Uses multiple tools (web search + weather) for comprehensive answers
     """
-    plugins = []
-    if request.use_tools:
-        plugins = [PLUGINS["web_search"], PLUGINS["weather"]]
-    
-    result = call_ondemand_agent(
-        query=request.query,
-        endpoint="predefined-openai-gpt4o",
-        plugins=plugins
-    )
-    
-    data = result["data"]
-    return AgentResponse(
-        answer=data["answer"],
-        session_id=data["sessionId"],
-        tokens_used=data["metrics"]["totalTokens"],
-        time_taken=data["metrics"]["totalTimeSec"],
-        status=data["status"]
-    )
+    query, endpoint, plugins = _multi_tool_call(request)
+    return to_agent_response(await call_ondemand_agent(query, endpoint, plugins))
 
 
 @router.post("/agent/general-query", response_model=AgentResponse)
@@ -197,25 +241,51 @@ async def general_query_agent(request: AgentRequest):
     """
     AGENT 7 (Bonus): General purpose agent for any query
     """
-    endpoint = "predefined-openai-gpt4o" if request.agent_type == "gpt4" else "predefined-claude-4-5-opus"
+    query, endpoint, plugins = _general_query_call(request)
+    return to_agent_response(await call_ondemand_agent(query, endpoint, plugins))
+
+
+@router.post("/agent/{agent_name}/stream")
+async def stream_agent(
+    agent_name: str,
+    request: AgentRequest,
+    http_request: Request,
+    current_user: Optional[UserContext] = Depends(get_optional_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Streaming variant of any agent above.
     
-    plugins = []
-    if request.use_tools and request.tools:
-        plugins = [PLUGINS.get(tool) for tool in request.tools if tool in PLUGINS]
+    Proxies the upstream answer to the client as server-sent events as it is
+    generated (`data:` lines exactly as OnDemand sends them), followed by an
+    `event: done`. If the client disconnects, the upstream request is
+    cancelled and its concurrency slot released.
+    """
+    build_call = AGENT_CALLS.get(agent_name)
+    if build_call is None:
+        raise HTTPException(status_code=404, detail=f"Unknown agent: {agent_name}")
+    query, endpoint, plugins = build_call(request)
+    if agent_name in GROUNDED_AGENTS:
+        query = ground_query(query, request, current_user, db)
+    # Before streaming starts, so a missing API key is still a plain 503
+    client = get_ondemand_client()
     
-    result = call_ondemand_agent(
-        query=request.query,
-        endpoint=endpoint,
-        plugins=plugins
-    )
+    async def events():
+        try:
+            async for data in client.stream(query, endpoint, plugins):
+                if await http_request.is_disconnected():
+                    return
+                yield f"data: {data}\n\n"
+        except HTTPException as e:
+            # Headers are already sent, so report upstream failures in-band
+            yield f"event: error\ndata: {json.dumps({'detail': e.detail})}\n\n"
+            return
+        yield "event: done\ndata: {}\n\n"
     
-    data = result["data"]
-    return AgentResponse(
-        answer=data["answer"],
-        session_id=data["sessionId"],
-        tokens_used=data["metrics"]["totalTokens"],
-        time_taken=data["metrics"]["totalTimeSec"],
-        status=data["status"]
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
 
 
@@ -230,13 +300,25 @@ To integrate this into your main.py:
    app.include_router(ondemand_routes.router)
 
 3. Add to backend/.env:
-   ONDEMAND_API_KEY=eZnzc9TxDXN8LXVV0KI5srq1KYwReaIc
+   ONDEMAND_API_KEY=your-ondemand-api-key
+   # Optional: ONDEMAND_URL (point at a stub server in tests),
+   # ONDEMAND_MAX_CONCURRENCY, ONDEMAND_CACHE_TTL_SECONDS
 
 4. Test endpoints:
    curl -X POST http://localhost:8000/ai-agents/agent/attendance-analyzer \
      -H "Content-Type: application/json" \
      -d '{"query": "Analyze attendance pattern: 70%"}'
 
+   # Grounded in a class's real attendance (teacher/admin token required):
+   curl -X POST http://localhost:8000/ai-agents/agent/attendance-analyzer \
+     -H "Authorization: Bearer <token>" -H "Content-Type: application/json" \
+     -d '{"query": "Who is at risk of falling below 75%?", "class_id": "<class uuid>"}'
+
+   # Streaming (server-sent events) variant of any agent:
+   curl -N -X POST http://localhost:8000/ai-agents/agent/student-advisor/stream \
+     -H "Content-Type: application/json" \
+     -d '{"query": "How can I improve my attendance?"}'
+
 5. Example usage from Flutter:
    final response = await http.post(
      Uri.parse('$baseUrl/ai-agents/agent/student-advisor'),
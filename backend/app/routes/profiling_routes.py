@@ -0,0 +1,111 @@
+"""
+Admin-only profiling of the worker that serves the request.
+
+With several workers each request lands on one of them; repeat the call (or
+run a single worker) to profile a specific process. The response's `pid`
+says which one was sampled.
+"""
+import asyncio
+import os
+from datetime import datetime
+from typing import List, Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import JSONResponse, PlainTextResponse
+from pydantic import BaseModel
+
+from app.auth.dependencies import require_admin, UserContext
+from app.config import settings
+from app.profiling import ProfilerBusy, StackSampler, get_route_profile, recent_route_profiles
+
+router = APIRouter(prefix="/admin/profiling", tags=["Admin"])
+
+
+class RouteProfileSummary(BaseModel):
+    id: int
+    method: str
+    route: str
+    path: str
+    status: int
+    duration_ms: float
+    captured_at: datetime
+
+
+@router.get("/sample")
+async def sample_stacks(
+    seconds: float = Query(10.0, gt=0, description="How long to sample"),
+    interval_ms: float = Query(10.0, ge=1, le=1000, description="Time between samples"),
+    format: Literal["collapsed", "speedscope"] = Query("collapsed"),
+    include_idle: bool = Query(False, description="Keep threads parked in select/wait/queue.get"),
+    current_user: UserContext = Depends(require_admin)
+):
+    """
+    Sample every thread's stack on this worker for `seconds`.
+
+    Returns collapsed stacks (text, one `thread;root;...;leaf count` line per
+    stack) or a speedscope JSON document (open at https://www.speedscope.app).
+    The event loop keeps serving traffic while the sampler runs.
+
+    Raises:
+        HTTPException: 400 if seconds exceeds PROFILE_MAX_SECONDS, 409 if this
+            worker is already being sampled
+    """
+    if seconds > settings.profile_max_seconds:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"seconds must be at most {settings.profile_max_seconds:g}"
+        )
+
+    sampler = StackSampler(interval=interval_ms / 1000, include_idle=include_idle)
+    try:
+        await asyncio.to_thread(sampler.run, seconds)
+    except ProfilerBusy:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="A profile is already running on this worker"
+        )
+
+    headers = {"X-Profile-Pid": str(os.getpid()), "X-Profile-Samples": str(sampler.samples)}
+    if format == "speedscope":
+        return JSONResponse(sampler.speedscope(), headers=headers)
+    return PlainTextResponse(sampler.collapsed(), headers=headers)
+
+
+@router.get("/routes", response_model=List[RouteProfileSummary])
+async def list_route_profiles(current_user: UserContext = Depends(require_admin)):
+    """
+    Requests captured by the per-route cProfile sampler on this worker, newest first.
+
+    Capture is opt-in: set PROFILE_ROUTES to a JSON list of route templates
+    (e.g. ["/classes/{class_id}/students"], or ["*"]) and
+    PROFILE_ROUTE_SAMPLE_RATE to the fraction of their requests to profile.
+    """
+    return [
+        RouteProfileSummary(
+            id=p.id, method=p.method, route=p.route, path=p.path,
+            status=p.status, duration_ms=p.duration_ms, captured_at=p.captured_at,
+        )
+        for p in recent_route_profiles()
+    ]
+
+
+@router.get("/routes/{profile_id}", response_class=PlainTextResponse)
+async def get_route_profile_stats(
+    profile_id: int,
+    sort: Literal["cumulative", "tottime", "calls"] = Query("cumulative"),
+    limit: int = Query(50, ge=1, le=1000),
+    current_user: UserContext = Depends(require_admin)
+):
+    """
+    pstats report of one captured request.
+
+    Raises:
+        HTTPException: 404 if the profile is unknown or already evicted
+    """
+    profile = get_route_profile(profile_id)
+    if profile is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Profile not found"
+        )
+    return PlainTextResponse(profile.render(sort, limit))
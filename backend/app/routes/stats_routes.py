@@ -1,17 +1,17 @@
 """
 Statistics routes.
 """
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.orm import Session
-from sqlalchemy import text
 from uuid import UUID
 from typing import List
 
 from app.db import get_db
-from app.auth.dependencies import get_current_user, require_teacher_or_admin, UserContext
-from app.models.class_model import Class
-from app.models.user import UserRole
-from app.schemas.stats import StudentAttendanceSummary
+from app.auth.dependencies import require_teacher_or_admin, UserContext
+from app.schemas.stats import ClassRegister, StudentAttendanceSummary
+from app.services import stats_service
+from app.services.change_versions import make_etag, not_modified, set_validators
 
 router = APIRouter(prefix="/stats", tags=["Statistics"])
 
@@ -28,63 +28,56 @@ async def get_class_attendance_summary(
     - Shows present count, total count, and attendance percentage
     - Only class owner or admin can view stats
     """
-    # Verify class ownership
-    cls = db.query(Class).filter(Class.id == class_id).first()
+    summary = stats_service.get_class_attendance_summary(
+        db,
+        class_id,
+        current_user.user.user_id,
+        current_user.role
+    )
     
-    if not cls:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Class not found"
-        )
-    
-    if current_user.role != UserRole.ADMIN and cls.teacher_id != current_user.user_id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="You do not have permission to view this class's statistics"
-        )
-    
-    # Query with detailed status counts
-    query = text("""
-        SELECT 
-            s.id as student_id,
-            s.roll_no,
-            s.name,
-            COUNT(CASE WHEN asr.status = 'present' THEN 1 END) as present_count,
-            COUNT(CASE WHEN asr.status = 'absent' THEN 1 END) as absent_count,
-            COUNT(CASE WHEN asr.status = 'late' THEN 1 END) as late_count,
-            COUNT(CASE WHEN asr.status = 'excused' THEN 1 END) as excused_count,
-            COUNT(asr.status) as total_count,
-            CASE 
-                WHEN COUNT(asr.status) > 0 
-                THEN ROUND((COUNT(CASE WHEN asr.status = 'present' THEN 1 END)::numeric / COUNT(asr.status)::numeric) * 100, 2)
-                ELSE 0 
-            END as percentage
-        FROM students s
-        JOIN class_students cs ON s.id = cs.student_id
-        LEFT JOIN attendance_status_records asr ON s.id = asr.student_id
-        LEFT JOIN attendance_sessions asess ON asr.session_id = asess.id AND asess.class_id = :class_id
-        WHERE cs.class_id = :class_id
-        GROUP BY s.id, s.roll_no, s.name
-        ORDER BY s.roll_no
-    """)
-    
-    result = db.execute(query, {"class_id": str(class_id)})
-    rows = result.fetchall()
-    
-    # Format response
-    summaries = [
+    return [
         StudentAttendanceSummary(
-            studentId=row[0],
-            rollNo=row[1],
-            studentName=row[2],
-            presentCount=row[3] or 0,
-            absentCount=row[4] or 0,
-            lateCount=row[5] or 0,
-            excusedCount=row[6] or 0,
-            totalCount=row[7] or 0,
-            percentage=float(row[8] or 0)
+            studentId=row["student_id"],
+            rollNo=row["roll_no"],
+            studentName=row["name"],
+            presentCount=row["present_count"],
+            absentCount=row["absent_count"],
+            lateCount=row["late_count"],
+            excusedCount=row["excused_count"],
+            totalCount=row["total_count"],
+            percentage=row["percentage"]
         )
-        for row in rows
+        for row in summary["students"]
     ]
+
+
+@router.get("/classes/{class_id}/register", response_model=ClassRegister)
+async def get_class_register(
+    class_id: UUID,
+    request: Request,
+    current_user: UserContext = Depends(require_teacher_or_admin),
+    db: Session = Depends(get_db)
+):
+    """
+    Get the attendance register of a class: students x session dates.
+    
+    - Student and date lists are sent once; statuses come as one packed
+      string with a legend character per cell (see ClassRegister)
+    - Only class owner or admin can view the register
+    - 304 for a matching If-None-Match while the class is unchanged
+    """
+    version = stats_service.get_class_register_version(
+        db,
+        class_id,
+        current_user.user.user_id,
+        current_user.role
+    )
+    etag = make_etag("register", class_id, version)
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
     
-    return summaries
+    # Built to match ClassRegister; skip re-validating it
+    response = ORJSONResponse(stats_service.get_class_register(db, class_id))
+    set_validators(response, etag)
+    return response
@@ -12,6 +12,8 @@ from app.models.user import User, UserRole
 from app.services.azure_storage import azure_storage
 from app.db import get_db
 from app.config import settings
+from app.metrics import tracked_job
+from app.services.change_versions import bump_enrolled_class_versions
 from sqlalchemy.orm import Session
 from sqlalchemy import func
 from sqlalchemy.dialects.postgresql import UUID
@@ -119,12 +121,13 @@ async def upload_student_photo(
         
         # Update student photo URL in database
         student.photo_url = url
+        bump_enrolled_class_versions(db, [student.student_id])
         db.commit()
         
         # Trigger face embedding generation in background (non-blocking)
         if settings.face_api_service_url:
             background_tasks.add_task(
-                generate_face_embedding_for_student,
+                tracked_job("face_embedding", generate_face_embedding_for_student),
                 roll_no
             )
         
@@ -200,6 +203,7 @@ async def upload_my_photo(
                     # Update email if it doesn't match
                     if student.email != current_user.email and student.dtu_email != current_user.email:
                         student.email = current_user.email
+                        bump_enrolled_class_versions(db, [student.student_id])
                         db.commit()
                         db.refresh(student)
                         logger.info(f"Updated student email to {current_user.email}")
@@ -234,6 +238,7 @@ async def upload_my_photo(
             if enrolled_student:
                 logger.info(f"Found enrolled student: {enrolled_student.roll_no}, updating email")
                 enrolled_student.email = current_user.email
+                bump_enrolled_class_versions(db, [enrolled_student.student_id])
                 db.commit()
                 db.refresh(enrolled_student)
                 student = enrolled_student
@@ -250,6 +255,7 @@ async def upload_my_photo(
                 if student_with_photo:
                     logger.info(f"Found student with photo: {student_with_photo.roll_no}, updating email")
                     student_with_photo.email = current_user.email
+                    bump_enrolled_class_versions(db, [student_with_photo.student_id])
                     db.commit()
                     db.refresh(student_with_photo)
                     student = student_with_photo
@@ -312,12 +318,13 @@ async def upload_my_photo(
         
         # Update student photo URL in database
         student.photo_url = url
+        bump_enrolled_class_versions(db, [student.student_id])
         db.commit()
         
         # Trigger face embedding generation in background (non-blocking)
         if settings.face_api_service_url:
             background_tasks.add_task(
-                generate_face_embedding_for_student,
+                tracked_job("face_embedding", generate_face_embedding_for_student),
                 student.roll_no
             )
         
@@ -1,19 +1,18 @@
 """
 Student routes - for student app functionality.
 """
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.orm import Session
 from sqlalchemy import text
 from uuid import UUID
 from typing import List
-from datetime import datetime
 
 from app.db import get_db
 from app.auth.dependencies import get_current_user, UserContext
 from app.models.user import UserRole
 from app.models.student import Student
 from app.models.class_model import Class, ClassStudent
-from app.models.attendance import AttendanceSession, AttendanceStatusRecord
+from app.services.change_versions import make_etag, not_modified, set_validators, student_fingerprint
 from app.schemas.student import (
     StudentClassInfo,
     StudentAttendanceStats,
@@ -23,6 +22,44 @@ from app.schemas.student import (
 router = APIRouter(prefix="/students", tags=["Students"])
 
 
+STUDENT_CLASSES_QUERY = text("""
+    SELECT
+        c.id,
+        c.code,
+        c.name,
+        c.section,
+        c.teacher_type,
+        c.ltp_pattern,
+        c.practical_group,
+        u.name AS teacher_name,
+        u.email AS teacher_email
+    FROM class_students cs
+    JOIN classes c ON c.id = cs.class_id
+    JOIN users u ON u.user_id = c.teacher_user_id
+    WHERE cs.student_id = :student_id
+    ORDER BY c.code, c.section
+""")
+
+CLASS_SCHEDULES_QUERY = text("""
+    SELECT class_id, day_of_week, start_time, end_time
+    FROM class_schedules
+    WHERE class_id = ANY(:class_ids)
+    ORDER BY class_id, day_of_week
+""")
+
+STUDENT_CLASS_RECORDS_QUERY = text("""
+    SELECT
+        ss.session_date,
+        LOWER(a.status::text) AS status,
+        a.recognized_by_ai,
+        a.similarity_score
+    FROM sessions ss
+    LEFT JOIN attendance a ON a.session_id = ss.session_id AND a.student_id = :student_id
+    WHERE ss.class_id = :class_id
+    ORDER BY ss.session_date DESC
+""")
+
+
 async def require_student(
     current_user: UserContext = Depends(get_current_user)
 ) -> UserContext:
@@ -39,104 +76,85 @@ async def require_student(
 
 @router.get("/me/classes", response_model=List[StudentClassInfo])
 async def get_my_classes(
+    request: Request,
+    response: Response,
     current_user: UserContext = Depends(require_student),
     db: Session = Depends(get_db)
 ):
     """
     Get all classes that the current student is enrolled in.
     
+    Answers If-None-Match with 304 while none of the student's classes changed.
+    
     Returns:
         List of classes with basic info (code, name, section, teacher name, schedule)
         Empty list if student exists but not enrolled in any classes yet
     """
-    # Find the student record by email
-    student = db.query(Student).filter(
-        (Student.email == current_user.email) | (Student.dtu_email == current_user.email)
-    ).first()
+    # Find the student record by email, with its classes' change counters
+    student = student_fingerprint(db, current_user.email)
     
     if not student:
         # Student is in allowed_student_emails but not enrolled in any class yet
         # Return empty list instead of error
         return []
     
+    etag = make_etag("student-classes", student.student_id, student.classes_digest)
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
+    set_validators(response, etag)
+    
     # Get all classes the student is enrolled in
-    query = text("""
-        SELECT 
-            c.id,
-            c.code,
-            c.name,
-            c.section,
-            c.teacher_type,
-            c.ltp_pattern,
-            c.practical_group,
-            u.name as teacher_name,
-            u.email as teacher_email
-        FROM classes c
-        JOIN class_students cs ON c.id = cs.class_id
-        JOIN users u ON c.teacher_id = u.id
-        WHERE cs.student_id = :student_id
-        ORDER BY c.code, c.section
-    """)
+    rows = db.execute(STUDENT_CLASSES_QUERY, {"student_id": student.student_id}).fetchall()
+    if not rows:
+        return []
     
-    result = db.execute(query, {"student_id": str(student.id)})
-    rows = result.fetchall()
+    # Schedules for all of them in one round trip
+    schedules = {}
+    schedule_rows = db.execute(CLASS_SCHEDULES_QUERY, {"class_ids": [row.id for row in rows]})
+    for sched in schedule_rows:
+        schedules.setdefault(sched.class_id, []).append({
+            "dayOfWeek": sched.day_of_week,
+            "startTime": sched.start_time.strftime("%H:%M"),
+            "endTime": sched.end_time.strftime("%H:%M")
+        })
     
-    classes = []
-    for row in rows:
-        class_id = row[0]
-        
-        # Get schedule for this class
-        schedule_query = text("""
-            SELECT day_of_week, start_time, end_time
-            FROM class_schedules
-            WHERE class_id = :class_id
-            ORDER BY day_of_week
-        """)
-        schedule_result = db.execute(schedule_query, {"class_id": class_id})
-        schedule_rows = schedule_result.fetchall()
-        
-        schedule = [
-            {
-                "dayOfWeek": sched[0],
-                "startTime": sched[1].strftime("%H:%M"),
-                "endTime": sched[2].strftime("%H:%M")
-            }
-            for sched in schedule_rows
-        ]
-        
-        classes.append(StudentClassInfo(
-            id=str(row[0]),  # Convert UUID to string
-            code=row[1],
-            name=row[2],
-            section=row[3],
-            teacherType=row[4],
-            ltpPattern=row[5],
-            practicalGroup=row[6],
-            teacherName=row[7],
-            teacherEmail=row[8],
-            schedule=schedule
-        ))
-    
-    return classes
+    return [
+        StudentClassInfo(
+            id=str(row.id),  # Convert UUID to string
+            code=row.code,
+            name=row.name,
+            section=row.section,
+            teacherType=row.teacher_type,
+            ltpPattern=row.ltp_pattern,
+            practicalGroup=row.practical_group,
+            teacherName=row.teacher_name,
+            teacherEmail=row.teacher_email,
+            schedule=schedules.get(row.id, [])
+        )
+        for row in rows
+    ]
 
 
 @router.get("/me/classes/{class_id}/attendance", response_model=StudentAttendanceStats)
 async def get_my_attendance_for_class(
     class_id: UUID,
+    request: Request,
+    response: Response,
     current_user: UserContext = Depends(require_student),
     db: Session = Depends(get_db)
 ):
     """
     Get attendance statistics for the current student in a specific class.
     
+    Answers If-None-Match with 304 while the class is unchanged.
+    
     Returns:
         - Summary stats (present, absent, late, excused counts and percentage)
         - List of all attendance records with dates and statuses
     """
-    # Find the student record by email
-    student = db.query(Student).filter(
-        (Student.email == current_user.email) | (Student.dtu_email == current_user.email)
-    ).first()
+    # Find the student record by email, with this class's change counter
+    student = student_fingerprint(db, current_user.email, class_id)
     
     if not student:
         raise HTTPException(
@@ -144,78 +162,45 @@ async def get_my_attendance_for_class(
             detail="Student record not found"
         )
     
-    # Verify student is enrolled in this class
-    enrollment = db.query(ClassStudent).filter(
+    # Roster changes bump the class counter too, so enrollment is covered
+    etag = make_etag("student-attendance", class_id, student.student_id, student.class_version)
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
+    set_validators(response, etag)
+    
+    # Verify student is enrolled in this class (and load the class with it)
+    class_obj = db.query(Class).join(ClassStudent).filter(
         ClassStudent.class_id == class_id,
-        ClassStudent.student_id == student.id
+        ClassStudent.student_id == student.student_id
     ).first()
     
-    if not enrollment:
+    if not class_obj:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="You are not enrolled in this class"
         )
     
-    # Get class info
-    class_obj = db.query(Class).filter(Class.id == class_id).first()
-    if not class_obj:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Class not found"
-        )
-    
-    # Get attendance statistics
-    stats_query = text("""
-        SELECT 
-            COUNT(CASE WHEN asr.status = 'present' THEN 1 END) as present_count,
-            COUNT(CASE WHEN asr.status = 'absent' THEN 1 END) as absent_count,
-            COUNT(CASE WHEN asr.status = 'late' THEN 1 END) as late_count,
-            COUNT(CASE WHEN asr.status = 'excused' THEN 1 END) as excused_count,
-            COUNT(asr.status) as total_count
-        FROM attendance_sessions asess
-        LEFT JOIN attendance_statuses asr ON asess.id = asr.session_id AND asr.student_id = :student_id
-        WHERE asess.class_id = :class_id
-    """)
-    
-    stats_result = db.execute(stats_query, {
-        "student_id": str(student.id),
-        "class_id": str(class_id)
-    })
-    stats_row = stats_result.fetchone()
-    
-    present_count = stats_row[0] or 0
-    absent_count = stats_row[1] or 0
-    late_count = stats_row[2] or 0
-    excused_count = stats_row[3] or 0
-    total_count = stats_row[4] or 0
-    
-    percentage = round((present_count / total_count * 100), 2) if total_count > 0 else 0.0
+    # One row per session; status is NULL where the student was never marked
+    records_rows = db.execute(STUDENT_CLASS_RECORDS_QUERY, {
+        "student_id": student.student_id,
+        "class_id": class_id
+    }).fetchall()
     
-    # Get individual attendance records
-    records_query = text("""
-        SELECT 
-            asess.session_date,
-            COALESCE(asr.status, 'absent') as status,
-            asr.recognized_by_ai,
-            asr.similarity_score
-        FROM attendance_sessions asess
-        LEFT JOIN attendance_statuses asr ON asess.id = asr.session_id AND asr.student_id = :student_id
-        WHERE asess.class_id = :class_id
-        ORDER BY asess.session_date DESC
-    """)
+    counts = {"present": 0, "absent": 0, "late": 0, "excused": 0}
+    for row in records_rows:
+        if row.status in counts:
+            counts[row.status] += 1
+    total_count = sum(counts.values())
     
-    records_result = db.execute(records_query, {
-        "student_id": str(student.id),
-        "class_id": str(class_id)
-    })
-    records_rows = records_result.fetchall()
+    percentage = round((counts["present"] / total_count * 100), 2) if total_count > 0 else 0.0
     
     records = [
         AttendanceRecord(
-            date=row[0].isoformat(),
-            status=row[1],
-            recognizedByAi=row[2] or False,
-            similarityScore=float(row[3]) if row[3] else None
+            date=row.session_date.isoformat(),
+            status=row.status or "absent",
+            recognizedByAi=row.recognized_by_ai or False,
+            similarityScore=float(row.similarity_score) if row.similarity_score else None
         )
         for row in records_rows
     ]
@@ -226,11 +211,11 @@ async def get_my_attendance_for_class(
         classCode=class_obj.code,
         section=class_obj.section,
         studentName=student.name,
-        rollNo=student.roll_no,
-        presentCount=present_count,
-        absentCount=absent_count,
-        lateCount=late_count,
-        excusedCount=excused_count,
+        rollNo=student.roll_no or student.university_roll,
+        presentCount=counts["present"],
+        absentCount=counts["absent"],
+        lateCount=counts["late"],
+        excusedCount=counts["excused"],
         totalCount=total_count,
         percentage=percentage,
         records=records
@@ -47,6 +47,21 @@ class UpdateStatusesRequest(BaseModel):
     updates: List[StatusUpdate]
 
 
+class MergePresenceRequest(BaseModel):
+    """
+    Request to merge sidecar BT presence with face-recognition results.
+    
+    Students seen by BT or marked present by face recognition become PRESENT;
+    other face results keep their status; everyone else on the roster is
+    marked ABSENT unless markAbsent is false.
+    """
+    face_results: List[StatusUpdate] = Field(default_factory=list, alias="faceResults")
+    mark_absent: bool = Field(True, alias="markAbsent")
+    
+    class Config:
+        populate_by_name = True
+
+
 class StudentStatusResponse(BaseModel):
     """Response for a single student's attendance status."""
     roll_no: str = Field(..., alias="rollNo")
@@ -0,0 +1,23 @@
+"""
+Export-related Pydantic schemas.
+"""
+from pydantic import BaseModel, Field
+from uuid import UUID
+from typing import Optional
+from datetime import datetime
+
+
+class ExportJobResponse(BaseModel):
+    """State of a background export job."""
+    job_id: UUID = Field(..., alias="jobId")
+    status: str  # pending, running, done, failed
+    format: str
+    filters: dict
+    row_count: Optional[int] = Field(None, alias="rowCount")
+    error: Optional[str] = None
+    created_at: datetime = Field(..., alias="createdAt")
+    finished_at: Optional[datetime] = Field(None, alias="finishedAt")
+    download_url: Optional[str] = Field(None, alias="downloadUrl")
+    
+    class Config:
+        populate_by_name = True
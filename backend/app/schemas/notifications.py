@@ -22,8 +22,8 @@ class NotificationCreate(NotificationBase):
 
 class NotificationResponse(NotificationBase):
     """Schema for notification response."""
-    id: UUID
-    student_id: UUID
+    id: int = Field(..., validation_alias="notification_id")
+    student_id: Optional[int] = None
     attendance_threshold: Optional[float] = None
     is_read: bool
     created_at: datetime
@@ -46,3 +46,11 @@ class SendNotificationToStudentsRequest(BaseModel):
     class_id: Optional[UUID] = Field(None, description="Optional: limit to specific class")
 
 
+
+
+class BroadcastNotificationRequest(BaseModel):
+    """Schema for a message to all students, or to all students of a class."""
+    title: str
+    message: str
+    notification_type: Optional[str] = Field("manual", description="Type: 'manual', 'system'")
+    class_id: Optional[UUID] = Field(None, description="Optional: only students enrolled in this class")
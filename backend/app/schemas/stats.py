@@ -3,7 +3,7 @@ Statistics-related Pydantic schemas.
 """
 from pydantic import BaseModel, Field
 from uuid import UUID
-from typing import Optional
+from typing import Dict, List, Optional
 
 
 class StudentAttendanceSummary(BaseModel):
@@ -20,3 +20,39 @@ class StudentAttendanceSummary(BaseModel):
     
     class Config:
         populate_by_name = True
+
+
+class RegisterSessions(BaseModel):
+    """Register columns, oldest first."""
+    session_ids: List[UUID] = Field(alias="sessionId")
+    dates: List[str] = Field(alias="date")
+
+    class Config:
+        populate_by_name = True
+
+
+class RegisterStudents(BaseModel):
+    """Register rows, in roll-number order."""
+    student_ids: List[UUID] = Field(alias="studentId")
+    roll_nos: List[str] = Field(alias="rollNo")
+    names: List[str] = Field(alias="name")
+
+    class Config:
+        populate_by_name = True
+
+
+class ClassRegister(BaseModel):
+    """
+    Students x sessions attendance register.
+
+    matrix holds one legend character per cell, row-major: the cell for
+    student i and session j is matrix[i * len(sessions.date) + j].
+    """
+    class_id: UUID = Field(alias="classId")
+    sessions: RegisterSessions
+    students: RegisterStudents
+    legend: Dict[str, Optional[str]]
+    matrix: str
+
+    class Config:
+        populate_by_name = True
@@ -0,0 +1,152 @@
+"""
+Compact attendance context for grounded AI agent prompts.
+
+Turns stats_service summaries into a terse CSV-like block that fits a token
+budget, so agents answer from real data without clients pasting dumps into
+the query.
+"""
+from sqlalchemy.orm import Session
+from uuid import UUID
+from typing import List, Optional
+
+from app.models.user import UserRole
+from app.services import stats_service
+
+
+# Rough token estimate for English/CSV text; good enough for budgeting
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the token count of a prompt fragment."""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def _pct(value: float) -> str:
+    return f"{value:.1f}"
+
+
+def _fit_rows(header: List[str], rows: List[str], token_budget: int, noun: str) -> str:
+    """
+    Append rows to the header lines until the budget is reached.
+
+    Rows must already be ordered most-important first; whatever does not fit
+    is replaced by a single "+N more ... omitted" line.
+    """
+    lines = list(header)
+    used = estimate_tokens("\n".join(lines))
+
+    for index, row in enumerate(rows):
+        remaining = len(rows) - index
+        # Reserve room for the omission note unless this is the last row
+        reserve = 0 if remaining == 1 else estimate_tokens(f"+{remaining} more {noun} omitted") + 1
+        cost = estimate_tokens(row) + 1
+        if used + cost + reserve > token_budget:
+            lines.append(f"+{remaining} more {noun} omitted")
+            break
+        lines.append(row)
+        used += cost
+
+    return "\n".join(lines)
+
+
+def serialize_class_summary(summary: dict, token_budget: int) -> str:
+    """
+    Serialize a class summary, lowest attendance first.
+
+    Args:
+        summary: Result of stats_service.get_class_attendance_summary
+        token_budget: Maximum estimated tokens for the block
+
+    Returns:
+        Context block as text
+    """
+    cls = summary["class"]
+    students = summary["students"]
+    average = (
+        sum(s["percentage"] for s in students) / len(students) if students else 0.0
+    )
+
+    header = [
+        f"CLASS {cls.code} {cls.name} sec {cls.section or '-'} | "
+        f"sessions {summary['session_count']} | students {len(students)} | avg {_pct(average)}%",
+        "roll,name,P,A,L,E,pct",
+    ]
+    ordered = sorted(students, key=lambda s: (s["percentage"], s["roll_no"] or ""))
+    rows = [
+        f"{s['roll_no']},{s['name']},{s['present_count']},{s['absent_count']},"
+        f"{s['late_count']},{s['excused_count']},{_pct(s['percentage'])}"
+        for s in ordered
+    ]
+    return _fit_rows(header, rows, token_budget, "students")
+
+
+def serialize_student_summary(summary: dict, token_budget: int) -> str:
+    """
+    Serialize a student summary, lowest attendance first.
+
+    Args:
+        summary: Result of stats_service.get_student_attendance_summary
+        token_budget: Maximum estimated tokens for the block
+
+    Returns:
+        Context block as text
+    """
+    student = summary["student"]
+    classes = summary["classes"]
+    present = sum(c["present_count"] for c in classes)
+    total = sum(c["total_count"] for c in classes)
+    overall = present / total * 100 if total else 0.0
+
+    header = [
+        f"STUDENT {student.roll_no or student.university_roll} {student.name} "
+        f"({student.department or '-'}) | classes {len(classes)} | overall {_pct(overall)}%",
+        "code,section,P,A,L,E,pct",
+    ]
+    ordered = sorted(classes, key=lambda c: (c["percentage"], c["code"]))
+    rows = [
+        f"{c['code']},{c['section'] or '-'},{c['present_count']},{c['absent_count']},"
+        f"{c['late_count']},{c['excused_count']},{_pct(c['percentage'])}"
+        for c in ordered
+    ]
+    return _fit_rows(header, rows, token_budget, "classes")
+
+
+def build_attendance_context(
+    db: Session,
+    user_id: int,
+    role: UserRole,
+    token_budget: int,
+    class_id: Optional[UUID] = None,
+    roll_no: Optional[str] = None
+) -> str:
+    """
+    Build the grounding block for a class and/or a student.
+
+    When both are given the budget is split evenly between them.
+
+    Args:
+        db: Database session
+        user_id: Requesting user's numeric id
+        role: User role
+        token_budget: Maximum estimated tokens for the whole block
+        class_id: Optional class UUID
+        roll_no: Optional student roll number
+
+    Returns:
+        Context block as text
+
+    Raises:
+        HTTPException: If the class or student is not found or not visible
+    """
+    parts = []
+    budget = token_budget // 2 if class_id and roll_no else token_budget
+
+    if class_id:
+        summary = stats_service.get_class_attendance_summary(db, class_id, user_id, role)
+        parts.append(serialize_class_summary(summary, budget))
+    if roll_no:
+        summary = stats_service.get_student_attendance_summary(db, roll_no, user_id, role)
+        parts.append(serialize_student_summary(summary, budget))
+
+    return "\n\n".join(parts)
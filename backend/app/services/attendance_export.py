@@ -0,0 +1,276 @@
+"""
+Bulk export of attendance status rows as CSV or Parquet.
+
+Rows are read through a server-side cursor (a psycopg2 named cursor via
+stream_results) settings.export_batch_rows at a time, and every batch is
+encoded and handed on before the next one is fetched, so memory stays flat
+no matter how many rows match. The same AttendanceExport iterator feeds the
+streaming HTTP response and the background job that writes the artifact to
+blob storage.
+"""
+import csv
+import io
+import json
+import logging
+import tempfile
+from dataclasses import dataclass
+from datetime import date, datetime, timezone
+from typing import Iterator, List, Optional
+from uuid import UUID
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.db import SessionLocal, engine
+from app.models.export_job import ExportJob
+from app.services.azure_storage import azure_storage
+
+
+logger = logging.getLogger(__name__)
+
+EXPORT_KIND = "attendance"
+
+# No ORDER BY: sorting millions of rows would delay the first byte until
+# the whole result had been read
+EXPORT_QUERY = text("""
+    SELECT
+        ss.session_date,
+        c.id::text AS class_id,
+        c.code AS class_code,
+        c.section,
+        c.name AS class_name,
+        s.university_roll,
+        s.roll_no,
+        s.name AS student_name,
+        s.department,
+        a.status::text AS status,
+        a.recognized_by_ai,
+        a.similarity_score,
+        a.marked_at
+    FROM attendance a
+    JOIN sessions ss ON ss.session_id = a.session_id
+    JOIN classes c ON c.id = ss.class_id
+    JOIN students s ON s.student_id = a.student_id
+    WHERE (CAST(:class_id AS uuid) IS NULL OR ss.class_id = CAST(:class_id AS uuid))
+      AND (CAST(:department AS text) IS NULL OR s.department = :department)
+      AND (CAST(:from_date AS date) IS NULL OR ss.session_date >= :from_date)
+      AND (CAST(:to_date AS date) IS NULL OR ss.session_date <= :to_date)
+""")
+
+PARQUET_SCHEMA = pa.schema([
+    ("session_date", pa.date32()),
+    ("class_id", pa.string()),
+    ("class_code", pa.string()),
+    ("section", pa.string()),
+    ("class_name", pa.string()),
+    ("university_roll", pa.string()),
+    ("roll_no", pa.string()),
+    ("student_name", pa.string()),
+    ("department", pa.string()),
+    ("status", pa.string()),
+    ("recognized_by_ai", pa.bool_()),
+    ("similarity_score", pa.decimal128(5, 2)),
+    ("marked_at", pa.timestamp("us", tz="UTC")),
+])
+
+EXPORT_COLUMNS = PARQUET_SCHEMA.names
+
+CONTENT_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+
+@dataclass(frozen=True)
+class ExportFilters:
+    """Which status rows to export; None means no restriction."""
+    department: Optional[str] = None
+    class_id: Optional[UUID] = None
+    from_date: Optional[date] = None
+    to_date: Optional[date] = None
+
+    def params(self) -> dict:
+        return {
+            "department": self.department,
+            "class_id": str(self.class_id) if self.class_id else None,
+            "from_date": self.from_date,
+            "to_date": self.to_date,
+        }
+
+    def to_json(self) -> dict:
+        """JSON-safe form, as stored on an ExportJob."""
+        return {
+            "department": self.department,
+            "classId": str(self.class_id) if self.class_id else None,
+            "from": self.from_date.isoformat() if self.from_date else None,
+            "to": self.to_date.isoformat() if self.to_date else None,
+        }
+
+    @classmethod
+    def from_json(cls, data: dict) -> "ExportFilters":
+        return cls(
+            department=data.get("department"),
+            class_id=UUID(data["classId"]) if data.get("classId") else None,
+            from_date=date.fromisoformat(data["from"]) if data.get("from") else None,
+            to_date=date.fromisoformat(data["to"]) if data.get("to") else None,
+        )
+
+
+def export_filename(fmt: str) -> str:
+    return f"attendance-{datetime.now(timezone.utc):%Y%m%d-%H%M%S}.{fmt}"
+
+
+def estimate_rows(filters: ExportFilters) -> int:
+    """The planner's row estimate for the export: no rows are read."""
+    with engine.connect() as connection:
+        plan = connection.execute(
+            text(f"EXPLAIN (FORMAT JSON) {EXPORT_QUERY.text}"), filters.params()
+        ).scalar()
+    plan = json.loads(plan) if isinstance(plan, str) else plan
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+class _DrainableSink(io.RawIOBase):
+    """
+    Write-only file for ParquetWriter whose buffered bytes can be taken out
+    after each row group, while tell() keeps counting from the start of the
+    file (Parquet footers record absolute offsets).
+    """
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        chunk = bytes(data)
+        self._chunks.append(chunk)
+        self._position += len(chunk)
+        return len(chunk)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+class AttendanceExport:
+    """
+    Iterator of encoded chunks (one per fetched batch) of an attendance export.
+
+    Opens its own connection, so it can outlive the request's session (a
+    StreamingResponse body is iterated after the endpoint has returned).
+    rows holds the number of rows encoded so far.
+    """
+
+    def __init__(self, filters: ExportFilters, fmt: str):
+        self.filters = filters
+        self.format = fmt
+        self.rows = 0
+
+    @property
+    def content_type(self) -> str:
+        return CONTENT_TYPES[self.format]
+
+    def _batches(self) -> Iterator[list]:
+        with engine.connect() as connection:
+            result = connection.execution_options(
+                stream_results=True, max_row_buffer=settings.export_batch_rows
+            ).execute(EXPORT_QUERY, self.filters.params())
+            for batch in result.partitions(settings.export_batch_rows):
+                self.rows += len(batch)
+                yield batch
+
+    def _csv(self) -> Iterator[bytes]:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(EXPORT_COLUMNS)
+        for batch in self._batches():
+            writer.writerows(batch)
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue().encode("utf-8")
+
+    def _parquet(self) -> Iterator[bytes]:
+        sink = _DrainableSink()
+        # One row group per fetched batch
+        with pq.ParquetWriter(sink, PARQUET_SCHEMA, compression="zstd") as writer:
+            for batch in self._batches():
+                columns = list(zip(*batch))
+                writer.write_table(pa.Table.from_arrays(
+                    [pa.array(column, type=field.type) for column, field in zip(columns, PARQUET_SCHEMA)],
+                    schema=PARQUET_SCHEMA
+                ))
+                yield sink.drain()
+        yield sink.drain()
+
+    def __iter__(self) -> Iterator[bytes]:
+        return self._parquet() if self.format == "parquet" else self._csv()
+
+
+# ----- Background jobs -----
+
+def create_export_job(db: Session, user_id: int, fmt: str, filters: ExportFilters) -> ExportJob:
+    """Record a pending export job; schedule run_export_job with its id."""
+    job = ExportJob(
+        kind=EXPORT_KIND,
+        format=fmt,
+        filters=filters.to_json(),
+        status="pending",
+        requested_by_user_id=user_id
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+def run_export_job(job_id: UUID) -> None:
+    """
+    Background task: write the export to a spooled temp file, then upload
+    it through the storage backend and record the blob on the job.
+    """
+    db = SessionLocal()
+    try:
+        job = db.query(ExportJob).filter(ExportJob.job_id == job_id).first()
+        if not job:
+            return
+        job.status = "running"
+        db.commit()
+
+        try:
+            export = AttendanceExport(ExportFilters.from_json(job.filters), job.format)
+            filename = export_filename(job.format)
+            # Kept in memory up to the limit, then spilled to disk
+            with tempfile.SpooledTemporaryFile(max_size=settings.export_spool_max_bytes) as artifact:
+                for chunk in export:
+                    artifact.write(chunk)
+                artifact.seek(0)
+                job.blob_name = azure_storage.upload_export(
+                    job_id=str(job.job_id),
+                    file_data=artifact,
+                    filename=filename,
+                    content_type=export.content_type,
+                    requested_by=str(job.requested_by_user_id)
+                )
+            job.row_count = export.rows
+            job.status = "done"
+        except Exception as e:
+            logger.exception("Export job %s failed", job_id)
+            job.status = "failed"
+            job.error = str(e)
+
+        job.finished_at = datetime.now(timezone.utc)
+        db.commit()
+    finally:
+        db.close()
@@ -1,24 +1,27 @@
 """
 Attendance-related business logic services.
 """
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import and_
+import base64
+from sqlalchemy.orm import Session
+from sqlalchemy import and_, func, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from uuid import UUID
-from typing import List, Optional
+from typing import Dict, List, Optional, Set, Tuple, Union
 from datetime import datetime, date as dt_date
 from fastapi import HTTPException, status
 
 from app.models.attendance import AttendanceSession, AttendanceStatusRecord, AttendanceStatus
 from app.models.class_model import Class, ClassStudent
 from app.models.student import Student
-from app.models.user import UserRole
+from app.models.user import User, UserRole
 from app.schemas.attendance import StatusUpdate
+from app.services.change_versions import bump_class_versions
 
 
 def create_attendance_session(
     db: Session,
     class_id: UUID,
-    user_id: UUID,
+    user_id: int,
     role: UserRole,
     session_date: str,
     processed_image_url: Optional[str] = None
@@ -29,7 +32,7 @@ def create_attendance_session(
     Args:
         db: Database session
         class_id: Class UUID
-        user_id: User UUID
+        user_id: Requesting user's numeric id
         role: User role
         session_date: Date string (YYYY-MM-DD)
         processed_image_url: Optional image URL
@@ -50,7 +53,7 @@ def create_attendance_session(
         )
     
     # Check authorization
-    if role != UserRole.ADMIN and cls.teacher_id != user_id:
+    if role != UserRole.ADMIN and cls.teacher_user_id != user_id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="You do not have permission to create sessions for this class"
@@ -75,31 +78,29 @@ def create_attendance_session(
     
     if existing_session:
         # Return existing session instead of failing
-        return {
-            "sessionId": str(existing_session.id),
-            "classId": str(existing_session.class_id),
-            "sessionDate": existing_session.session_date.isoformat(),
-            "teacherId": str(existing_session.teacher_id),
-            "processedImageUrl": existing_session.processed_image_url,
-            "createdAt": existing_session.created_at.isoformat()
-        }
+        return _session_dict(existing_session)
     
     # Create new session
     session = AttendanceSession(
         class_id=class_id,
-        teacher_id=user_id,
+        teacher_user_id=user_id,
         session_date=parsed_date,
         processed_image_url=processed_image_url
     )
     db.add(session)
+    bump_class_versions(db, [class_id])
     db.commit()
     db.refresh(session)
     
+    return _session_dict(session)
+
+
+def _session_dict(session: AttendanceSession) -> dict:
     return {
-        "sessionId": str(session.id),
+        "sessionId": str(session.session_id),
         "classId": str(session.class_id),
         "sessionDate": session.session_date.isoformat(),
-        "teacherId": str(session.teacher_id),
+        "teacherId": str(session.teacher_user_id),
         "processedImageUrl": session.processed_image_url,
         "createdAt": session.created_at.isoformat()
     }
@@ -108,17 +109,21 @@ def create_attendance_session(
 def update_attendance_statuses(
     db: Session,
     session_id: UUID,
-    user_id: UUID,
+    user_id: int,
     role: UserRole,
     updates: List[StatusUpdate]
 ) -> List[dict]:
     """
     Update attendance statuses for students in a session.
     
+    Roll numbers are resolved against the class roster in one query, so
+    students who are not enrolled are skipped, and all statuses are
+    written with a single bulk upsert.
+    
     Args:
         db: Database session
         session_id: Session UUID
-        user_id: User UUID
+        user_id: Requesting user's numeric id
         role: User role
         updates: List of status updates
         
@@ -128,179 +133,455 @@ def update_attendance_statuses(
     Raises:
         HTTPException: If not authorized or session not found
     """
-    # Get session with class info
-    session = db.query(AttendanceSession).options(
-        joinedload(AttendanceSession.class_obj)
-    ).filter(AttendanceSession.id == session_id).first()
+    session = get_session_for_update(db, session_id, user_id, role)
     
-    if not session:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Attendance session not found"
-        )
+    roll_nos = {update.roll_no for update in updates}
+    by_roll: Dict[str, int] = dict(
+        db.query(Student.roll_no, Student.student_id).join(
+            ClassStudent, ClassStudent.student_id == Student.student_id
+        ).filter(
+            ClassStudent.class_id == session.class_id,
+            Student.roll_no.in_(roll_nos)
+        ).all()
+    ) if roll_nos else {}
     
-    # Check authorization
-    if role != UserRole.ADMIN and session.teacher_id != user_id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="You do not have permission to update this session"
-        )
-    
-    # Process each update
+    # Keyed by student so a repeated roll number keeps its last update
+    rows: Dict[int, dict] = {}
     for update in updates:
-        # Find student by roll_no
-        student = db.query(Student).filter(Student.roll_no == update.roll_no).first()
-        
-        if not student:
-            # Skip if student not found
-            continue
-        
-        # Verify student is enrolled in the class
-        enrollment = db.query(ClassStudent).filter(
-            and_(
-                ClassStudent.class_id == session.class_id,
-                ClassStudent.student_id == student.id
-            )
-        ).first()
-        
-        if not enrollment:
-            # Student not enrolled in this class, skip
+        student_id = by_roll.get(update.roll_no)
+        if student_id is None:
+            # Unknown or not enrolled in this class, skip
             continue
-        
-        # Validate status
         try:
-            status_enum = AttendanceStatus(update.status.lower())
+            status_enum = AttendanceStatus(update.status.upper())
         except ValueError:
             # Invalid status, skip
             continue
-        
-        # Upsert attendance status
-        existing_status = db.query(AttendanceStatusRecord).filter(
-            and_(
-                AttendanceStatusRecord.session_id == session_id,
-                AttendanceStatusRecord.student_id == student.id
-            )
-        ).first()
-        
-        if existing_status:
-            existing_status.status = status_enum
-            existing_status.recognized_by_ai = update.recognized_by_ai
-            existing_status.similarity_score = update.similarity_score
-        else:
-            new_status = AttendanceStatusRecord(
-                session_id=session_id,
-                student_id=student.id,
-                status=status_enum,
-                recognized_by_ai=update.recognized_by_ai,
-                similarity_score=update.similarity_score
-            )
-            db.add(new_status)
+        rows[student_id] = {
+            "student_id": student_id,
+            "status": status_enum,
+            "recognized_by_ai": update.recognized_by_ai,
+            "similarity_score": update.similarity_score,
+        }
     
+    bulk_upsert_statuses(db, session_id, list(rows.values()))
+    bump_class_versions(db, [session.class_id])
     db.commit()
     
     # Return updated statuses
-    statuses = db.query(AttendanceStatusRecord).filter(
-        AttendanceStatusRecord.session_id == session_id
-    ).options(joinedload(AttendanceStatusRecord.student)).all()
+    statuses = db.query(
+        Student.roll_no,
+        Student.name,
+        AttendanceStatusRecord.status,
+        AttendanceStatusRecord.recognized_by_ai,
+        AttendanceStatusRecord.similarity_score
+    ).join(
+        Student, Student.student_id == AttendanceStatusRecord.student_id
+    ).filter(AttendanceStatusRecord.session_id == session_id).all()
     
     return [
         {
-            "rollNo": s.student.roll_no,
-            "name": s.student.name,
-            "status": s.status.value,
-            "recognizedByAi": s.recognized_by_ai,
-            "similarityScore": float(s.similarity_score) if s.similarity_score else None
+            "rollNo": roll_no,
+            "name": name,
+            "status": status_value.value,
+            "recognizedByAi": recognized_by_ai,
+            "similarityScore": float(similarity_score) if similarity_score is not None else None
         }
-        for s in statuses
+        for roll_no, name, status_value, recognized_by_ai, similarity_score in statuses
     ]
 
 
+# Newest first; session_id breaks ties so the order (and the cursor) is total
+SESSION_ORDER = (AttendanceSession.session_date.desc(), AttendanceSession.session_id.desc())
+
+
+def encode_session_cursor(session_date: dt_date, session_id: UUID) -> str:
+    """Opaque cursor pointing just past the given session in SESSION_ORDER."""
+    raw = f"{session_date.isoformat()}|{session_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_session_cursor(cursor: str) -> Tuple[dt_date, UUID]:
+    """
+    Inverse of encode_session_cursor.
+    
+    Raises:
+        HTTPException: If the cursor is malformed
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        session_date, session_id = raw.split("|")
+        return dt_date.fromisoformat(session_date), UUID(session_id)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+
+def _parse_date_param(value: Optional[str], name: str) -> Optional[dt_date]:
+    if not value:
+        return None
+    try:
+        return dt_date.fromisoformat(value)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid '{name}' date format. Use YYYY-MM-DD"
+        )
+
+
 def get_attendance_sessions(
     db: Session,
     class_id: UUID,
-    user_id: UUID,
+    user_id: int,
     role: UserRole,
     from_date: Optional[str] = None,
-    to_date: Optional[str] = None
-) -> List[dict]:
+    to_date: Optional[str] = None,
+    limit: int = 60,
+    cursor: Optional[str] = None,
+    columnar: bool = False
+) -> Tuple[Union[List[dict], dict], Optional[str]]:
     """
-    Get attendance sessions for a class within a date range.
+    Get one page of a class's attendance sessions, newest first.
+    
+    Pages are keyset-paginated on (session_date, session_id): each page
+    is one indexed range read no matter how deep into the history it is.
+    Loads plain column tuples (no ORM objects) and returns JSON-ready
+    data, so the route can hand it straight to the response.
     
     Args:
         db: Database session
         class_id: Class UUID
-        user_id: User UUID
+        user_id: Requesting user's numeric id
         role: User role
-        from_date: Start date (YYYY-MM-DD)
-        to_date: End date (YYYY-MM-DD)
+        from_date: Start date (YYYY-MM-DD), inclusive
+        to_date: End date (YYYY-MM-DD), inclusive
+        limit: Maximum number of sessions in the page
+        cursor: nextCursor of the previous page
+        columnar: Return the roster once plus per-session status arrays
+            instead of a nested status object per student per session
         
     Returns:
-        List of sessions with statuses
+        (page, next cursor or None on the last page). The page is a list
+        of sessions with statuses, or the columnar dict (see
+        _columnar_sessions).
         
     Raises:
-        HTTPException: If not authorized
+        HTTPException: If not authorized, or a date or the cursor is malformed
     """
+    from_dt = _parse_date_param(from_date, "from")
+    to_dt = _parse_date_param(to_date, "to")
+    if from_dt and to_dt and from_dt > to_dt:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="'from' must not be after 'to'"
+        )
+    after = decode_session_cursor(cursor) if cursor else None
+    
     # Verify class ownership
-    cls = db.query(Class).filter(Class.id == class_id).first()
+    teacher_user_id = db.query(Class.teacher_user_id).filter(Class.id == class_id).first()
     
-    if not cls:
+    if not teacher_user_id:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Class not found"
         )
     
-    if role != UserRole.ADMIN and cls.teacher_id != user_id:
+    if role != UserRole.ADMIN and teacher_user_id[0] != user_id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="You do not have permission to view this class's attendance"
         )
     
     # Build query
-    query = db.query(AttendanceSession).filter(
+    query = db.query(
+        AttendanceSession.session_id,
+        AttendanceSession.session_date,
+        AttendanceSession.processed_image_url,
+        AttendanceSession.created_at,
+        User.uuid
+    ).outerjoin(
+        User, User.user_id == AttendanceSession.teacher_user_id
+    ).filter(
         AttendanceSession.class_id == class_id
     )
     
-    # Apply date filters
-    if from_date:
-        try:
-            from_dt = dt_date.fromisoformat(from_date)
-            query = query.filter(AttendanceSession.session_date >= from_dt)
-        except ValueError:
-            pass
+    if from_dt:
+        query = query.filter(AttendanceSession.session_date >= from_dt)
+    if to_dt:
+        query = query.filter(AttendanceSession.session_date <= to_dt)
+    if after:
+        query = query.filter(
+            tuple_(AttendanceSession.session_date, AttendanceSession.session_id) < after
+        )
     
-    if to_date:
-        try:
-            to_dt = dt_date.fromisoformat(to_date)
-            query = query.filter(AttendanceSession.session_date <= to_dt)
-        except ValueError:
-            pass
+    # One extra row tells us whether another page follows
+    sessions = query.order_by(*SESSION_ORDER).limit(limit + 1).all()
+    next_cursor = None
+    if len(sessions) > limit:
+        sessions = sessions[:limit]
+        next_cursor = encode_session_cursor(sessions[-1][1], sessions[-1][0])
+    
+    if not sessions:
+        return (_columnar_sessions(class_id, [], []) if columnar else []), None
+    
+    # All statuses of the selected sessions in one query
+    rows = db.query(
+        AttendanceStatusRecord.session_id,
+        Student.roll_no,
+        Student.name,
+        AttendanceStatusRecord.status,
+        AttendanceStatusRecord.recognized_by_ai,
+        AttendanceStatusRecord.similarity_score
+    ).join(
+        Student, Student.student_id == AttendanceStatusRecord.student_id
+    ).filter(
+        AttendanceStatusRecord.session_id.in_([session[0] for session in sessions])
+    ).all()
     
-    sessions = query.options(
-        joinedload(AttendanceSession.statuses).joinedload(AttendanceStatusRecord.student)
-    ).order_by(AttendanceSession.session_date.desc()).all()
+    if columnar:
+        return _columnar_sessions(class_id, sessions, rows), next_cursor
+    
+    statuses: Dict[UUID, List[dict]] = {session[0]: [] for session in sessions}
+    for session_id, roll_no, name, status_value, recognized_by_ai, similarity_score in rows:
+        statuses[session_id].append({
+            "rollNo": roll_no,
+            "name": name,
+            "status": status_value.value,
+            "recognizedByAi": recognized_by_ai,
+            "similarityScore": float(similarity_score) if similarity_score is not None else None
+        })
     
     # Format response
-    result = []
-    for session in sessions:
-        statuses = [
+    class_id_str = str(class_id)
+    return [
+        {
+            "sessionId": str(session_id),
+            "classId": class_id_str,
+            "sessionDate": session_date.isoformat(),
+            "teacherId": str(teacher_uuid) if teacher_uuid else None,
+            "processedImageUrl": processed_image_url,
+            "createdAt": created_at.isoformat(),
+            "statuses": statuses[session_id]
+        }
+        for session_id, session_date, processed_image_url, created_at, teacher_uuid in sessions
+    ], next_cursor
+
+
+def _columnar_sessions(class_id: UUID, sessions: list, rows: list) -> dict:
+    """
+    Columnar page: every student with a status in the page once, sorted by
+    roll number, and per session arrays aligned with that list (null where
+    the student has no record for the session).
+    """
+    students = sorted({(roll_no, name) for _, roll_no, name, *_ in rows})
+    position = {roll_no: n for n, (roll_no, _) in enumerate(students)}
+    
+    columns = {
+        session[0]: ([None] * len(students), [None] * len(students), [None] * len(students))
+        for session in sessions
+    }
+    for session_id, roll_no, _, status_value, recognized_by_ai, similarity_score in rows:
+        session_statuses, session_ai, session_scores = columns[session_id]
+        n = position[roll_no]
+        session_statuses[n] = status_value.value
+        session_ai[n] = recognized_by_ai
+        session_scores[n] = float(similarity_score) if similarity_score is not None else None
+    
+    return {
+        "classId": str(class_id),
+        "students": {
+            "rollNo": [roll_no for roll_no, _ in students],
+            "name": [name for _, name in students],
+        },
+        "sessions": [
             {
-                "rollNo": s.student.roll_no,
-                "name": s.student.name,
-                "status": s.status.value,
-                "recognizedByAi": s.recognized_by_ai,
-                "similarityScore": float(s.similarity_score) if s.similarity_score else None
+                "sessionId": str(session_id),
+                "sessionDate": session_date.isoformat(),
+                "teacherId": str(teacher_uuid) if teacher_uuid else None,
+                "processedImageUrl": processed_image_url,
+                "createdAt": created_at.isoformat(),
+                "statuses": columns[session_id][0],
+                "recognizedByAi": columns[session_id][1],
+                "similarityScore": columns[session_id][2],
             }
-            for s in session.statuses
-        ]
+            for session_id, session_date, processed_image_url, created_at, teacher_uuid in sessions
+        ],
+    }
+
+
+def bulk_upsert_statuses(db: Session, session_id: UUID, rows: List[dict]) -> None:
+    """
+    Insert or update many attendance rows for a session in one statement.
+    
+    Args:
+        db: Database session
+        session_id: Session UUID
+        rows: Dicts with student_id, status, recognized_by_ai, similarity_score
+    """
+    if not rows:
+        return
+    
+    stmt = pg_insert(AttendanceStatusRecord).values([
+        {"session_id": session_id, **row} for row in rows
+    ])
+    stmt = stmt.on_conflict_do_update(
+        constraint="uq_attendance_session_student",
+        set_={
+            "status": stmt.excluded.status,
+            "recognized_by_ai": stmt.excluded.recognized_by_ai,
+            "similarity_score": stmt.excluded.similarity_score,
+            "marked_at": func.now(),
+        }
+    )
+    db.execute(stmt)
+
+
+def get_session_for_update(db: Session, session_id: UUID, user_id: int, role: UserRole) -> AttendanceSession:
+    """
+    Load a session the user may write statuses for.
+    
+    Args:
+        db: Database session
+        session_id: Session UUID
+        user_id: Requesting user's numeric id
+        role: User role
         
-        result.append({
-            "sessionId": str(session.id),
-            "classId": str(session.class_id),
-            "sessionDate": session.session_date.isoformat(),
-            "teacherId": str(session.teacher_id),
-            "processedImageUrl": session.processed_image_url,
-            "createdAt": session.created_at.isoformat(),
-            "statuses": statuses
-        })
+    Returns:
+        The AttendanceSession
+        
+    Raises:
+        HTTPException: If not authorized or session not found
+    """
+    session = db.query(AttendanceSession).filter(
+        AttendanceSession.session_id == session_id
+    ).first()
+    
+    if not session:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Attendance session not found"
+        )
+    
+    if role != UserRole.ADMIN and session.teacher_user_id != user_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You do not have permission to update this session"
+        )
+    
+    return session
+
+
+def merge_presence_into_session(
+    db: Session,
+    session: AttendanceSession,
+    present_emails: Set[str],
+    face_results: List[StatusUpdate],
+    mark_absent: bool = True
+) -> dict:
+    """
+    Merge BT presence and face-recognition results into a session's statuses.
+    
+    The class roster is loaded once and used to map both emails and roll
+    numbers to student ids; the merged result is written with a single
+    bulk upsert.
+    
+    Args:
+        db: Database session
+        session: Session from get_session_for_update
+        present_emails: Lower-cased emails reported present by the BT sidecar
+        face_results: Status updates from face recognition, keyed by roll number
+        mark_absent: Whether roster students with no signal are marked ABSENT
+        
+    Returns:
+        Dictionary with the merged statuses and a summary of the merge
+    """
+    # One query for the whole roster; all matching below happens in memory
+    roster = db.query(
+        Student.student_id,
+        Student.roll_no,
+        Student.name,
+        func.lower(Student.email),
+        func.lower(Student.dtu_email)
+    ).join(
+        ClassStudent, ClassStudent.student_id == Student.student_id
+    ).filter(ClassStudent.class_id == session.class_id).all()
+    
+    by_roll: Dict[str, int] = {}
+    by_email: Dict[str, int] = {}
+    names: Dict[int, tuple] = {}
+    for student_id, roll_no, name, email, dtu_email in roster:
+        names[student_id] = (roll_no, name)
+        if roll_no:
+            by_roll[roll_no] = student_id
+        for address in (email, dtu_email):
+            if address:
+                by_email[address] = student_id
+    
+    merged: Dict[int, dict] = {}
+    
+    for update in face_results:
+        student_id = by_roll.get(update.roll_no)
+        if student_id is None:
+            continue
+        try:
+            status_enum = AttendanceStatus(update.status.upper())
+        except ValueError:
+            continue
+        merged[student_id] = {
+            "student_id": student_id,
+            "status": status_enum,
+            "recognized_by_ai": update.recognized_by_ai,
+            "similarity_score": update.similarity_score,
+        }
+    
+    bt_matched = 0
+    unmatched_emails = []
+    for email in present_emails:
+        student_id = by_email.get(email)
+        if student_id is None:
+            unmatched_emails.append(email)
+            continue
+        bt_matched += 1
+        existing = merged.get(student_id)
+        if existing is None or existing["status"] == AttendanceStatus.ABSENT:
+            merged[student_id] = {
+                "student_id": student_id,
+                "status": AttendanceStatus.PRESENT,
+                "recognized_by_ai": existing["recognized_by_ai"] if existing else False,
+                "similarity_score": existing["similarity_score"] if existing else None,
+            }
+    
+    if mark_absent:
+        for student_id in names:
+            merged.setdefault(student_id, {
+                "student_id": student_id,
+                "status": AttendanceStatus.ABSENT,
+                "recognized_by_ai": False,
+                "similarity_score": None,
+            })
     
-    return result
+    bulk_upsert_statuses(db, session.session_id, list(merged.values()))
+    bump_class_versions(db, [session.class_id])
+    db.commit()
+    
+    statuses = [
+        {
+            "rollNo": names[row["student_id"]][0],
+            "name": names[row["student_id"]][1],
+            "status": row["status"].value,
+            "recognizedByAi": row["recognized_by_ai"],
+            "similarityScore": float(row["similarity_score"]) if row["similarity_score"] is not None else None
+        }
+        for row in merged.values()
+    ]
+    
+    return {
+        "statuses": statuses,
+        "summary": {
+            "present": sum(1 for row in merged.values() if row["status"] == AttendanceStatus.PRESENT),
+            "btMatched": bt_matched,
+            "unmatchedEmails": sorted(unmatched_emails)
+        }
+    }
@@ -9,6 +9,7 @@ from azure.storage.blob import BlobServiceClient, BlobSasPermissions, generate_b
 from azure.core.exceptions import ResourceNotFoundError
 
 from app.config import settings
+from app.metrics import observe_blob_upload
 
 
 class AzureStorageService:
@@ -18,6 +19,7 @@ class AzureStorageService:
     CONTAINER_STUDENT_PHOTOS = "student-photos"
     CONTAINER_ASSIGNMENTS = "class-uploads"
     CONTAINER_ATTENDANCE_IMAGES = "attendance-images"
+    CONTAINER_EXPORTS = "exports"
     
     def __init__(self):
         """Initialize Azure Blob Storage client."""
@@ -35,6 +37,7 @@ class AzureStorageService:
             self.CONTAINER_STUDENT_PHOTOS,
             self.CONTAINER_ASSIGNMENTS,
             self.CONTAINER_ATTENDANCE_IMAGES,
+            self.CONTAINER_EXPORTS,
         ]
         
         for container_name in containers:
@@ -90,11 +93,12 @@ class AzureStorageService:
             blob=blob_name
         )
         
-        blob_client.upload_blob(
-            file_data,
-            content_settings=ContentSettings(content_type=content_type),
-            overwrite=True
-        )
+        with observe_blob_upload(self.CONTAINER_STUDENT_PHOTOS, file_data):
+            blob_client.upload_blob(
+                file_data,
+                content_settings=ContentSettings(content_type=content_type),
+                overwrite=True
+            )
         
         return blob_client.url
     
@@ -136,12 +140,13 @@ class AzureStorageService:
             "original_filename": filename
         }
         
-        blob_client.upload_blob(
-            file_data,
-            content_settings=ContentSettings(content_type=content_type),
-            metadata=metadata,
-            overwrite=True
-        )
+        with observe_blob_upload(self.CONTAINER_ASSIGNMENTS, file_data):
+            blob_client.upload_blob(
+                file_data,
+                content_settings=ContentSettings(content_type=content_type),
+                metadata=metadata,
+                overwrite=True
+            )
         
         return blob_client.url
     
@@ -181,15 +186,62 @@ class AzureStorageService:
             "session_id": session_id
         }
         
-        blob_client.upload_blob(
-            file_data,
-            content_settings=ContentSettings(content_type=content_type),
-            metadata=metadata,
-            overwrite=True
-        )
+        with observe_blob_upload(self.CONTAINER_ATTENDANCE_IMAGES, file_data):
+            blob_client.upload_blob(
+                file_data,
+                content_settings=ContentSettings(content_type=content_type),
+                metadata=metadata,
+                overwrite=True
+            )
         
         return blob_client.url
     
+    def upload_export(
+        self,
+        job_id: str,
+        file_data: BinaryIO,
+        filename: str,
+        content_type: str,
+        requested_by: str
+    ) -> str:
+        """
+        Upload a finished export artifact (admins only).
+        
+        Args:
+            job_id: Export job ID
+            file_data: File binary data, read from its current position
+            filename: Download filename
+            content_type: MIME type of the file
+            requested_by: User ID who requested the export
+            
+        Returns:
+            Blob name within CONTAINER_EXPORTS (hand out SAS URLs, not the blob URL)
+        """
+        blob_name = f"exports/{job_id}/{filename}"
+        
+        blob_client = self.blob_service_client.get_blob_client(
+            container=self.CONTAINER_EXPORTS,
+            blob=blob_name
+        )
+        
+        metadata = {
+            "requested_by": requested_by,
+            "job_id": job_id
+        }
+        
+        with observe_blob_upload(self.CONTAINER_EXPORTS, file_data):
+            blob_client.upload_blob(
+                file_data,
+                content_settings=ContentSettings(
+                    content_type=content_type,
+                    content_disposition=f'attachment; filename="{filename}"'
+                ),
+                metadata=metadata,
+                overwrite=True
+            )
+        
+        return blob_name
+    
     def delete_blob(self, container_name: str, blob_name: str) -> bool:
         """
         Delete a blob from storage.
@@ -0,0 +1,65 @@
+"""
+Client for the BT check-in sidecar.
+
+A single pooled httpx client is shared by all requests in a worker so that
+presence lookups reuse keep-alive connections instead of opening one per call.
+"""
+import logging
+from typing import Optional, Set
+
+import httpx
+from fastapi import HTTPException, status
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+_client: Optional[httpx.AsyncClient] = None
+
+
+def get_sidecar_client() -> httpx.AsyncClient:
+    """Get the shared sidecar client, creating it on first use."""
+    global _client
+    if not settings.bt_sidecar_url:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="BT sidecar is not configured. Please set BT_SIDECAR_URL in environment variables."
+        )
+    if _client is None:
+        headers = {"X-API-Key": settings.bt_sidecar_api_key} if settings.bt_sidecar_api_key else {}
+        _client = httpx.AsyncClient(
+            base_url=settings.bt_sidecar_url,
+            headers=headers,
+            timeout=settings.bt_sidecar_timeout_seconds,
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+        )
+    return _client
+
+
+async def close_sidecar_client() -> None:
+    """Close the shared client (called on application shutdown)."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+async def fetch_present_emails(class_id: str) -> Set[str]:
+    """
+    Get the lower-cased emails the sidecar currently reports as present for a class.
+    
+    Raises:
+        HTTPException: 503 if the sidecar is not configured, 502 if it fails
+    """
+    client = get_sidecar_client()
+    try:
+        response = await client.get(f"/bt-checkin/{class_id}/present")
+        response.raise_for_status()
+    except httpx.HTTPError as e:
+        logger.warning(f"BT sidecar presence lookup failed for class {class_id}: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_502_BAD_GATEWAY,
+            detail="Failed to fetch BT presence from sidecar"
+        )
+    
+    return {email.lower() for email in response.json().get("present", []) if email}
@@ -0,0 +1,107 @@
+"""
+Bulk loading helpers built on PostgreSQL COPY.
+
+Rows are streamed into COPY ... FROM STDIN from any iterable, so large
+uploads never need to be materialized as one big string or go through
+per-row INSERTs.
+"""
+import io
+from typing import Any, Iterable, Iterator, Sequence
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+
+def _csv_field(value: Any) -> str:
+    # None is an unquoted empty field, which COPY CSV reads as NULL; every
+    # other text value is quoted, so empty strings stay empty strings
+    if value is None:
+        return ""
+    if isinstance(value, (bool, int, float)):
+        return str(value)
+    return '"' + str(value).replace('"', '""') + '"'
+
+
+class _CsvRowStream(io.RawIOBase):
+    """Read-only file object that renders rows to CSV lazily as COPY reads."""
+
+    def __init__(self, rows: Iterable[Sequence[Any]]):
+        self._rows: Iterator[Sequence[Any]] = iter(rows)
+        self._buffer = b""
+        self.row_count = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def _render(self, row: Sequence[Any]) -> bytes:
+        return (",".join(map(_csv_field, row)) + "\n").encode("utf-8")
+
+    def readinto(self, target) -> int:
+        if len(self._buffer) < len(target):
+            parts = [self._buffer]
+            pending = len(self._buffer)
+            while pending < len(target):
+                row = next(self._rows, None)
+                if row is None:
+                    break
+                line = self._render(row)
+                parts.append(line)
+                pending += len(line)
+                self.row_count += 1
+            self._buffer = b"".join(parts)
+        size = min(len(target), len(self._buffer))
+        target[:size] = self._buffer[:size]
+        self._buffer = self._buffer[size:]
+        return size
+
+
+def copy_rows(
+    db: Session,
+    table: str,
+    columns: Sequence[str],
+    rows: Iterable[Sequence[Any]]
+) -> int:
+    """
+    COPY rows into a table on the session's connection and transaction.
+
+    Args:
+        db: Database session
+        table: Target table name (trusted, not user input)
+        columns: Target column names, in row order
+        rows: Iterable of row tuples; None values are loaded as NULL,
+            everything else via its str() form
+
+    Returns:
+        Number of rows copied
+    """
+    stream = _CsvRowStream(rows)
+    sql = f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)"
+
+    # Raw psycopg2 connection for the session's current transaction
+    dbapi_connection = db.connection().connection
+    with dbapi_connection.cursor() as cursor:
+        cursor.copy_expert(sql, io.BufferedReader(stream, buffer_size=1 << 16))
+
+    return stream.row_count
+
+
+def create_staging_table(
+    db: Session,
+    name: str,
+    columns: Sequence[str]
+) -> None:
+    """
+    Create a temporary staging table that is dropped at commit.
+    
+    Any leftover table of the same name from earlier in the same
+    transaction is replaced.
+
+    Args:
+        db: Database session
+        name: Staging table name (trusted, not user input)
+        columns: Column definitions, e.g. ["line_no integer", "email text"]
+    """
+    db.execute(text(f"DROP TABLE IF EXISTS pg_temp.{name}"))
+    db.execute(text(
+        f"CREATE TEMP TABLE {name} ({', '.join(columns)}) ON COMMIT DROP"
+    ))
@@ -0,0 +1,204 @@
+"""
+Change counters and ETags for conditional GETs.
+
+Writers bump a per-class or per-student counter in the same transaction
+as their change. Read endpoints fold the counters their response depends
+on into an ETag with one indexed query, and answer If-None-Match with
+304 Not Modified before running the queries that build the body.
+"""
+import hashlib
+from typing import Iterable, Optional
+
+from fastapi import Request, Response, status
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+
+CLASS_SCOPE = "class"
+STUDENT_SCOPE = "student"
+# One counter for all broadcast notifications: broadcasts are rare admin
+# actions, and bumping every student's counter would undo the point of
+# storing them once
+BROADCAST_SCOPE = "broadcast"
+BROADCAST_KEY = "all"
+
+# Clients must revalidate every time, and only their own cache may store it
+CACHE_CONTROL = "private, no-cache"
+
+# Keys are sorted so concurrent bumps lock rows in the same order
+BUMP_QUERY = text("""
+    INSERT INTO change_versions (scope, key, version)
+    SELECT :scope, key, 1
+    FROM unnest(CAST(:keys AS text[])) AS key
+    ORDER BY key
+    ON CONFLICT (scope, key) DO UPDATE
+    SET version = change_versions.version + 1, updated_at = now()
+""")
+
+BUMP_ENROLLED_CLASSES_QUERY = text("""
+    INSERT INTO change_versions (scope, key, version)
+    SELECT 'class', class_id::text, 1
+    FROM class_students
+    WHERE student_id = ANY(:student_ids)
+    GROUP BY class_id
+    ORDER BY class_id::text
+    ON CONFLICT (scope, key) DO UPDATE
+    SET version = change_versions.version + 1, updated_at = now()
+""")
+
+# Every visible class with its counter: adding, deleting or changing any
+# of them changes the digest
+CLASS_LIST_FINGERPRINT_QUERY = text("""
+    SELECT
+        count(*) AS classes,
+        md5(COALESCE(string_agg(c.id::text || ':' || c.version, ',' ORDER BY c.id), '')) AS digest
+    FROM (
+        SELECT id, COALESCE((
+            SELECT version FROM change_versions
+            WHERE scope = 'class' AND key = classes.id::text
+        ), 0) AS version
+        FROM classes
+        WHERE CAST(:all_classes AS boolean) OR teacher_user_id = :user_id
+    ) c
+""")
+
+# The signed-in student, their notification counter, the broadcast counter,
+# the counters of the classes they are enrolled in, the enrolled class ids
+# alone (which class broadcasts reach them) and the counter of :class_id
+# (0 when None)
+STUDENT_FINGERPRINT_QUERY = text("""
+    WITH student AS (
+        SELECT student_id, name, roll_no, university_roll
+        FROM students
+        WHERE email = :email OR dtu_email = :email
+        LIMIT 1
+    )
+    SELECT
+        st.student_id,
+        st.name,
+        st.roll_no,
+        st.university_roll,
+        COALESCE((
+            SELECT version FROM change_versions
+            WHERE scope = 'student' AND key = st.student_id::text
+        ), 0) AS student_version,
+        COALESCE((
+            SELECT version FROM change_versions
+            WHERE scope = 'broadcast' AND key = 'all'
+        ), 0) AS broadcast_version,
+        (
+            SELECT md5(COALESCE(string_agg(cs.class_id::text || ':' || COALESCE(cv.version, 0), ',' ORDER BY cs.class_id), ''))
+            FROM class_students cs
+            LEFT JOIN change_versions cv ON cv.scope = 'class' AND cv.key = cs.class_id::text
+            WHERE cs.student_id = st.student_id
+        ) AS classes_digest,
+        (
+            SELECT md5(COALESCE(string_agg(cs.class_id::text, ',' ORDER BY cs.class_id), ''))
+            FROM class_students cs
+            WHERE cs.student_id = st.student_id
+        ) AS enrollments_digest,
+        COALESCE((
+            SELECT version FROM change_versions
+            WHERE scope = 'class' AND key = CAST(:class_id AS text)
+        ), 0) AS class_version
+    FROM student st
+""")
+
+# The leaderboard ranks everyone, so any class change may reorder it; the
+# sum only grows, because counters are never reset or deleted
+LEADERBOARD_FINGERPRINT_QUERY = text("""
+    SELECT
+        (SELECT COALESCE(sum(version), 0) FROM change_versions WHERE scope = 'class') AS class_versions,
+        (SELECT student_id FROM students WHERE email = :email OR dtu_email = :email LIMIT 1) AS student_id
+""")
+
+
+# ----- Writers -----
+
+def bump_class_versions(db: Session, class_ids: Iterable) -> None:
+    """Mark classes as changed (roster, schedule, sessions, statuses). Caller commits."""
+    keys = sorted({str(class_id) for class_id in class_ids})
+    if keys:
+        db.execute(BUMP_QUERY, {"scope": CLASS_SCOPE, "keys": keys})
+
+
+def bump_student_versions(db: Session, student_ids: Iterable[int]) -> None:
+    """Mark students' notifications as changed. Caller commits."""
+    keys = sorted({str(student_id) for student_id in student_ids})
+    if keys:
+        db.execute(BUMP_QUERY, {"scope": STUDENT_SCOPE, "keys": keys})
+
+
+def bump_broadcast_version(db: Session) -> None:
+    """Mark broadcast notifications as changed. Caller commits."""
+    db.execute(BUMP_QUERY, {"scope": BROADCAST_SCOPE, "keys": [BROADCAST_KEY]})
+
+
+def bump_enrolled_class_versions(db: Session, student_ids: Iterable[int]) -> None:
+    """Mark every class these students are enrolled in as changed (profile edits). Caller commits."""
+    ids = sorted(set(student_ids))
+    if ids:
+        db.execute(BUMP_ENROLLED_CLASSES_QUERY, {"student_ids": ids})
+
+
+# ----- Readers -----
+
+def make_etag(*parts) -> str:
+    """
+    Weak ETag over the given parts.
+
+    Weak because it versions the data, not the bytes: the same version may
+    go out gzip- or brotli-encoded or uncompressed.
+    """
+    digest = hashlib.sha1("|".join(str(part) for part in parts).encode()).hexdigest()[:24]
+    return f'W/"{digest}"'
+
+
+def class_list_fingerprint(db: Session, user_id: int, all_classes: bool):
+    return db.execute(CLASS_LIST_FINGERPRINT_QUERY, {"user_id": user_id, "all_classes": all_classes}).one()
+
+
+def student_fingerprint(db: Session, email: str, class_id=None):
+    """The student row for this email plus its counters (class_version: class_id's), or None."""
+    return db.execute(STUDENT_FINGERPRINT_QUERY, {
+        "email": email,
+        "class_id": str(class_id) if class_id else None
+    }).first()
+
+
+def leaderboard_fingerprint(db: Session, email: str):
+    return db.execute(LEADERBOARD_FINGERPRINT_QUERY, {"email": email}).one()
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    # If-None-Match uses weak comparison (RFC 9110 13.1.2)
+    if header.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in header.split(","))
+
+
+def not_modified(request: Request, etag: str) -> Optional[Response]:
+    """
+    A 304 response if the request's If-None-Match matches etag, else None.
+
+    Args:
+        request: Incoming request
+        etag: Current ETag of the resource
+
+    Returns:
+        Response with status 304 and the validator headers, or None
+    """
+    header = request.headers.get("if-none-match")
+    if header and _etag_matches(header, etag):
+        return Response(
+            status_code=status.HTTP_304_NOT_MODIFIED,
+            headers={"ETag": etag, "Cache-Control": CACHE_CONTROL}
+        )
+    return None
+
+
+def set_validators(response: Response, etag: str) -> None:
+    """Attach the ETag and Cache-Control headers to a 200 response."""
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
@@ -1,16 +1,17 @@
 """
 Class-related business logic services.
 """
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.orm import Session, joinedload, selectinload
 from uuid import UUID
 from typing import List, Optional
-from datetime import datetime, time as dt_time, date as dt_date
+from datetime import time as dt_time, date as dt_date
 from fastapi import HTTPException, status
 
 from app.models.class_model import Class, ClassSchedule, ClassReschedule, ClassStudent
-from app.models.student import Student
-from app.models.user import User, UserRole, AllowedStudentEmail
+from app.models.user import User, UserRole
 from app.schemas.classes import ClassResponse, ScheduleInfo, RescheduleInfo, StudentInClass, StudentInput
+from app.services.change_versions import bump_class_versions
+from app.services.roster_import import import_roster
 
 
 def create_class(
@@ -73,28 +74,29 @@ def create_class(
     return new_class
 
 
-def get_classes_for_user(db: Session, user_id: UUID, role: UserRole) -> List[dict]:
+def get_classes_for_user(db: Session, user_id: int, role: UserRole) -> List[dict]:
     """
     Get classes for a user based on their role.
     
     Args:
         db: Database session
-        user_id: User's UUID
+        user_id: User's integer id (users.user_id)
         role: User's role (teacher or admin)
         
     Returns:
         List of class dictionaries with full details
     """
-    # Build query with eager loading
+    # One IN query per collection, instead of a single join whose rows
+    # multiply schedules x reschedules x students for every class
     query = db.query(Class).options(
-        joinedload(Class.schedules),
-        joinedload(Class.reschedules),
-        joinedload(Class.student_enrollments).joinedload(ClassStudent.student)
+        selectinload(Class.schedules),
+        selectinload(Class.reschedules),
+        selectinload(Class.student_enrollments).joinedload(ClassStudent.student)
     )
     
     # Filter by teacher if not admin
     if role != UserRole.ADMIN:
-        query = query.filter(Class.teacher_id == user_id)
+        query = query.filter(Class.teacher_user_id == user_id)
     
     classes = query.all()
     
@@ -128,7 +130,7 @@ def get_classes_for_user(db: Session, user_id: UUID, role: UserRole) -> List[dic
         # Format students
         students = [
             {
-                "studentId": str(enrollment.student.id),
+                "studentId": str(enrollment.student.uuid),
                 "rollNo": enrollment.student.roll_no,
                 "name": enrollment.student.name,
                 "photoUrl": enrollment.student.photo_url,
@@ -152,7 +154,7 @@ def get_classes_for_user(db: Session, user_id: UUID, role: UserRole) -> List[dic
             "teacherType": cls.teacher_type,
             "ltpPattern": cls.ltp_pattern,
             "practicalGroup": cls.practical_group,
-            "teacherId": str(cls.teacher_id),
+            "teacherId": str(cls.teacher_user_id),
             "schedule": schedules,
             "reschedules": reschedules,
             "students": students,
@@ -163,14 +165,14 @@ def get_classes_for_user(db: Session, user_id: UUID, role: UserRole) -> List[dic
     return result
 
 
-def verify_class_ownership(db: Session, class_id: UUID, user_id: UUID, role: UserRole) -> Class:
+def verify_class_ownership(db: Session, class_id: UUID, user_id: int, role: UserRole) -> Class:
     """
     Verify that a user has permission to access a class.
     
     Args:
         db: Database session
         class_id: Class UUID
-        user_id: User UUID
+        user_id: User's integer id (users.user_id)
         role: User role
         
     Returns:
@@ -192,7 +194,7 @@ def verify_class_ownership(db: Session, class_id: UUID, user_id: UUID, role: Use
         return cls
     
     # Teacher can only access their own classes
-    if cls.teacher_id != user_id:
+    if cls.teacher_user_id != user_id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="You do not have permission to access this class"
@@ -204,22 +206,26 @@ def verify_class_ownership(db: Session, class_id: UUID, user_id: UUID, role: Use
 def update_class_students(
     db: Session,
     class_id: UUID,
-    user_id: UUID,
+    user_id: int,
     role: UserRole,
     students_data: List[StudentInput]
-) -> List[dict]:
+) -> dict:
     """
     Update students enrolled in a class.
     
+    Rows are merged in bulk (see roster_import.import_roster): students are
+    upserted, enrolled, and their emails whitelisted for the student app.
+    
     Args:
         db: Database session
         class_id: Class UUID
-        user_id: User UUID
+        user_id: User's integer id (users.user_id)
         role: User role
         students_data: List of student information
         
     Returns:
-        Updated list of students in the class
+        Dictionary with the updated roster and an import summary
+        (received/inserted/updated/skipped/enrolled/allowedEmails)
         
     Raises:
         HTTPException: If not authorized or class not found
@@ -227,136 +233,22 @@ def update_class_students(
     # Verify ownership
     cls = verify_class_ownership(db, class_id, user_id, role)
     
-    # Upsert students and add to class
-    for student_input in students_data:
-        # Check if student exists by roll_no
-        student = db.query(Student).filter(Student.roll_no == student_input.roll_no).first()
-        
-        if student:
-            # Update existing student
-            student.name = student_input.name
-            if student_input.photo_url:
-                student.photo_url = student_input.photo_url
-            if student_input.program:
-                student.program = student_input.program
-            if student_input.sp_code:
-                student.sp_code = student_input.sp_code
-            if student_input.semester:
-                student.semester = student_input.semester
-            if student_input.status:
-                student.status = student_input.status
-            if student_input.duration:
-                student.duration = student_input.duration
-            if student_input.email:
-                student.email = student_input.email
-            if student_input.dtu_email:
-                student.dtu_email = student_input.dtu_email
-            if student_input.phone:
-                student.phone = student_input.phone
-        else:
-            # Create new student
-            student = Student(
-                roll_no=student_input.roll_no,
-                name=student_input.name,
-                photo_url=student_input.photo_url,
-                program=student_input.program,
-                sp_code=student_input.sp_code,
-                semester=student_input.semester,
-                status=student_input.status,
-                duration=student_input.duration,
-                email=student_input.email,
-                dtu_email=student_input.dtu_email,
-                phone=student_input.phone
-            )
-            db.add(student)
-            db.flush()  # Get student ID
-        
-        # Add to class if not already enrolled
-        enrollment = db.query(ClassStudent).filter(
-            ClassStudent.class_id == class_id,
-            ClassStudent.student_id == student.id
-        ).first()
-        
-        if not enrollment:
-            enrollment = ClassStudent(class_id=class_id, student_id=student.id)
-            db.add(enrollment)
-        
-        # Auto-add student emails to allowed_student_emails table
-        # This enables students to log into the student app
-        if student_input.email or student_input.dtu_email:
-            _add_to_allowed_student_emails(db, student_input, student)
-    
+    summary = import_roster(db, cls.id, students_data)
     db.commit()
     
-    # Return updated roster
-    return get_class_students_list(db, class_id)
-
-
-def _add_to_allowed_student_emails(db: Session, student_input: StudentInput, student: Student):
-    """
-    Add student email to allowed_student_emails table if not already present.
-    This is called automatically when a teacher uploads student data.
-    """
-    # Clean up 'NULL' strings to actual None
-    email = student_input.email if student_input.email and student_input.email.upper() != 'NULL' else None
-    dtu_email = student_input.dtu_email if student_input.dtu_email and student_input.dtu_email.upper() != 'NULL' else None
-    
-    # Check by primary email
-    if email:
-        existing = db.query(AllowedStudentEmail).filter(
-            AllowedStudentEmail.email == email
-        ).first()
-        
-        if not existing:
-            # Create new allowed student email entry
-            allowed = AllowedStudentEmail(
-                email=email,
-                dtu_email=dtu_email,
-                roll_no=student_input.roll_no,
-                name=student_input.name,
-                program=student_input.program
-            )
-            db.add(allowed)
-        else:
-            # Update existing entry with additional info
-            if dtu_email and not existing.dtu_email:
-                existing.dtu_email = dtu_email
-            if student_input.roll_no and not existing.roll_no:
-                existing.roll_no = student_input.roll_no
-            if student_input.name and not existing.name:
-                existing.name = student_input.name
-            existing.updated_at = datetime.utcnow()
-    
-    # Also check by DTU email if different from primary
-    if dtu_email and dtu_email != email:
-        existing_dtu = db.query(AllowedStudentEmail).filter(
-            AllowedStudentEmail.dtu_email == dtu_email
-        ).first()
-        
-        if not existing_dtu:
-            # Check if this DTU email should be added as primary for another entry
-            existing_by_email = db.query(AllowedStudentEmail).filter(
-                AllowedStudentEmail.email == dtu_email
-            ).first()
-            
-            if not existing_by_email:
-                # Create entry with DTU email as primary if no personal email
-                if not email:
-                    allowed = AllowedStudentEmail(
-                        email=dtu_email,
-                        roll_no=student_input.roll_no,
-                        name=student_input.name,
-                        program=student_input.program
-                    )
-                    db.add(allowed)
-
+    return {
+        "students": get_class_students_list(db, class_id),
+        "summary": summary
+    }
 
 
-def delete_class(db: Session, class_id: UUID, user_id: UUID, role: UserRole) -> None:
+def delete_class(db: Session, class_id: UUID, user_id: int, role: UserRole) -> None:
     """
     Delete a class and all related data if the requester owns it or is admin.
     """
     cls = verify_class_ownership(db, class_id, user_id, role)
+    # Counters outlive the class, so the leaderboard sees the change
+    bump_class_versions(db, [cls.id])
     db.delete(cls)
     db.commit()
 
@@ -371,7 +263,7 @@ def get_class_students_list(db: Session, class_id: UUID) -> List[dict]:
     
     return [
         {
-            "studentId": str(e.student.id),
+            "studentId": str(e.student.uuid),
             "rollNo": e.student.roll_no,
             "name": e.student.name,
             "photoUrl": e.student.photo_url,
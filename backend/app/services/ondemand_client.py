@@ -0,0 +1,205 @@
+"""
+Async client for the OnDemand.io chat API.
+
+One pooled httpx client is shared per worker. Calls are limited per upstream
+endpoint by a semaphore so a burst of slow LLM calls cannot exhaust the
+connection pool, and successful answers are cached for a short TTL keyed on
+(endpoint, plugins, normalized query).
+"""
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+import httpx
+from fastapi import HTTPException, status
+
+from app.config import settings
+from app.metrics import record_cache_lookup
+
+logger = logging.getLogger(__name__)
+
+CacheKey = Tuple[str, Tuple[str, ...], str]
+
+
+def normalize_query(query: str) -> str:
+    """Collapse whitespace and case so trivially different queries share a cache entry."""
+    return " ".join(query.split()).casefold()
+
+
+class TTLCache:
+    """Small LRU cache whose entries expire after a fixed TTL."""
+    
+    def __init__(self, ttl_seconds: float, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[CacheKey, Tuple[float, dict]]" = OrderedDict()
+    
+    def get(self, key: CacheKey) -> Optional[dict]:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+    
+    def set(self, key: CacheKey, value: dict) -> None:
+        if self.ttl_seconds <= 0 or self.max_entries <= 0:
+            return
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+    
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+class OnDemandClient:
+    """Pooled, concurrency-limited and cached client for OnDemand sessions/query."""
+    
+    def __init__(
+        self,
+        url: str,
+        api_key: str,
+        timeout: float = 30.0,
+        max_concurrency: int = 4,
+        cache_ttl_seconds: float = 300,
+        cache_max_entries: int = 256,
+        transport: Optional[httpx.AsyncBaseTransport] = None
+    ):
+        """
+        Args:
+            url: Full URL of the sessions/query endpoint
+            api_key: OnDemand API key
+            timeout: Per-request timeout in seconds
+            max_concurrency: Concurrent calls allowed per upstream endpoint id
+            cache_ttl_seconds: How long successful answers are reused (0 disables)
+            cache_max_entries: Maximum number of cached answers
+            transport: Optional httpx transport, e.g. to point tests at a stub
+        """
+        self.url = url
+        self.max_concurrency = max_concurrency
+        self.cache = TTLCache(cache_ttl_seconds, cache_max_entries)
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._http = httpx.AsyncClient(
+            headers={"apikey": api_key, "Content-Type": "application/json"},
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=max_concurrency * 4, max_keepalive_connections=max_concurrency * 2),
+            transport=transport,
+        )
+    
+    def _semaphore(self, endpoint: str) -> asyncio.Semaphore:
+        semaphore = self._semaphores.get(endpoint)
+        if semaphore is None:
+            semaphore = self._semaphores[endpoint] = asyncio.Semaphore(self.max_concurrency)
+        return semaphore
+    
+    @staticmethod
+    def build_payload(query: str, endpoint: str, plugins: Optional[List[str]], response_mode: str = "sync") -> dict:
+        payload = {
+            "query": query,
+            "endpointId": endpoint,
+            "responseMode": response_mode
+        }
+        if plugins:
+            payload["pluginIds"] = plugins
+        return payload
+    
+    async def query(self, query: str, endpoint: str, plugins: Optional[List[str]] = None) -> dict:
+        """
+        Run a synchronous-mode query, serving repeated queries from the cache.
+        
+        Raises:
+            HTTPException: If the upstream call fails
+        """
+        key: CacheKey = (endpoint, tuple(sorted(plugins or [])), normalize_query(query))
+        cached = self.cache.get(key)
+        record_cache_lookup("ondemand", cached is not None)
+        if cached is not None:
+            return cached
+        
+        async with self._semaphore(endpoint):
+            try:
+                response = await self._http.post(self.url, json=self.build_payload(query, endpoint, plugins))
+                response.raise_for_status()
+                result = response.json()
+            except Exception as e:
+                raise HTTPException(status_code=500, detail=f"OnDemand API error: {str(e)}")
+        
+        self.cache.set(key, result)
+        return result
+    
+    async def stream(self, query: str, endpoint: str, plugins: Optional[List[str]] = None) -> AsyncIterator[str]:
+        """
+        Run a stream-mode query, yielding the payload of each upstream `data:` line.
+        
+        The endpoint's concurrency slot and the upstream connection are held
+        only while the caller keeps iterating; closing or cancelling the
+        iterator aborts the upstream request. Streamed answers are not cached.
+        
+        Raises:
+            HTTPException: If the upstream call fails before streaming starts
+        """
+        payload = self.build_payload(query, endpoint, plugins, response_mode="stream")
+        async with self._semaphore(endpoint):
+            try:
+                async with self._http.stream("POST", self.url, json=payload) as response:
+                    if response.is_error:
+                        await response.aread()
+                        response.raise_for_status()
+                    async for line in response.aiter_lines():
+                        if not line.startswith("data:"):
+                            continue
+                        data = line[len("data:"):].strip()
+                        if data == "[DONE]":
+                            return
+                        yield data
+            except httpx.HTTPError as e:
+                raise HTTPException(status_code=500, detail=f"OnDemand API error: {str(e)}")
+    
+    async def aclose(self) -> None:
+        await self._http.aclose()
+
+
+_client: Optional[OnDemandClient] = None
+
+
+def get_ondemand_client() -> OnDemandClient:
+    """Get the shared OnDemand client, creating it from settings on first use."""
+    global _client
+    if _client is None:
+        if not settings.ondemand_api_key:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="OnDemand AI agents are not configured. Please set ONDEMAND_API_KEY in environment variables."
+            )
+        _client = OnDemandClient(
+            url=settings.ondemand_url,
+            api_key=settings.ondemand_api_key,
+            timeout=settings.ondemand_timeout_seconds,
+            max_concurrency=settings.ondemand_max_concurrency,
+            cache_ttl_seconds=settings.ondemand_cache_ttl_seconds,
+            cache_max_entries=settings.ondemand_cache_max_entries,
+        )
+    return _client
+
+
+def set_ondemand_client(client: Optional[OnDemandClient]) -> None:
+    """Replace the shared client, e.g. with one pointed at a local stub server in tests."""
+    global _client
+    _client = client
+
+
+async def close_ondemand_client() -> None:
+    """Close the shared client (called on application shutdown)."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
@@ -8,6 +8,7 @@ from datetime import date
 
 from app.models.class_model import ClassReschedule, Class
 from app.schemas.reschedule import RescheduleCreate, RescheduleUpdate
+from app.services.change_versions import bump_class_versions
 
 
 def verify_class_ownership(db: Session, class_id: str, user_id: str, is_admin: bool) -> Class:
@@ -61,6 +62,7 @@ def create_reschedule(
     )
     
     db.add(reschedule)
+    bump_class_versions(db, [class_id])
     db.commit()
     db.refresh(reschedule)
     
@@ -128,6 +130,7 @@ def update_reschedule(
     if data.reason is not None:
         reschedule.reason = data.reason
     
+    bump_class_versions(db, [reschedule.class_id])
     db.commit()
     db.refresh(reschedule)
     
@@ -143,5 +146,6 @@ def delete_reschedule(
     """Delete a reschedule."""
     reschedule = get_reschedule_by_id(db, reschedule_id, user_id, is_admin)
     
+    bump_class_versions(db, [reschedule.class_id])
     db.delete(reschedule)
     db.commit()
@@ -0,0 +1,263 @@
+"""
+Staged bulk import of class rosters.
+
+Uploaded rows are COPY'd into a temp table and merged into students,
+class_students and allowed_student_emails with a handful of set-based
+statements, instead of several queries per row.
+"""
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from uuid import UUID
+from typing import Iterable, Iterator, Optional, Tuple
+
+from app.schemas.classes import StudentInput
+from app.services.bulk_load import copy_rows, create_staging_table
+
+
+STAGE_TABLE = "roster_stage"
+
+STAGE_COLUMNS = (
+    "line_no", "university_roll", "roll_no", "name", "photo_url", "program",
+    "batch", "department", "sp_code", "semester", "status", "duration",
+    "email", "dtu_email", "phone",
+)
+
+STAGE_DEFINITION = [
+    "line_no integer NOT NULL",
+    "university_roll text NOT NULL",
+    "roll_no text",
+    "name text NOT NULL",
+    "photo_url text",
+    "program text",
+    "batch text",
+    "department text",
+    "sp_code text",
+    "semester integer",
+    "status text",
+    "duration text",
+    "email text",
+    "dtu_email text",
+    "phone text",
+    "student_id integer",
+]
+
+# Later rows win when an upload repeats a university roll
+DEDUPE_UNIVERSITY_ROLL = text(f"""
+    DELETE FROM {STAGE_TABLE} s
+    USING {STAGE_TABLE} d
+    WHERE s.university_roll = d.university_roll AND s.line_no < d.line_no
+""")
+
+# ...and when two different university rolls claim the same roll number
+DEDUPE_ROLL_NO = text(f"""
+    DELETE FROM {STAGE_TABLE} s
+    USING {STAGE_TABLE} d
+    WHERE s.roll_no = d.roll_no AND s.line_no < d.line_no
+""")
+
+MATCH_BY_UNIVERSITY_ROLL = text(f"""
+    UPDATE {STAGE_TABLE} r
+    SET student_id = s.student_id
+    FROM students s
+    WHERE s.university_roll = r.university_roll
+""")
+
+MATCH_BY_ROLL_NO = text(f"""
+    UPDATE {STAGE_TABLE} r
+    SET student_id = s.student_id
+    FROM students s
+    WHERE r.student_id IS NULL AND r.roll_no IS NOT NULL AND s.roll_no = r.roll_no
+""")
+
+# A roll number already owned by a different student would violate its
+# unique constraint; those rows are skipped rather than failing the upload
+DROP_ROLL_NO_CONFLICTS = text(f"""
+    DELETE FROM {STAGE_TABLE} r
+    USING students s
+    WHERE r.roll_no IS NOT NULL
+      AND s.roll_no = r.roll_no
+      AND s.student_id IS DISTINCT FROM r.student_id
+""")
+
+UPDATE_STUDENTS = text(f"""
+    UPDATE students s SET
+        name = r.name,
+        roll_no = COALESCE(r.roll_no, s.roll_no),
+        photo_url = COALESCE(r.photo_url, s.photo_url),
+        program = COALESCE(r.program, s.program),
+        batch = COALESCE(r.batch, s.batch),
+        department = COALESCE(r.department, s.department),
+        sp_code = COALESCE(r.sp_code, s.sp_code),
+        semester = COALESCE(r.semester, s.semester),
+        status = COALESCE(r.status, s.status),
+        duration = COALESCE(r.duration, s.duration),
+        email = COALESCE(r.email, s.email),
+        dtu_email = COALESCE(r.dtu_email, s.dtu_email),
+        phone = COALESCE(r.phone, s.phone)
+    FROM {STAGE_TABLE} r
+    WHERE s.student_id = r.student_id
+""")
+
+INSERT_STUDENTS = text(f"""
+    WITH inserted AS (
+        INSERT INTO students (
+            uuid, university_roll, roll_no, name, photo_url, program, batch,
+            department, sp_code, semester, status, duration, email, dtu_email, phone
+        )
+        SELECT
+            gen_random_uuid(), university_roll, roll_no, name, photo_url, program, batch,
+            department, sp_code, semester, status, duration, email, dtu_email, phone
+        FROM {STAGE_TABLE}
+        WHERE student_id IS NULL
+        RETURNING student_id, university_roll
+    )
+    UPDATE {STAGE_TABLE} r
+    SET student_id = inserted.student_id
+    FROM inserted
+    WHERE r.university_roll = inserted.university_roll
+""")
+
+ENROLL_STUDENTS = text(f"""
+    INSERT INTO class_students (class_id, student_id)
+    SELECT :class_id, student_id FROM {STAGE_TABLE}
+    ON CONFLICT DO NOTHING
+""")
+
+# Personal email rows: insert, or fill in missing details on the existing
+# entry. A DTU email already held by another entry is left off the new row.
+UPSERT_ALLOWED_BY_EMAIL = text(f"""
+    INSERT INTO allowed_student_emails (id, email, dtu_email, roll_no, name, program)
+    SELECT gen_random_uuid(), r.email, r.dtu_email, r.roll_no, r.name, r.program
+    FROM (
+        SELECT DISTINCT ON (r.email)
+            r.email,
+            CASE
+                WHEN r.dtu_email IS NULL OR r.dtu_email = r.email THEN NULL
+                WHEN EXISTS (
+                    SELECT 1 FROM allowed_student_emails a
+                    WHERE a.dtu_email = r.dtu_email OR a.email = r.dtu_email
+                ) THEN NULL
+                WHEN COUNT(*) OVER (PARTITION BY r.dtu_email) > 1 THEN NULL
+                ELSE r.dtu_email
+            END AS dtu_email,
+            r.roll_no, r.name, r.program
+        FROM {STAGE_TABLE} r
+        WHERE r.email IS NOT NULL
+        ORDER BY r.email, r.line_no DESC
+    ) r
+    ON CONFLICT (email) DO UPDATE SET
+        dtu_email = COALESCE(allowed_student_emails.dtu_email, EXCLUDED.dtu_email),
+        roll_no = COALESCE(allowed_student_emails.roll_no, EXCLUDED.roll_no),
+        name = COALESCE(allowed_student_emails.name, EXCLUDED.name),
+        updated_at = now()
+""")
+
+# Students with only a DTU email get an entry keyed by it, unless that
+# address is already known in either column
+INSERT_ALLOWED_BY_DTU_EMAIL = text(f"""
+    INSERT INTO allowed_student_emails (id, email, roll_no, name, program)
+    SELECT DISTINCT ON (r.dtu_email)
+        gen_random_uuid(), r.dtu_email, r.roll_no, r.name, r.program
+    FROM {STAGE_TABLE} r
+    WHERE r.email IS NULL
+      AND r.dtu_email IS NOT NULL
+      AND NOT EXISTS (
+          SELECT 1 FROM allowed_student_emails a WHERE a.dtu_email = r.dtu_email
+      )
+    ORDER BY r.dtu_email, r.line_no DESC
+    ON CONFLICT (email) DO NOTHING
+""")
+
+
+# The target class and every other class of an updated student
+BUMP_CLASS_VERSIONS = text(f"""
+    INSERT INTO change_versions (scope, key, version)
+    SELECT 'class', cs.class_id::text, 1
+    FROM class_students cs
+    JOIN {STAGE_TABLE} r ON r.student_id = cs.student_id
+    GROUP BY cs.class_id
+    ORDER BY cs.class_id::text
+    ON CONFLICT (scope, key) DO UPDATE
+    SET version = change_versions.version + 1, updated_at = now()
+""")
+
+
+def _clean(value: Optional[str]) -> Optional[str]:
+    """Trim text and treat blanks and literal 'NULL' as missing."""
+    if value is None:
+        return None
+    value = value.strip()
+    if not value or value.upper() == "NULL":
+        return None
+    return value
+
+
+def _stage_row(line_no: int, student: StudentInput) -> Tuple:
+    return (
+        line_no,
+        student.university_roll.strip(),
+        _clean(student.roll_no),
+        student.name.strip(),
+        _clean(student.photo_url),
+        _clean(student.program),
+        _clean(student.batch),
+        _clean(student.department),
+        _clean(student.sp_code),
+        student.semester,
+        _clean(student.status),
+        _clean(student.duration),
+        _clean(student.email),
+        _clean(student.dtu_email),
+        _clean(student.phone),
+    )
+
+
+def _stage_rows(students: Iterable[StudentInput]) -> Iterator[Tuple]:
+    for line_no, student in enumerate(students, start=1):
+        yield _stage_row(line_no, student)
+
+
+def import_roster(db: Session, class_id: UUID, students: Iterable[StudentInput]) -> dict:
+    """
+    Merge uploaded students into a class roster with set-based statements.
+
+    Students are matched by university roll, then by roll number. Matched
+    students are updated (blank fields keep their stored value), the rest
+    are inserted, everyone is enrolled in the class, and their emails are
+    added to the student-app whitelist. The change counters of every class
+    the uploaded students are in are bumped. Runs in the caller's
+    transaction; the caller commits.
+
+    Args:
+        db: Database session
+        class_id: Class UUID (ownership already verified)
+        students: Uploaded rows, in file order
+
+    Returns:
+        Summary with received, inserted, updated, skipped, enrolled and
+        allowedEmails counts
+    """
+    create_staging_table(db, STAGE_TABLE, STAGE_DEFINITION)
+    received = copy_rows(db, STAGE_TABLE, STAGE_COLUMNS, _stage_rows(students))
+
+    skipped = db.execute(DEDUPE_UNIVERSITY_ROLL).rowcount
+    skipped += db.execute(DEDUPE_ROLL_NO).rowcount
+    db.execute(MATCH_BY_UNIVERSITY_ROLL)
+    db.execute(MATCH_BY_ROLL_NO)
+    skipped += db.execute(DROP_ROLL_NO_CONFLICTS).rowcount
+
+    updated = db.execute(UPDATE_STUDENTS).rowcount
+    inserted = db.execute(INSERT_STUDENTS).rowcount
+    enrolled = db.execute(ENROLL_STUDENTS, {"class_id": str(class_id)}).rowcount
+    allowed = db.execute(UPSERT_ALLOWED_BY_EMAIL).rowcount
+    allowed += db.execute(INSERT_ALLOWED_BY_DTU_EMAIL).rowcount
+    db.execute(BUMP_CLASS_VERSIONS)
+
+    return {
+        "received": received,
+        "inserted": inserted,
+        "updated": updated,
+        "skipped": skipped,
+        "enrolled": enrolled,
+        "allowedEmails": allowed,
+    }
@@ -0,0 +1,256 @@
+"""
+Parsing and batched import of uploaded roster files (CSV / XLSX).
+
+Sheets are read row by row (csv.reader, openpyxl read-only mode) and fed
+to roster_import.import_roster in fixed-size batches, so department-wide
+sheets never sit in memory as a whole and progress can be reported as
+each batch lands.
+"""
+import codecs
+import csv
+from typing import IO, Any, Dict, Iterator, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+from fastapi import HTTPException, status
+from pydantic import ValidationError
+from sqlalchemy.orm import Session
+
+from app.schemas.classes import StudentInput
+from app.services.roster_import import import_roster
+
+
+# Lower-cased header -> StudentInput field; mirrors the teacher app's parser
+HEADER_ALIASES: Dict[str, str] = {
+    "name": "name", "fullname": "name", "student_name": "name", "full_name": "name",
+    "rollno": "roll_no", "roll_no": "roll_no", "roll": "roll_no",
+    "rollnumber": "roll_no", "roll_number": "roll_no",
+    "universityroll": "university_roll", "university_roll": "university_roll",
+    "photourl": "photo_url", "photo_url": "photo_url", "photo": "photo_url",
+    "image_url": "photo_url", "picture": "photo_url",
+    "aprog": "program", "program": "program",
+    "batch": "batch",
+    "department": "department", "dept": "department",
+    "sp_code": "sp_code", "spcode": "sp_code",
+    "semester": "semester", "sem": "semester",
+    "status": "status",
+    "duration": "duration",
+    "email": "email",
+    "dtu_email": "dtu_email", "dtuemail": "dtu_email",
+    "phone": "phone", "mobile": "phone",
+}
+
+SUPPORTED_EXTENSIONS = (".csv", ".xlsx")
+
+# Per-row validation errors returned to the client (the rest are counted)
+MAX_REPORTED_ERRORS = 50
+
+
+def _extension(filename: Optional[str]) -> str:
+    name = (filename or "").lower()
+    for extension in SUPPORTED_EXTENSIONS:
+        if name.endswith(extension):
+            return extension
+    raise HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail=f"Unsupported file type. Allowed: {', '.join(SUPPORTED_EXTENSIONS)}"
+    )
+
+
+def iter_sheet_rows(file: IO[bytes], filename: Optional[str]) -> Iterator[Sequence[Any]]:
+    """
+    Yield raw rows (header first) from a CSV or the first XLSX sheet.
+
+    Args:
+        file: Seekable binary file object
+        filename: Original filename, used to pick the parser
+
+    Raises:
+        HTTPException: If the file type is not supported or unreadable
+    """
+    extension = _extension(filename)
+    file.seek(0)
+
+    if extension == ".csv":
+        reader = codecs.getreader("utf-8-sig")(file, errors="replace")
+        yield from csv.reader(reader)
+        return
+
+    from openpyxl import load_workbook
+
+    try:
+        workbook = load_workbook(file, read_only=True, data_only=True)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Could not read Excel file: {str(e)}"
+        )
+    try:
+        if not workbook.worksheets:
+            return
+        yield from workbook.worksheets[0].iter_rows(values_only=True)
+    finally:
+        workbook.close()
+
+
+def map_header(header: Sequence[Any]) -> Dict[int, str]:
+    """
+    Map column positions to StudentInput fields.
+
+    Raises:
+        HTTPException: If the name or roll number column is missing
+    """
+    columns: Dict[int, str] = {}
+    for index, cell in enumerate(header):
+        field = HEADER_ALIASES.get(str(cell or "").strip().lower())
+        if field and field not in columns.values():
+            columns[index] = field
+
+    fields = set(columns.values())
+    if "name" not in fields or not fields & {"roll_no", "university_roll"}:
+        available = ", ".join(str(c).strip() for c in header if c not in (None, ""))
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=(
+                "Required columns not found. Looking for 'name/fullname' and "
+                f"'rollno/roll_no' columns. Available columns: {available}"
+            )
+        )
+    return columns
+
+
+def check_roster_header(file: IO[bytes], filename: Optional[str]) -> None:
+    """
+    Validate file type and header up front, before any progress is streamed.
+
+    Raises:
+        HTTPException: If the file is unsupported, empty, or lacks required columns
+    """
+    rows = iter_sheet_rows(file, filename)
+    try:
+        header = next(rows, None)
+        if header is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="File is empty"
+            )
+        map_header(header)
+    finally:
+        rows.close()
+
+
+def _cell_text(value: Any) -> Optional[str]:
+    if value is None:
+        return None
+    # Excel stores numeric-looking cells (roll numbers, semesters) as floats
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    text = str(value).strip()
+    return text or None
+
+
+def parse_roster_rows(
+    rows: Iterator[Sequence[Any]]
+) -> Iterator[Tuple[int, Optional[StudentInput], Optional[str]]]:
+    """
+    Validate sheet rows against StudentInput.
+
+    The university roll falls back to the roll number when the sheet has
+    no separate column for it, matching what the teacher app sends.
+
+    Yields:
+        (line number, student or None, error or None) per non-blank row
+
+    Raises:
+        HTTPException: If the sheet is empty or its header is unusable
+    """
+    header = next(rows, None)
+    if header is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="File is empty"
+        )
+    columns = map_header(header)
+
+    for line_no, row in enumerate(rows, start=2):
+        values = {
+            field: _cell_text(row[index])
+            for index, field in columns.items()
+            if index < len(row)
+        }
+        if not any(values.values()):
+            continue
+        if not values.get("university_roll"):
+            values["university_roll"] = values.get("roll_no")
+
+        try:
+            yield line_no, StudentInput.model_validate(values), None
+        except ValidationError as e:
+            problems = "; ".join(
+                f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}" for err in e.errors()
+            )
+            yield line_no, None, problems
+
+
+def import_roster_upload(
+    db: Session,
+    class_id: UUID,
+    file: IO[bytes],
+    filename: Optional[str],
+    batch_size: int
+) -> Iterator[dict]:
+    """
+    Import an uploaded roster in batches, yielding progress after each one.
+
+    Each batch is merged and committed on its own, so a failure part-way
+    through keeps the batches already reported as done.
+
+    Args:
+        db: Database session owned by the caller
+        class_id: Class UUID (ownership already verified)
+        file: Seekable binary file object
+        filename: Original filename
+        batch_size: Rows per bulk merge
+
+    Yields:
+        {"type": "progress", ...} after each batch, then {"type": "done", ...}
+        with the totals and the first validation errors; on failure a final
+        {"type": "error", "detail": ...}
+    """
+    totals = {"received": 0, "inserted": 0, "updated": 0, "skipped": 0,
+              "enrolled": 0, "allowedEmails": 0, "invalid": 0}
+    errors: List[dict] = []
+    batch: List[StudentInput] = []
+    batches = 0
+
+    def flush() -> dict:
+        nonlocal batches
+        summary = import_roster(db, class_id, batch)
+        db.commit()
+        batch.clear()
+        batches += 1
+        for key, value in summary.items():
+            totals[key] += value
+        return {"type": "progress", "batch": batches, "processed": totals["received"] + totals["invalid"], **totals}
+
+    try:
+        for line_no, student, error in parse_roster_rows(iter_sheet_rows(file, filename)):
+            if error:
+                totals["invalid"] += 1
+                if len(errors) < MAX_REPORTED_ERRORS:
+                    errors.append({"line": line_no, "error": error})
+                continue
+            batch.append(student)
+            if len(batch) >= batch_size:
+                yield flush()
+        if batch:
+            yield flush()
+    except HTTPException as e:
+        db.rollback()
+        yield {"type": "error", "detail": e.detail, **totals}
+        return
+    except Exception as e:
+        db.rollback()
+        yield {"type": "error", "detail": f"Import failed: {str(e)}", **totals}
+        return
+
+    yield {"type": "done", "batches": batches, **totals, "errors": errors}
@@ -0,0 +1,328 @@
+"""
+Attendance statistics services.
+
+Per-class and per-student attendance summaries, aggregated in the database
+so callers (the stats routes and the grounded AI agents) never pull raw
+attendance rows.
+"""
+from sqlalchemy.orm import Session
+from sqlalchemy import text, or_
+from uuid import UUID
+from typing import Optional
+from fastapi import HTTPException, status
+
+from app.models.class_model import Class
+from app.models.student import Student
+from app.models.user import UserRole
+
+
+CLASS_SUMMARY_QUERY = text("""
+    SELECT
+        s.uuid AS student_id,
+        COALESCE(s.roll_no, s.university_roll) AS roll_no,
+        s.name,
+        COUNT(*) FILTER (WHERE a.status = 'PRESENT') AS present_count,
+        COUNT(*) FILTER (WHERE a.status = 'ABSENT') AS absent_count,
+        COUNT(*) FILTER (WHERE a.status = 'LATE') AS late_count,
+        COUNT(*) FILTER (WHERE a.status = 'EXCUSED') AS excused_count,
+        COUNT(a.status) AS total_count
+    FROM class_students cs
+    JOIN students s ON s.student_id = cs.student_id
+    LEFT JOIN sessions ss ON ss.class_id = cs.class_id
+    LEFT JOIN attendance a ON a.session_id = ss.session_id AND a.student_id = cs.student_id
+    WHERE cs.class_id = :class_id
+    GROUP BY s.student_id, s.uuid, s.roll_no, s.university_roll, s.name
+    ORDER BY COALESCE(s.roll_no, s.university_roll)
+""")
+
+CLASS_SESSION_COUNT_QUERY = text("""
+    SELECT COUNT(*) FROM sessions WHERE class_id = :class_id
+""")
+
+STUDENT_SUMMARY_QUERY = text("""
+    SELECT
+        c.id AS class_id,
+        c.code,
+        c.name,
+        c.section,
+        COUNT(*) FILTER (WHERE a.status = 'PRESENT') AS present_count,
+        COUNT(*) FILTER (WHERE a.status = 'ABSENT') AS absent_count,
+        COUNT(*) FILTER (WHERE a.status = 'LATE') AS late_count,
+        COUNT(*) FILTER (WHERE a.status = 'EXCUSED') AS excused_count,
+        COUNT(a.status) AS total_count
+    FROM class_students cs
+    JOIN classes c ON c.id = cs.class_id
+    LEFT JOIN sessions ss ON ss.class_id = cs.class_id
+    LEFT JOIN attendance a ON a.session_id = ss.session_id AND a.student_id = cs.student_id
+    WHERE cs.student_id = :student_id
+      AND (CAST(:teacher_user_id AS integer) IS NULL OR c.teacher_user_id = :teacher_user_id)
+    GROUP BY c.id, c.code, c.name, c.section
+    ORDER BY c.code, c.section
+""")
+
+
+# One byte per register cell; "-" where the student has no record for the session
+REGISTER_LEGEND = {"P": "PRESENT", "A": "ABSENT", "L": "LATE", "E": "EXCUSED", "-": None}
+
+# Students x sessions in one statement: every enrolled student crossed with
+# every session of the class, each cell looked up through the
+# (session_id, student_id) unique index and folded into one row string per
+# student, then all rows concatenated in roll-number order
+REGISTER_QUERY = text("""
+    WITH class_sessions AS (
+        SELECT session_id, session_date
+        FROM sessions
+        WHERE class_id = :class_id
+    ),
+    roster AS (
+        SELECT s.student_id, s.uuid, COALESCE(s.roll_no, s.university_roll) AS roll_no, s.name
+        FROM class_students cs
+        JOIN students s ON s.student_id = cs.student_id
+        WHERE cs.class_id = :class_id
+    ),
+    register_rows AS (
+        SELECT
+            r.student_id,
+            string_agg(
+                CASE a.status
+                    WHEN 'PRESENT' THEN 'P'
+                    WHEN 'ABSENT' THEN 'A'
+                    WHEN 'LATE' THEN 'L'
+                    WHEN 'EXCUSED' THEN 'E'
+                    ELSE '-'
+                END,
+                '' ORDER BY cs.session_date, cs.session_id
+            ) AS cells
+        FROM roster r
+        CROSS JOIN class_sessions cs
+        LEFT JOIN attendance a ON a.session_id = cs.session_id AND a.student_id = r.student_id
+        GROUP BY r.student_id
+    )
+    SELECT
+        (SELECT array_agg(session_id ORDER BY session_date, session_id) FROM class_sessions) AS session_ids,
+        (SELECT array_agg(session_date ORDER BY session_date, session_id) FROM class_sessions) AS dates,
+        array_agg(r.uuid ORDER BY r.roll_no, r.student_id) AS student_ids,
+        array_agg(r.roll_no ORDER BY r.roll_no, r.student_id) AS roll_nos,
+        array_agg(r.name ORDER BY r.roll_no, r.student_id) AS names,
+        string_agg(COALESCE(rr.cells, ''), '' ORDER BY r.roll_no, r.student_id) AS matrix
+    FROM roster r
+    LEFT JOIN register_rows rr ON rr.student_id = r.student_id
+""")
+
+# Owner check and the class's change counter (app/services/change_versions.py)
+# in one lookup, so a 304 costs a single statement
+CLASS_REGISTER_VERSION_QUERY = text("""
+    SELECT
+        c.teacher_user_id,
+        COALESCE((
+            SELECT version FROM change_versions
+            WHERE scope = 'class' AND key = c.id::text
+        ), 0) AS version
+    FROM classes c
+    WHERE c.id = :class_id
+""")
+
+def _percentage(present: int, total: int) -> float:
+    return round(present / total * 100, 2) if total > 0 else 0.0
+
+
+def _counts(row) -> dict:
+    present = row.present_count or 0
+    total = row.total_count or 0
+    return {
+        "present_count": present,
+        "absent_count": row.absent_count or 0,
+        "late_count": row.late_count or 0,
+        "excused_count": row.excused_count or 0,
+        "total_count": total,
+        "percentage": _percentage(present, total),
+    }
+
+
+def get_class_attendance_summary(
+    db: Session,
+    class_id: UUID,
+    user_id: int,
+    role: UserRole
+) -> dict:
+    """
+    Get per-student attendance counts for a class.
+
+    Args:
+        db: Database session
+        class_id: Class UUID
+        user_id: Requesting user's numeric id
+        role: User role
+
+    Returns:
+        Dictionary with the class, its session count and one entry per
+        enrolled student (ordered by roll number)
+
+    Raises:
+        HTTPException: If class not found or not authorized
+    """
+    cls = db.query(Class).filter(Class.id == class_id).first()
+
+    if not cls:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Class not found"
+        )
+
+    if role != UserRole.ADMIN and cls.teacher_user_id != user_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You do not have permission to view this class's statistics"
+        )
+
+    params = {"class_id": str(class_id)}
+    rows = db.execute(CLASS_SUMMARY_QUERY, params).fetchall()
+    session_count = db.execute(CLASS_SESSION_COUNT_QUERY, params).scalar() or 0
+
+    return {
+        "class": cls,
+        "session_count": session_count,
+        "students": [
+            {
+                "student_id": row.student_id,
+                "roll_no": row.roll_no,
+                "name": row.name,
+                **_counts(row),
+            }
+            for row in rows
+        ],
+    }
+
+
+def get_student_attendance_summary(
+    db: Session,
+    roll_no: str,
+    user_id: int,
+    role: UserRole
+) -> dict:
+    """
+    Get per-class attendance counts for one student.
+
+    Teachers only see the classes they teach; admins see every enrollment.
+
+    Args:
+        db: Database session
+        roll_no: Student roll number or university roll
+        user_id: Requesting user's numeric id
+        role: User role
+
+    Returns:
+        Dictionary with the student and one entry per visible class
+
+    Raises:
+        HTTPException: If student not found or not authorized
+    """
+    student = db.query(Student).filter(
+        or_(Student.roll_no == roll_no, Student.university_roll == roll_no)
+    ).first()
+
+    if not student:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Student not found"
+        )
+
+    teacher_user_id: Optional[int] = None if role == UserRole.ADMIN else user_id
+    rows = db.execute(STUDENT_SUMMARY_QUERY, {
+        "student_id": student.student_id,
+        "teacher_user_id": teacher_user_id
+    }).fetchall()
+
+    if not rows and role != UserRole.ADMIN:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You do not have permission to view this student's attendance"
+        )
+
+    return {
+        "student": student,
+        "classes": [
+            {
+                "class_id": row.class_id,
+                "code": row.code,
+                "name": row.name,
+                "section": row.section,
+                **_counts(row),
+            }
+            for row in rows
+        ],
+    }
+
+
+def get_class_register_version(
+    db: Session,
+    class_id: UUID,
+    user_id: int,
+    role: UserRole
+) -> int:
+    """
+    Authorize a register read and return the version of the register.
+
+    Args:
+        db: Database session
+        class_id: Class UUID
+        user_id: Requesting user's numeric id
+        role: User role
+
+    Returns:
+        The class's change counter, bumped by every write to its roster,
+        sessions or statuses
+
+    Raises:
+        HTTPException: If class not found or not authorized
+    """
+    row = db.execute(CLASS_REGISTER_VERSION_QUERY, {"class_id": str(class_id)}).first()
+
+    if not row:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Class not found"
+        )
+
+    if role != UserRole.ADMIN and row.teacher_user_id != user_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You do not have permission to view this class's statistics"
+        )
+
+    return row.version
+
+
+def get_class_register(db: Session, class_id: UUID) -> dict:
+    """
+    Get the attendance register of a class as a packed students x dates matrix.
+
+    Call get_class_register_version first; it does the authorization.
+
+    Args:
+        db: Database session
+        class_id: Class UUID
+
+    Returns:
+        JSON-ready dict: sessions (ids and dates, oldest first), students
+        (ids, roll numbers, names, in roll-number order), and "matrix", a
+        row-major string with one REGISTER_LEGEND character per
+        (student, session) cell, so the cell for student i and session j
+        is matrix[i * len(dates) + j]
+    """
+    row = db.execute(REGISTER_QUERY, {"class_id": str(class_id)}).one()
+
+    return {
+        "classId": str(class_id),
+        "sessions": {
+            "sessionId": [str(session_id) for session_id in row.session_ids or []],
+            "date": [session_date.isoformat() for session_date in row.dates or []],
+        },
+        "students": {
+            "studentId": [str(student_id) for student_id in row.student_ids or []],
+            "rollNo": row.roll_nos or [],
+            "name": row.names or [],
+        },
+        "legend": REGISTER_LEGEND,
+        "matrix": row.matrix or "",
+    }
@@ -0,0 +1,323 @@
+"""
+Synthetic dataset generator for scale testing.
+
+Builds departments' worth of teachers, classes (with weekly schedules and
+one-off reschedules), students with enrollments, and a semester of
+sessions and attendance statuses, all bulk-loaded through COPY. The
+defaults produce roughly 50k students and 5M statuses, the reference
+dataset for measuring leaderboard, stats and roster changes.
+
+Every generated row is tagged (SYN/ university rolls, @synthetic.local
+emails) so a dataset can be removed again with reset_synthetic_data.
+"""
+import random
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import date, datetime, time as dt_time, timedelta, timezone
+from typing import Callable, Dict, Iterator, List, Sequence, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.services.bulk_load import copy_rows
+
+
+EMAIL_DOMAIN = "synthetic.local"
+ROLL_PREFIX = "SYN/"
+
+DEPARTMENT_CODES = [
+    "CSE", "ECE", "EE", "ME", "CE", "IT", "SE", "MCE", "BT", "EP",
+    "PE", "EN", "PS", "CH", "AE", "MAM",
+]
+
+# Lecture slots on weekdays (1=Monday .. 5=Friday)
+SLOTS = [(dt_time(h, 0), dt_time(h + 1, 0)) for h in (9, 10, 11, 12, 14, 15, 16)]
+
+
+@dataclass
+class SyntheticConfig:
+    """Knobs for the generated dataset."""
+    departments: int = 8
+    teachers_per_department: int = 12
+    classes: int = 400
+    students: int = 50000
+    classes_per_student: int = 4
+    meetings_per_week: int = 2
+    weeks: int = 13
+    semester_start: date = date(2025, 1, 6)
+    present_rate: float = 0.78
+    late_rate: float = 0.06
+    excused_rate: float = 0.02
+    reschedule_rate: float = 0.04
+    recognized_by_ai_rate: float = 0.7
+    seed: int = 42
+
+
+def reset_synthetic_data(db: Session) -> Dict[str, int]:
+    """
+    Delete a previously generated dataset (classes cascade to schedules,
+    reschedules, enrollments, sessions and statuses).
+
+    Returns:
+        Deleted row counts per table
+    """
+    classes = db.execute(text("""
+        DELETE FROM classes
+        WHERE teacher_user_id IN (SELECT user_id FROM users WHERE email LIKE :email)
+    """), {"email": f"%@{EMAIL_DOMAIN}"}).rowcount
+    students = db.execute(text(
+        "DELETE FROM students WHERE university_roll LIKE :roll"
+    ), {"roll": f"{ROLL_PREFIX}%"}).rowcount
+    users = db.execute(text(
+        "DELETE FROM users WHERE email LIKE :email"
+    ), {"email": f"%@{EMAIL_DOMAIN}"}).rowcount
+    return {"classes": classes, "students": students, "users": users}
+
+
+class _Generator:
+    def __init__(self, db: Session, config: SyntheticConfig, log: Callable[[str], None]):
+        self.db = db
+        self.config = config
+        self.log = log
+        self.rng = random.Random(config.seed)
+        self.departments = [
+            DEPARTMENT_CODES[i] if i < len(DEPARTMENT_CODES) else f"D{i}"
+            for i in range(config.departments)
+        ]
+        self.counts: Dict[str, int] = {}
+
+    def _copy(self, table: str, columns: Sequence[str], rows) -> int:
+        started = time.perf_counter()
+        count = copy_rows(self.db, table, columns, rows)
+        elapsed = time.perf_counter() - started
+        self.counts[table] = self.counts.get(table, 0) + count
+        rate = count / elapsed if elapsed > 0 else 0.0
+        self.log(f"  {table}: {count:,} rows in {elapsed:.1f}s ({rate:,.0f} rows/sec)")
+        return count
+
+    # ----- teachers -----
+
+    def teachers(self) -> Dict[str, List[int]]:
+        rows = []
+        for dept in self.departments:
+            for n in range(self.config.teachers_per_department):
+                rows.append((
+                    str(uuid.uuid4()),
+                    f"{dept.lower()}.t{n}@{EMAIL_DOMAIN}",
+                    f"Dr. {dept} Faculty {n}",
+                    "TEACHER",
+                    dept,
+                    "",
+                ))
+        self._copy("users", ("uuid", "email", "name", "role", "department", "password_hash"), rows)
+
+        by_dept: Dict[str, List[int]] = {dept: [] for dept in self.departments}
+        result = self.db.execute(text(
+            "SELECT user_id, department FROM users WHERE email LIKE :email ORDER BY user_id"
+        ), {"email": f"%@{EMAIL_DOMAIN}"})
+        for user_id, dept in result:
+            by_dept[dept].append(user_id)
+        return by_dept
+
+    # ----- classes, schedules, reschedules -----
+
+    def classes(self, teachers: Dict[str, List[int]]) -> List[dict]:
+        config = self.config
+        classes = []
+        for n in range(config.classes):
+            dept = self.departments[n % len(self.departments)]
+            number = 100 + n // len(self.departments)
+            days = sorted(self.rng.sample(range(1, 6), min(config.meetings_per_week, 5)))
+            classes.append({
+                "id": uuid.uuid4(),
+                "dept": dept,
+                "code": f"{dept}{number}",
+                "section": "ABCD"[n % 4],
+                "teacher": self.rng.choice(teachers[dept]),
+                "schedule": [(day, *self.rng.choice(SLOTS)) for day in days],
+            })
+
+        self._copy(
+            "classes",
+            ("id", "code", "name", "section", "ltp_pattern", "teacher_type", "teacher_user_id"),
+            ((str(c["id"]), c["code"], f"{c['dept']} Course {c['code']}", c["section"],
+              "3-1-0", "lecture", c["teacher"]) for c in classes)
+        )
+        self._copy(
+            "class_schedules",
+            ("class_id", "day_of_week", "start_time", "end_time"),
+            ((str(c["id"]), day, start, end) for c in classes for day, start, end in c["schedule"])
+        )
+        return classes
+
+    def meetings(self, cls: dict) -> Iterator[Tuple[date, dt_time, dt_time]]:
+        """Yield (date, start, end) for each regular meeting of a class in the semester."""
+        first_monday = self.config.semester_start - timedelta(days=self.config.semester_start.isoweekday() - 1)
+        for week in range(self.config.weeks):
+            monday = first_monday + timedelta(weeks=week)
+            for day, slot_start, slot_end in cls["schedule"]:
+                meeting = monday + timedelta(days=day - 1)
+                if meeting >= self.config.semester_start:
+                    yield meeting, slot_start, slot_end
+
+    def reschedules_and_sessions(self, classes: List[dict]) -> Dict[uuid.UUID, List[tuple]]:
+        config = self.config
+        reschedules = []
+        sessions: Dict[uuid.UUID, List[tuple]] = {}
+
+        for cls in classes:
+            class_sessions = []
+            for day, start, end in self.meetings(cls):
+                held_on = day
+                if self.rng.random() < config.reschedule_rate:
+                    # Moved to the Saturday of the same week, which never
+                    # collides with a regular weekday meeting
+                    held_on = day + timedelta(days=6 - day.isoweekday())
+                    if held_on in {s[1] for s in class_sessions}:
+                        held_on = day
+                    else:
+                        reschedules.append((
+                            str(cls["id"]), day, start, end, held_on, start, end, "Synthetic reschedule"
+                        ))
+                class_sessions.append((uuid.uuid4(), held_on, start, end))
+            sessions[cls["id"]] = class_sessions
+
+        self._copy(
+            "class_reschedules",
+            ("class_id", "original_date", "original_start_time", "original_end_time",
+             "rescheduled_date", "rescheduled_start_time", "rescheduled_end_time", "reason"),
+            reschedules
+        )
+        self._copy(
+            "sessions",
+            ("session_id", "class_id", "teacher_user_id", "session_date", "start_time", "end_time"),
+            ((str(sid), str(cls["id"]), cls["teacher"], held_on, start.isoformat(), end.isoformat())
+             for cls in classes for sid, held_on, start, end in sessions[cls["id"]])
+        )
+        return sessions
+
+    # ----- students and enrollments -----
+
+    def students(self) -> Dict[str, List[Tuple[int, float]]]:
+        """Load students; returns (student_id, attendance propensity) per department."""
+        config = self.config
+        batch_year = config.semester_start.year % 100 - 1
+
+        def rows():
+            for n in range(config.students):
+                dept = self.departments[n % len(self.departments)]
+                serial = n // len(self.departments) + 1
+                roll = f"2K{batch_year}/{dept}/{serial}"
+                yield (
+                    str(uuid.uuid4()),
+                    f"{ROLL_PREFIX}{roll}",
+                    roll,
+                    f"Student {dept} {serial}",
+                    "B.Tech",
+                    f"20{batch_year}",
+                    dept,
+                    3,
+                    "Active",
+                    f"{dept.lower()}.{serial}@{EMAIL_DOMAIN}",
+                    f"2k{batch_year}_{dept.lower()}_{serial}@{EMAIL_DOMAIN}",
+                )
+
+        self._copy(
+            "students",
+            ("uuid", "university_roll", "roll_no", "name", "program", "batch", "department",
+             "semester", "status", "email", "dtu_email"),
+            rows()
+        )
+
+        # Per-student propensity: most students near the target rate, a tail
+        # of chronic absentees so thresholds and leaderboards have spread
+        attendance_rate = config.present_rate + config.late_rate
+        by_dept: Dict[str, List[Tuple[int, float]]] = {dept: [] for dept in self.departments}
+        result = self.db.execute(text(
+            "SELECT student_id, department FROM students WHERE university_roll LIKE :roll"
+        ), {"roll": f"{ROLL_PREFIX}%"})
+        for student_id, dept in result:
+            propensity = min(1.0, max(0.05, self.rng.gauss(attendance_rate, 0.12)))
+            by_dept[dept].append((student_id, propensity))
+        return by_dept
+
+    def enrollments(self, classes: List[dict], students: Dict[str, List[Tuple[int, float]]]) -> Dict[uuid.UUID, List[Tuple[int, float]]]:
+        classes_by_dept: Dict[str, List[dict]] = {}
+        for cls in classes:
+            classes_by_dept.setdefault(cls["dept"], []).append(cls)
+
+        rosters: Dict[uuid.UUID, List[Tuple[int, float]]] = {cls["id"]: [] for cls in classes}
+        for dept, dept_students in students.items():
+            dept_classes = classes_by_dept.get(dept, [])
+            take = min(self.config.classes_per_student, len(dept_classes))
+            for student in dept_students:
+                for cls in self.rng.sample(dept_classes, take):
+                    rosters[cls["id"]].append(student)
+
+        self._copy(
+            "class_students",
+            ("class_id", "student_id"),
+            ((str(class_id), student_id) for class_id, roster in rosters.items() for student_id, _ in roster)
+        )
+        return rosters
+
+    # ----- attendance -----
+
+    def statuses(self, classes: List[dict], sessions, rosters) -> None:
+        config = self.config
+        rng = self.rng
+        attended = config.present_rate + config.late_rate
+        late_share = config.late_rate / attended if attended else 0.0
+
+        def rows():
+            for cls in classes:
+                roster = rosters[cls["id"]]
+                for session_id, held_on, start, _ in sessions[cls["id"]]:
+                    marked_at = datetime.combine(held_on, start, tzinfo=timezone.utc).isoformat()
+                    sid = str(session_id)
+                    for student_id, propensity in roster:
+                        roll = rng.random()
+                        if roll < propensity:
+                            status = "LATE" if rng.random() < late_share else "PRESENT"
+                            ai = rng.random() < config.recognized_by_ai_rate
+                            score = round(rng.uniform(70, 99), 2) if ai else None
+                            yield (sid, student_id, status, marked_at, ai, score)
+                        elif roll < propensity + config.excused_rate:
+                            yield (sid, student_id, "EXCUSED", marked_at, False, None)
+                        else:
+                            yield (sid, student_id, "ABSENT", marked_at, False, None)
+
+        self._copy(
+            "attendance",
+            ("session_id", "student_id", "status", "marked_at", "recognized_by_ai", "similarity_score"),
+            rows()
+        )
+
+    def run(self) -> Dict[str, int]:
+        teachers = self.teachers()
+        classes = self.classes(teachers)
+        sessions = self.reschedules_and_sessions(classes)
+        students = self.students()
+        rosters = self.enrollments(classes, students)
+        self.statuses(classes, sessions, rosters)
+        return self.counts
+
+
+def generate_synthetic_data(
+    db: Session,
+    config: SyntheticConfig,
+    log: Callable[[str], None] = print
+) -> Dict[str, int]:
+    """
+    Generate and COPY a synthetic dataset in the caller's transaction.
+
+    Args:
+        db: Database session
+        config: Dataset size and distribution knobs
+        log: Progress callback, one line per loaded table
+
+    Returns:
+        Loaded row counts per table
+    """
+    return _Generator(db, config, log).run()
@@ -0,0 +1,192 @@
+"""
+Bulk loading of the login whitelists (allowed_emails, allowed_student_emails).
+
+Rows are COPY'd into a temp staging table and merged with one upsert per
+table, so whole-university lists load in seconds.
+"""
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
+
+from app.models.user import UserRole
+from app.services.bulk_load import copy_rows, create_staging_table
+
+
+def _clean(value: Any) -> Optional[str]:
+    """Trim text and treat blanks and literal 'NULL' as missing."""
+    if value is None:
+        return None
+    value = str(value).strip()
+    if not value or value.upper() == "NULL":
+        return None
+    return value
+
+
+def _merge_counts(rows) -> Dict[str, int]:
+    inserted = updated = 0
+    for (was_inserted,) in rows:
+        if was_inserted:
+            inserted += 1
+        else:
+            updated += 1
+    return {"inserted": inserted, "updated": updated}
+
+
+# ===== allowed_emails (faculty / admins) =====
+
+FACULTY_STAGE = "allowed_emails_stage"
+
+FACULTY_STAGE_DEFINITION = [
+    "line_no integer NOT NULL",
+    "email text NOT NULL",
+    "name text",
+    "role text NOT NULL",
+]
+
+# Later lines win for repeated emails; xmax = 0 marks freshly inserted rows
+MERGE_FACULTY = text(f"""
+    INSERT INTO allowed_emails (id, email, name, role, created_at)
+    SELECT DISTINCT ON (email) gen_random_uuid(), email, name, role, now()
+    FROM {FACULTY_STAGE}
+    ORDER BY email, line_no DESC
+    ON CONFLICT (email) DO UPDATE SET
+        name = COALESCE(EXCLUDED.name, allowed_emails.name),
+        role = EXCLUDED.role
+    RETURNING (xmax = 0)
+""")
+
+
+def _faculty_rows(records: Iterable[dict], skipped: list) -> Iterator[Tuple]:
+    roles = {role.value for role in UserRole}
+    for line_no, record in enumerate(records, start=1):
+        email = _clean(record.get("email"))
+        role = (_clean(record.get("role")) or UserRole.TEACHER.value).upper()
+        if not email or role not in roles:
+            skipped.append(line_no)
+            continue
+        yield (line_no, email, _clean(record.get("name")), role)
+
+
+def load_allowed_emails(db: Session, records: Iterable[dict]) -> Dict[str, int]:
+    """
+    Upsert faculty/admin whitelist entries keyed by email.
+
+    Records need an email; role defaults to TEACHER and must be a UserRole
+    value (case-insensitive). Runs in the caller's transaction.
+
+    Args:
+        db: Database session
+        records: Dicts with email, name, role
+
+    Returns:
+        Summary with received, inserted, updated and skipped counts
+    """
+    skipped: list = []
+    create_staging_table(db, FACULTY_STAGE, FACULTY_STAGE_DEFINITION)
+    copied = copy_rows(
+        db, FACULTY_STAGE, ("line_no", "email", "name", "role"), _faculty_rows(records, skipped)
+    )
+    counts = _merge_counts(db.execute(MERGE_FACULTY).fetchall())
+    duplicates = copied - counts["inserted"] - counts["updated"]
+
+    return {
+        "received": copied + len(skipped),
+        **counts,
+        "skipped": len(skipped) + duplicates,
+    }
+
+
+# ===== allowed_student_emails =====
+
+STUDENT_STAGE = "allowed_student_emails_stage"
+
+STUDENT_STAGE_DEFINITION = [
+    "line_no integer NOT NULL",
+    "email text NOT NULL",
+    "dtu_email text",
+    "roll_no text",
+    "name text",
+    "program text",
+]
+
+# A DTU email already held by a different entry (or repeated in the input)
+# is left off rather than violating its unique constraint
+MERGE_STUDENTS = text(f"""
+    INSERT INTO allowed_student_emails (id, email, dtu_email, roll_no, name, program, created_at, updated_at)
+    SELECT gen_random_uuid(), r.email, r.dtu_email, r.roll_no, r.name, r.program, now(), now()
+    FROM (
+        SELECT DISTINCT ON (r.email)
+            r.email,
+            CASE
+                WHEN r.dtu_email IS NULL OR r.dtu_email = r.email THEN NULL
+                WHEN EXISTS (
+                    SELECT 1 FROM allowed_student_emails a
+                    WHERE (a.dtu_email = r.dtu_email OR a.email = r.dtu_email)
+                      AND a.email IS DISTINCT FROM r.email
+                ) THEN NULL
+                WHEN COUNT(*) OVER (PARTITION BY r.dtu_email) > 1 THEN NULL
+                ELSE r.dtu_email
+            END AS dtu_email,
+            r.roll_no, r.name, r.program
+        FROM {STUDENT_STAGE} r
+        ORDER BY r.email, r.line_no DESC
+    ) r
+    ON CONFLICT (email) DO UPDATE SET
+        dtu_email = COALESCE(EXCLUDED.dtu_email, allowed_student_emails.dtu_email),
+        roll_no = COALESCE(EXCLUDED.roll_no, allowed_student_emails.roll_no),
+        name = COALESCE(EXCLUDED.name, allowed_student_emails.name),
+        program = COALESCE(EXCLUDED.program, allowed_student_emails.program),
+        updated_at = now()
+    RETURNING (xmax = 0)
+""")
+
+
+def _student_rows(records: Iterable[dict], skipped: list) -> Iterator[Tuple]:
+    for line_no, record in enumerate(records, start=1):
+        email = _clean(record.get("email"))
+        dtu_email = _clean(record.get("dtu_email") or record.get("dtuEmail"))
+        # Students with only an institutional address sign in with it
+        email = email or dtu_email
+        if not email:
+            skipped.append(line_no)
+            continue
+        yield (
+            line_no,
+            email,
+            dtu_email,
+            _clean(record.get("roll_no") or record.get("rollNo")),
+            _clean(record.get("name")),
+            _clean(record.get("program")),
+        )
+
+
+def load_allowed_student_emails(db: Session, records: Iterable[dict]) -> Dict[str, int]:
+    """
+    Upsert student-app whitelist entries keyed by email.
+
+    Records need an email or a DTU email; provided fields overwrite stored
+    ones, blank fields keep them. Runs in the caller's transaction.
+
+    Args:
+        db: Database session
+        records: Dicts with email, dtu_email, roll_no, name, program
+
+    Returns:
+        Summary with received, inserted, updated and skipped counts
+    """
+    skipped: list = []
+    create_staging_table(db, STUDENT_STAGE, STUDENT_STAGE_DEFINITION)
+    copied = copy_rows(
+        db,
+        STUDENT_STAGE,
+        ("line_no", "email", "dtu_email", "roll_no", "name", "program"),
+        _student_rows(records, skipped)
+    )
+    counts = _merge_counts(db.execute(MERGE_STUDENTS).fetchall())
+    duplicates = copied - counts["inserted"] - counts["updated"]
+
+    return {
+        "received": copied + len(skipped),
+        **counts,
+        "skipped": len(skipped) + duplicates,
+    }
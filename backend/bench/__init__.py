@@ -0,0 +1,3 @@
+"""
+HTTP load-test harness for the AIMS API (see bench/README.md).
+"""
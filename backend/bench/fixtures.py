@@ -0,0 +1,116 @@
+"""
+Benchmark fixtures: actors with locally minted JWTs.
+
+Reads the synthetic dataset (python -m app.cli synth) through the app's own
+Settings, makes sure bench users exist, and signs tokens with JWT_SECRET so
+no Google sign-in is needed. Run against the same database and secret as
+the server under test.
+"""
+import random
+from dataclasses import dataclass, field
+from typing import List
+
+from sqlalchemy import text
+
+from app.auth.jwt import create_jwt
+from app.db import SessionLocal
+from app.services.synthetic_data import EMAIL_DOMAIN, ROLL_PREFIX
+
+
+ADMIN_EMAIL = f"bench.admin@{EMAIL_DOMAIN}"
+
+
+@dataclass
+class Teacher:
+    token: str
+    class_ids: List[str]
+    rosters: dict = field(default_factory=dict)  # class_id -> [roll_no]
+
+
+@dataclass
+class Actors:
+    teachers: List[Teacher]
+    student_tokens: List[str]
+    admin_token: str
+
+
+def _ensure_users(db, students: int) -> None:
+    """Create STUDENT users for a sample of synthetic students, plus a bench admin."""
+    db.execute(text("""
+        INSERT INTO users (uuid, email, name, role, department, password_hash)
+        SELECT gen_random_uuid(), s.email, s.name, 'STUDENT', s.department, ''
+        FROM students s
+        WHERE s.university_roll LIKE :roll
+        ORDER BY s.student_id
+        LIMIT :limit
+        ON CONFLICT (email) DO NOTHING
+    """), {"roll": f"{ROLL_PREFIX}%", "limit": students})
+    db.execute(text("""
+        INSERT INTO users (uuid, email, name, role, password_hash)
+        VALUES (gen_random_uuid(), :email, 'Bench Admin', 'ADMIN', '')
+        ON CONFLICT (email) DO NOTHING
+    """), {"email": ADMIN_EMAIL})
+    db.commit()
+
+
+def load_actors(teachers: int = 50, students: int = 500, seed: int = 1) -> Actors:
+    """
+    Pick bench actors from the synthetic dataset and mint their tokens.
+
+    Args:
+        teachers: Number of synthetic teachers to drive the morning rush
+        students: Number of synthetic students to act as app users
+        seed: Sampling seed, for reproducible runs
+
+    Raises:
+        RuntimeError: If no synthetic dataset is loaded
+    """
+    rng = random.Random(seed)
+    db = SessionLocal()
+    try:
+        _ensure_users(db, students)
+
+        teacher_rows = db.execute(text("""
+            SELECT u.uuid, u.email, c.id
+            FROM users u
+            JOIN classes c ON c.teacher_user_id = u.user_id
+            WHERE u.email LIKE :email AND u.role = 'TEACHER'
+            ORDER BY u.user_id, c.id
+        """), {"email": f"%@{EMAIL_DOMAIN}"}).fetchall()
+        if not teacher_rows:
+            raise RuntimeError("No synthetic data found; run `python -m app.cli synth` first")
+
+        by_teacher = {}
+        for user_uuid, email, class_id in teacher_rows:
+            by_teacher.setdefault((user_uuid, email), []).append(str(class_id))
+        picked = rng.sample(sorted(by_teacher), min(teachers, len(by_teacher)))
+
+        actors = []
+        for user_uuid, email in picked:
+            teacher = Teacher(token=create_jwt(user_uuid, email, "TEACHER"), class_ids=by_teacher[(user_uuid, email)])
+            rows = db.execute(text("""
+                SELECT cs.class_id, s.roll_no
+                FROM class_students cs JOIN students s ON s.student_id = cs.student_id
+                WHERE cs.class_id = ANY(CAST(:class_ids AS uuid[]))
+            """), {"class_ids": teacher.class_ids}).fetchall()
+            for class_id, roll_no in rows:
+                teacher.rosters.setdefault(str(class_id), []).append(roll_no)
+            actors.append(teacher)
+
+        student_rows = db.execute(text("""
+            SELECT uuid, email FROM users
+            WHERE role = 'STUDENT' AND email LIKE :email
+            ORDER BY user_id LIMIT :limit
+        """), {"email": f"%@{EMAIL_DOMAIN}", "limit": students}).fetchall()
+
+        admin_uuid = db.execute(text(
+            "SELECT uuid FROM users WHERE email = :email"
+        ), {"email": ADMIN_EMAIL}).scalar()
+
+        return Actors(
+            teachers=actors,
+            student_tokens=[create_jwt(u, e, "STUDENT") for u, e in student_rows],
+            admin_token=create_jwt(admin_uuid, ADMIN_EMAIL, "ADMIN"),
+        )
+    finally:
+        db.close()
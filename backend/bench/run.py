@@ -0,0 +1,169 @@
+"""
+Asyncio HTTP load driver for the AIMS API.
+
+Usage (inside the docker-compose backend container, after seeding):
+    python -m app.cli synth --reset
+    python -m bench.run --scenario morning-rush --concurrency 20 --duration 60 --out bench-results/rush.json
+
+Runs `concurrency` virtual users, each repeating the scenario back to back
+for `duration` seconds (after `warmup` seconds that are not recorded), and
+writes per-request and overall p50/p95/p99 latency, throughput and error
+counts as JSON, tagged with the git commit for comparison across commits.
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+import httpx
+
+from bench.fixtures import load_actors
+from bench.scenarios import SCENARIOS
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+class Recorder:
+    """Collects latencies per request name once recording is switched on."""
+
+    def __init__(self):
+        self.recording = False
+        self.latencies: Dict[str, List[float]] = {}
+        self.errors: Dict[str, int] = {}
+        self.scenario_runs = 0
+
+    def __call__(self, name: str, seconds: float, ok: bool) -> None:
+        if not self.recording:
+            return
+        self.latencies.setdefault(name, []).append(seconds)
+        if not ok:
+            self.errors[name] = self.errors.get(name, 0) + 1
+
+    @staticmethod
+    def _summary(values: List[float], errors: int, elapsed: float) -> dict:
+        ordered = sorted(values)
+        return {
+            "count": len(ordered),
+            "errors": errors,
+            "throughput_rps": round(len(ordered) / elapsed, 2) if elapsed else 0.0,
+            "mean_ms": round(sum(ordered) / len(ordered) * 1000, 2) if ordered else 0.0,
+            "p50_ms": round(percentile(ordered, 50) * 1000, 2),
+            "p95_ms": round(percentile(ordered, 95) * 1000, 2),
+            "p99_ms": round(percentile(ordered, 99) * 1000, 2),
+            "max_ms": round(ordered[-1] * 1000, 2) if ordered else 0.0,
+        }
+
+    def report(self, elapsed: float) -> dict:
+        every = [v for values in self.latencies.values() for v in values]
+        return {
+            "overall": self._summary(every, sum(self.errors.values()), elapsed),
+            "scenario_runs": self.scenario_runs,
+            "scenarios_per_sec": round(self.scenario_runs / elapsed, 2) if elapsed else 0.0,
+            "requests": {
+                name: self._summary(values, self.errors.get(name, 0), elapsed)
+                for name, values in sorted(self.latencies.items())
+            },
+        }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return os.environ.get("GIT_COMMIT")
+
+
+async def run(args: argparse.Namespace) -> dict:
+    actors = load_actors(teachers=args.teachers, students=args.students, seed=args.seed)
+    scenario = SCENARIOS[args.scenario]
+    recorder = Recorder()
+
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=args.timeout) as client:
+        deadline = time.perf_counter() + args.warmup + args.duration
+
+        async def user(index: int) -> None:
+            rng = random.Random(args.seed * 1000 + index)
+            while time.perf_counter() < deadline:
+                try:
+                    await scenario(client, actors, recorder, rng)
+                except httpx.HTTPError:
+                    continue
+                if recorder.recording:
+                    recorder.scenario_runs += 1
+
+        users = [asyncio.create_task(user(i)) for i in range(args.concurrency)]
+        await asyncio.sleep(args.warmup)
+        recorder.recording = True
+        started = time.perf_counter()
+        await asyncio.gather(*users)
+        elapsed = time.perf_counter() - started
+
+    return {
+        "scenario": args.scenario,
+        "commit": _git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "config": {
+            "base_url": args.base_url,
+            "concurrency": args.concurrency,
+            "duration_s": args.duration,
+            "warmup_s": args.warmup,
+            "teachers": len(actors.teachers),
+            "students": len(actors.student_tokens),
+            "seed": args.seed,
+        },
+        "host": {"python": platform.python_version(), "machine": platform.machine()},
+        "elapsed_s": round(elapsed, 2),
+        **recorder.report(elapsed),
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m bench.run", description="AIMS API load driver")
+    parser.add_argument("--scenario", choices=sorted(SCENARIOS), required=True)
+    parser.add_argument("--base-url", default=os.environ.get("BENCH_BASE_URL", "http://localhost:8000"))
+    parser.add_argument("--concurrency", type=int, default=20, help="Virtual users")
+    parser.add_argument("--duration", type=float, default=60.0, help="Recorded seconds")
+    parser.add_argument("--warmup", type=float, default=5.0, help="Unrecorded seconds before measuring")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Per-request timeout")
+    parser.add_argument("--teachers", type=int, default=50, help="Synthetic teachers to drive")
+    parser.add_argument("--students", type=int, default=500, help="Synthetic students to act as")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--out", help="Write JSON here (default: stdout)")
+    args = parser.parse_args(argv)
+
+    result = asyncio.run(run(args))
+    output = json.dumps(result, indent=2)
+    if args.out:
+        os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+        with open(args.out, "w") as f:
+            f.write(output + "\n")
+        overall = result["overall"]
+        print(
+            f"{args.scenario}: {overall['count']} requests, {overall['throughput_rps']} req/s, "
+            f"p50 {overall['p50_ms']}ms p95 {overall['p95_ms']}ms p99 {overall['p99_ms']}ms, "
+            f"{overall['errors']} errors -> {args.out}"
+        )
+    else:
+        print(output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
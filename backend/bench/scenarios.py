@@ -0,0 +1,83 @@
+"""
+Benchmark scenarios.
+
+Each scenario is one user journey: an async function that issues its
+requests through `timed`, so every request is recorded under a stable
+name for per-endpoint percentiles.
+"""
+import random
+import time
+from datetime import date, timedelta
+from typing import Awaitable, Callable, Dict
+
+import httpx
+
+from bench.fixtures import Actors
+
+
+STATUSES = ["present"] * 8 + ["late", "absent", "absent", "excused"]
+
+Recorder = Callable[[str, float, bool], None]
+
+
+async def timed(client: httpx.AsyncClient, record: Recorder, name: str, method: str, url: str, **kwargs) -> httpx.Response:
+    """Issue a request and record its latency and success under `name`."""
+    started = time.perf_counter()
+    try:
+        response = await client.request(method, url, **kwargs)
+    except httpx.HTTPError:
+        record(name, time.perf_counter() - started, False)
+        raise
+    record(name, time.perf_counter() - started, response.status_code < 400)
+    return response
+
+
+def _auth(token: str) -> Dict[str, str]:
+    return {"Authorization": f"Bearer {token}"}
+
+
+async def morning_rush(client: httpx.AsyncClient, actors: Actors, record: Recorder, rng: random.Random) -> None:
+    """Teacher opens a session for one of their classes and bulk-saves statuses."""
+    teacher = rng.choice(actors.teachers)
+    class_id = rng.choice(teacher.class_ids)
+    headers = _auth(teacher.token)
+    # Spread sessions over recent days so runs create and reuse sessions
+    session_date = (date.today() - timedelta(days=rng.randrange(30))).isoformat()
+
+    response = await timed(
+        client, record, "POST /attendance/sessions", "POST", "/attendance/sessions",
+        json={"classId": class_id, "sessionDate": session_date}, headers=headers
+    )
+    if response.status_code >= 400:
+        return
+    session_id = response.json()["sessionId"]
+
+    updates = [
+        {"rollNo": roll_no, "status": rng.choice(STATUSES), "recognizedByAi": True}
+        for roll_no in teacher.rosters.get(class_id, [])
+    ]
+    await timed(
+        client, record, "PUT /attendance/sessions/{id}/statuses", "PUT",
+        f"/attendance/sessions/{session_id}/statuses",
+        json={"updates": updates}, headers=headers
+    )
+
+
+async def student_launch(client: httpx.AsyncClient, actors: Actors, record: Recorder, rng: random.Random) -> None:
+    """Student app cold start: classes, leaderboard, notifications."""
+    headers = _auth(rng.choice(actors.student_tokens))
+    await timed(client, record, "GET /students/me/classes", "GET", "/students/me/classes", headers=headers)
+    await timed(client, record, "GET /leaderboard", "GET", "/leaderboard", params={"limit": 50}, headers=headers)
+    await timed(client, record, "GET /notifications/me", "GET", "/notifications/me", headers=headers)
+
+
+async def admin_dashboard(client: httpx.AsyncClient, actors: Actors, record: Recorder, rng: random.Random) -> None:
+    """Admin dashboard load: all classes."""
+    await timed(client, record, "GET /classes", "GET", "/classes", headers=_auth(actors.admin_token))
+
+
+SCENARIOS: Dict[str, Callable[..., Awaitable[None]]] = {
+    "morning-rush": morning_rush,
+    "student-launch": student_launch,
+    "admin-dashboard": admin_dashboard,
+}
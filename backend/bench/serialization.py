@@ -0,0 +1,162 @@
+"""
+Serialization CPU per response: FastAPI's default path vs the orjson fast path.
+
+Usage:
+    python -m bench.serialization [--iterations 50] [--out bench-results/serialization.json]
+
+Builds admin-sized payloads shaped like the service output of GET /classes,
+GET /attendance/sessions and GET /leaderboard, then times (CPU time, not
+wall time) turning each into a response body two ways:
+
+- "default": what FastAPI does with a returned value: validate it against
+  the response_model (leaderboard only), jsonable_encoder, stdlib json.
+- "orjson": the routes' ORJSONResponse(payload) fast path.
+
+No database or server is needed, so numbers are comparable across machines
+only as ratios.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict
+
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from app.schemas.leaderboard import LeaderboardEntry, LeaderboardResponse
+
+
+STATUSES = ["PRESENT", "PRESENT", "PRESENT", "LATE", "ABSENT", "EXCUSED"]
+
+
+def classes_payload(classes: int = 200, students: int = 60) -> list:
+    """GET /classes for an admin: every class with schedule, reschedules and roster."""
+    now = datetime.now(timezone.utc).isoformat()
+    roster = [
+        {
+            "studentId": str(uuid.uuid4()), "rollNo": f"2K22/CO/{n:03d}", "name": f"Student {n}",
+            "photoUrl": None, "program": "B.Tech", "spCode": "CO", "semester": 5, "status": "active",
+            "duration": "4 years", "email": f"s{n}@example.com", "dtuEmail": f"s{n}@dtu.ac.in", "phone": None,
+        }
+        for n in range(students)
+    ]
+    return [
+        {
+            "id": str(uuid.uuid4()), "code": f"CO{300 + n}", "name": f"Course {n}", "section": "A",
+            "teacherType": "L", "ltpPattern": "3-1-0", "practicalGroup": None, "teacherId": str(n % 50),
+            "schedule": [{"dayOfWeek": day, "start": "09:00", "end": "10:00"} for day in (1, 3, 5)],
+            "reschedules": [],
+            "students": roster,
+            "createdAt": now, "updatedAt": now,
+        }
+        for n in range(classes)
+    ]
+
+
+def sessions_payload(sessions: int = 60, students: int = 60) -> list:
+    """GET /attendance/sessions for one class over a semester."""
+    class_id, teacher_id = str(uuid.uuid4()), str(uuid.uuid4())
+    start = datetime(2025, 1, 6, tzinfo=timezone.utc)
+    return [
+        {
+            "sessionId": str(uuid.uuid4()), "classId": class_id,
+            "sessionDate": (start + timedelta(days=2 * n)).date().isoformat(),
+            "teacherId": teacher_id, "processedImageUrl": None,
+            "createdAt": (start + timedelta(days=2 * n)).isoformat(),
+            "statuses": [
+                {
+                    "rollNo": f"2K22/CO/{s:03d}", "name": f"Student {s}",
+                    "status": STATUSES[(s + n) % len(STATUSES)],
+                    "recognizedByAi": s % 3 == 0, "similarityScore": 91.5 if s % 3 == 0 else None,
+                }
+                for s in range(students)
+            ],
+        }
+        for n in range(sessions)
+    ]
+
+
+def leaderboard_payload(entries: int = 200) -> dict:
+    """GET /leaderboard at the maximum page size, plus the caller's own entry."""
+    items = [
+        {
+            "studentId": str(uuid.uuid4()), "rollNo": f"2K22/CO/{n:03d}", "name": f"Student {n}",
+            "attendancePercentage": 95.0 - n * 0.1, "consistency": 0.9, "maxStreak": 12, "coins": 140.5,
+            "level": 3, "attendedCount": 55, "totalCount": 60, "presentCount": 50, "lateCount": 5,
+            "absentCount": 4, "excusedCount": 1, "rank": n + 1,
+        }
+        for n in range(entries)
+    ]
+    return {"total": 50000, "limit": entries, "offset": 0, "items": items, "selfEntry": items[0]}
+
+
+def default_body(loop: asyncio.AbstractEventLoop, payload, response_model=None) -> bytes:
+    """FastAPI's path for a returned value: validate, jsonable_encoder, json.dumps."""
+    field = create_response_field(name="response", type_=response_model) if response_model else None
+    content = loop.run_until_complete(serialize_response(field=field, response_content=payload, is_coroutine=True))
+    return JSONResponse(content).body
+
+
+def cpu_ms(func: Callable[[], bytes], iterations: int) -> float:
+    """Mean CPU milliseconds per call, after one warm-up call."""
+    func()
+    started = time.process_time()
+    for _ in range(iterations):
+        func()
+    return (time.process_time() - started) / iterations * 1000
+
+
+def run(iterations: int) -> Dict[str, dict]:
+    leaderboard = leaderboard_payload()
+    # The leaderboard used to build pydantic models, which FastAPI then re-validated
+    leaderboard_models = LeaderboardResponse(
+        **{**leaderboard, "items": [LeaderboardEntry(**item) for item in leaderboard["items"]]}
+    )
+    cases = {
+        "GET /classes": (classes_payload(), None, None),
+        "GET /attendance/sessions": (sessions_payload(), None, None),
+        "GET /leaderboard": (leaderboard, leaderboard_models, LeaderboardResponse),
+    }
+
+    loop = asyncio.new_event_loop()
+    results = {}
+    for name, (payload, before_payload, response_model) in cases.items():
+        before = before_payload if before_payload is not None else payload
+        body = ORJSONResponse(payload).body
+        assert json.loads(body) == json.loads(default_body(loop, before, response_model)), name
+
+        default = cpu_ms(lambda: default_body(loop, before, response_model), iterations)
+        fast = cpu_ms(lambda: ORJSONResponse(payload).body, iterations)
+        results[name] = {
+            "bytes": len(body),
+            "default_cpu_ms": round(default, 3),
+            "orjson_cpu_ms": round(fast, 3),
+            "speedup": round(default / fast, 1) if fast else None,
+        }
+    loop.close()
+    return results
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m bench.serialization", description=__doc__.split("\n")[1])
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--out", help="Write JSON here (default: stdout)")
+    args = parser.parse_args(argv)
+
+    output = json.dumps(run(args.iterations), indent=2)
+    if args.out:
+        os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+        with open(args.out, "w") as f:
+            f.write(output + "\n")
+    print(output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
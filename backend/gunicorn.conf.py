@@ -0,0 +1,16 @@
+"""
+Gunicorn settings for multi-worker deployments.
+
+    gunicorn -c gunicorn.conf.py -k uvicorn.workers.UvicornWorker -w 4 app.main:app
+
+With PROMETHEUS_MULTIPROC_DIR set, each worker writes its metric samples
+to that directory; a worker's live gauges must be dropped when it exits.
+"""
+import os
+
+
+def child_exit(server, worker):
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,104 @@
+"""
+Session writes, and session history paging: keyset cursors, date validation
+and the columnar form.
+"""
+from app.models.user import UserRole
+
+
+def _get(client, dataset, query: str):
+    return client.get(
+        f"/attendance/sessions?classId={dataset.class_ids[0]}{query}",
+        headers=dataset.auth(UserRole.TEACHER),
+    )
+
+
+def test_cursor_walks_every_session_once_newest_first(client, dataset):
+    full = _get(client, dataset, "")
+    assert full.status_code == 200, full.text
+    assert "x-next-cursor" not in full.headers
+
+    pages, query = [], "&limit=2"
+    while True:
+        response = _get(client, dataset, query)
+        assert response.status_code == 200, response.text
+        pages.append(response.json())
+        cursor = response.headers.get("x-next-cursor")
+        if not cursor:
+            break
+        query = f"&limit=2&cursor={cursor}"
+
+    assert [len(page) for page in pages] == [2, 2, 1]
+    walked = [session for page in pages for session in page]
+    assert walked == full.json()
+    dates = [session["sessionDate"] for session in walked]
+    assert dates == sorted(dates, reverse=True)
+
+
+def test_date_window_is_inclusive(client, dataset):
+    response = _get(client, dataset, "&from=2025-01-13&to=2025-01-20")
+
+    assert response.status_code == 200, response.text
+    assert [s["sessionDate"] for s in response.json()] == ["2025-01-20", "2025-01-13"]
+
+
+def test_malformed_parameters_are_rejected(client, dataset):
+    for query in ("&from=13-01-2025", "&to=yesterday", "&from=2025-02-01&to=2025-01-01", "&cursor=not-a-cursor"):
+        response = _get(client, dataset, query)
+        assert response.status_code == 400, (query, response.text)
+
+
+def test_columnar_matches_nested(client, dataset):
+    nested = _get(client, dataset, "&limit=3").json()
+    response = _get(client, dataset, "&limit=3&format=columnar")
+
+    assert response.status_code == 200, response.text
+    columnar = response.json()
+    assert columnar["nextCursor"] == response.headers["x-next-cursor"]
+    rolls = columnar["students"]["rollNo"]
+    assert rolls == sorted(rolls)
+
+    for expected, session in zip(nested, columnar["sessions"], strict=True):
+        assert session["sessionId"] == expected["sessionId"]
+        statuses = {
+            roll: status
+            for roll, status in zip(rolls, session["statuses"])
+            if status is not None
+        }
+        assert statuses == {s["rollNo"]: s["status"] for s in expected["statuses"]}
+
+
+def test_columnar_empty_window_keeps_its_shape(client, dataset):
+    response = _get(client, dataset, "&from=2030-01-01&format=columnar")
+
+    assert response.status_code == 200, response.text
+    assert "x-next-cursor" not in response.headers
+    body = response.json()
+    assert body["students"] == {"rollNo": [], "name": []}
+    assert body["sessions"] == []
+    assert body["nextCursor"] is None
+
+
+def test_create_session_then_save_statuses(client, dataset):
+    headers = dataset.auth(UserRole.TEACHER)
+    body = {"classId": str(dataset.class_ids[2]), "sessionDate": "2025-03-03"}
+
+    created = client.post("/attendance/sessions", json=body, headers=headers)
+    assert created.status_code == 200, created.text
+    session_id = created.json()["sessionId"]
+    assert created.json()["teacherId"] == str(dataset.teacher_user_id)
+    # Same class and date: the existing session comes back
+    assert client.post("/attendance/sessions", json=body, headers=headers).json()["sessionId"] == session_id
+
+    updates = [
+        {"rollNo": "TS001", "status": "present", "recognizedByAi": True, "similarityScore": 0.0},
+        {"rollNo": "TS002", "status": "late"},
+        {"rollNo": "TS003", "status": "asleep"},
+        {"rollNo": "NOT-ENROLLED", "status": "present"},
+    ]
+    response = client.put(f"/attendance/sessions/{session_id}/statuses", json={"updates": updates}, headers=headers)
+
+    assert response.status_code == 200, response.text
+    assert sorted(response.json()["statuses"], key=lambda s: s["rollNo"]) == [
+        {"rollNo": "TS001", "name": "Student 1", "status": "PRESENT", "recognizedByAi": True, "similarityScore": 0.0},
+        {"rollNo": "TS002", "name": "Student 2", "status": "LATE", "recognizedByAi": False, "similarityScore": None},
+    ]
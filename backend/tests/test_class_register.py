@@ -0,0 +1,40 @@
+"""
+The packed register must carry exactly what the session history does.
+"""
+from app.models.user import UserRole
+
+
+def test_register_matrix_matches_session_statuses(client, dataset):
+    class_id = dataset.class_ids[1]
+    headers = dataset.auth(UserRole.TEACHER)
+
+    response = client.get(f"/stats/classes/{class_id}/register", headers=headers)
+    assert response.status_code == 200, response.text
+    register = response.json()
+
+    dates = register["sessions"]["date"]
+    rolls = register["students"]["rollNo"]
+    assert dates == sorted(dates)
+    assert rolls == sorted(rolls)
+    assert len(register["matrix"]) == len(dates) * len(rolls)
+
+    sessions = client.get(f"/attendance/sessions?classId={class_id}", headers=headers).json()
+    expected = {
+        (session["sessionDate"], status["rollNo"]): status["status"]
+        for session in sessions
+        for status in session["statuses"]
+    }
+    legend = register["legend"]
+    actual = {
+        (date, roll): legend[register["matrix"][i * len(dates) + j]]
+        for i, roll in enumerate(rolls)
+        for j, date in enumerate(dates)
+    }
+    assert {cell: status for cell, status in actual.items() if status is not None} == expected
+
+
+def test_register_is_owner_only(client, dataset):
+    response = client.get(
+        f"/stats/classes/{dataset.class_ids[0]}/register", headers=dataset.auth(UserRole.STUDENT)
+    )
+    assert response.status_code == 403
@@ -0,0 +1,59 @@
+"""
+CompressionMiddleware's Vary handling: compressible responses always say
+they vary on Accept-Encoding, merged into any Vary the route set itself.
+"""
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
+from fastapi.testclient import TestClient
+
+from app.compression import CompressionMiddleware
+
+BODY = "attendance " * 500
+
+
+def _client() -> TestClient:
+    app = FastAPI()
+
+    @app.get("/plain")
+    def plain():
+        return PlainTextResponse(BODY)
+
+    @app.get("/varied")
+    def varied():
+        return PlainTextResponse(BODY, headers={"Vary": "Origin"})
+
+    @app.get("/image")
+    def image():
+        return PlainTextResponse(BODY, media_type="image/png")
+
+    app.add_middleware(CompressionMiddleware)
+    return TestClient(app)
+
+
+def test_compressed_response_varies_on_accept_encoding():
+    response = _client().get("/plain", headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers.get_list("vary") == ["Accept-Encoding"]
+    assert response.text == BODY
+
+
+def test_existing_vary_is_merged_not_duplicated():
+    response = _client().get("/varied", headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers.get_list("vary") == ["Origin, Accept-Encoding"]
+
+
+def test_uncompressed_response_still_varies():
+    response = _client().get("/varied", headers={"Accept-Encoding": "identity"})
+
+    assert "content-encoding" not in response.headers
+    assert response.headers.get_list("vary") == ["Origin, Accept-Encoding"]
+    assert response.text == BODY
+
+
+def test_incompressible_type_has_no_vary():
+    response = _client().get("/image", headers={"Accept-Encoding": "identity"})
+
+    assert "vary" not in response.headers
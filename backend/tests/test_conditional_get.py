@@ -0,0 +1,118 @@
+"""
+ETag / If-None-Match behaviour of the read-heavy endpoints.
+
+A matching If-None-Match must be answered with 304 after at most the user
+lookup and the change counter lookup, and a write to the underlying data
+must change the ETag.
+"""
+import pytest
+
+from app.models.user import UserRole
+
+
+# (role, path template)
+CONDITIONAL_ENDPOINTS = [
+    (UserRole.TEACHER, "/classes"),
+    (UserRole.ADMIN, "/classes"),
+    (UserRole.STUDENT, "/students/me/classes"),
+    (UserRole.STUDENT, "/students/me/classes/{class_id}/attendance"),
+    (UserRole.STUDENT, "/leaderboard"),
+    (UserRole.STUDENT, "/notifications/me"),
+    (UserRole.TEACHER, "/stats/classes/{class_id}/register"),
+]
+
+# Everything except /notifications/me depends on the class's roster
+CLASS_ENDPOINTS = [(role, path) for role, path in CONDITIONAL_ENDPOINTS if path != "/notifications/me"]
+
+
+def _get(client, dataset, role, path, **headers):
+    return client.get(path.format(class_id=dataset.class_ids[0]), headers={**dataset.auth(role), **headers})
+
+
+@pytest.mark.parametrize("role,path", CONDITIONAL_ENDPOINTS, ids=[f"{r.value} {p}" for r, p in CONDITIONAL_ENDPOINTS])
+def test_matching_etag_short_circuits(client, dataset, query_counter, role, path):
+    first = _get(client, dataset, role, path)
+    assert first.status_code == 200, first.text
+    etag = first.headers["etag"]
+    assert first.headers["cache-control"] == "private, no-cache"
+
+    query_counter.reset()
+    second = _get(client, dataset, role, path, **{"If-None-Match": etag})
+
+    assert second.status_code == 304
+    assert second.content == b""
+    assert second.headers["etag"] == etag
+    assert query_counter.count <= 2, query_counter.report()
+
+    # Weak comparison: the opaque tag matches with or without W/
+    assert _get(client, dataset, role, path, **{"If-None-Match": etag.removeprefix("W/")}).status_code == 304
+    assert _get(client, dataset, role, path, **{"If-None-Match": '"stale"'}).status_code == 200
+
+
+def test_roster_change_invalidates_class_etags(client, dataset):
+    before = {
+        path: _get(client, dataset, role, path).headers["etag"]
+        for role, path in CLASS_ENDPOINTS
+    }
+
+    roster = {"students": [{
+        "universityRoll": "2K22/ET/1", "rollNo": "ET0001", "name": "ETag Student",
+        "email": "et1@test.local", "dtuEmail": "et1@dtu.test.local",
+    }]}
+    response = client.put(
+        f"/classes/{dataset.class_ids[0]}/students", json=roster, headers=dataset.auth(UserRole.TEACHER)
+    )
+    assert response.status_code == 200, response.text
+
+    for role, path in CLASS_ENDPOINTS:
+        after = _get(client, dataset, role, path, **{"If-None-Match": before[path]})
+        assert after.status_code == 200, path
+        assert after.headers["etag"] != before[path], path
+
+
+def test_reading_a_notification_invalidates_its_etag(client, dataset):
+    path = "/notifications/me"
+    first = _get(client, dataset, UserRole.STUDENT, path)
+    notification_id = first.json()[0]["id"]
+
+    response = client.post(f"/notifications/me/{notification_id}/read", headers=dataset.auth(UserRole.STUDENT))
+    assert response.status_code == 200, response.text
+
+    after = _get(client, dataset, UserRole.STUDENT, path, **{"If-None-Match": first.headers["etag"]})
+    assert after.status_code == 200
+    assert after.headers["etag"] != first.headers["etag"]
+
+
+def _mark_first_student(client, dataset, class_id):
+    teacher = dataset.auth(UserRole.TEACHER)
+    session_id = client.get(f"/attendance/sessions?classId={class_id}&limit=1", headers=teacher).json()[0]["sessionId"]
+    response = client.put(
+        f"/attendance/sessions/{session_id}/statuses",
+        json={"updates": [{"rollNo": "TS000", "status": "excused"}]},
+        headers=teacher,
+    )
+    assert response.status_code == 200, response.text
+
+
+def test_status_write_invalidates_student_etags(client, dataset):
+    class_id = dataset.class_ids[1]
+    paths = [f"/students/me/classes/{class_id}/attendance", "/leaderboard"]
+    before = {path: _get(client, dataset, UserRole.STUDENT, path).headers["etag"] for path in paths}
+
+    _mark_first_student(client, dataset, class_id)
+
+    for path in paths:
+        after = _get(client, dataset, UserRole.STUDENT, path, **{"If-None-Match": before[path]})
+        assert after.status_code == 200, path
+        assert after.headers["etag"] != before[path], path
+
+
+def test_status_write_leaves_unrelated_student_etags_valid(client, dataset):
+    # Marking class 1 changes neither the inbox nor class 2's attendance view
+    paths = [f"/students/me/classes/{dataset.class_ids[2]}/attendance", "/notifications/me"]
+    before = {path: _get(client, dataset, UserRole.STUDENT, path).headers["etag"] for path in paths}
+
+    _mark_first_student(client, dataset, dataset.class_ids[1])
+
+    for path in paths:
+        assert _get(client, dataset, UserRole.STUDENT, path, **{"If-None-Match": before[path]}).status_code == 304, path
@@ -0,0 +1,91 @@
+"""
+Attendance exports: streamed CSV/Parquet and the background job path.
+"""
+import csv
+import io
+
+import pyarrow.parquet as pq
+
+from app.config import settings
+from app.db import SessionLocal
+from app.models.export_job import ExportJob
+from app.models.user import UserRole
+from app.services import attendance_export
+
+
+# Seeded per class: 20 students x 5 sessions
+CLASS_ROWS = 100
+
+
+def _export(client, dataset, query: str = ""):
+    return client.get(f"/exports/attendance?{query}", headers=dataset.auth(UserRole.ADMIN))
+
+
+def test_csv_streams_filtered_rows(client, dataset):
+    response = _export(client, dataset, f"classId={dataset.class_ids[0]}")
+
+    assert response.status_code == 200, response.text
+    assert response.headers["content-type"].startswith("text/csv")
+    assert "attachment" in response.headers["content-disposition"]
+    rows = list(csv.reader(io.StringIO(response.text)))
+    assert rows[0] == attendance_export.EXPORT_COLUMNS
+    assert len(rows) == 1 + CLASS_ROWS
+
+
+def test_parquet_has_one_row_group_per_batch(client, dataset, monkeypatch):
+    monkeypatch.setattr(settings, "export_batch_rows", 30)
+    response = _export(client, dataset, f"format=parquet&classId={dataset.class_ids[0]}")
+
+    assert response.status_code == 200, response.text
+    parquet = pq.ParquetFile(io.BytesIO(response.content))
+    assert parquet.metadata.num_rows == CLASS_ROWS
+    assert parquet.metadata.num_row_groups == 4
+    assert parquet.schema_arrow == attendance_export.PARQUET_SCHEMA
+
+
+def test_date_and_department_filters(client, dataset):
+    window = _export(client, dataset, f"classId={dataset.class_ids[0]}&from=2025-01-13&to=2025-01-20")
+    assert len(window.text.splitlines()) == 1 + 40
+
+    nobody = _export(client, dataset, "department=Nowhere")
+    assert nobody.text.splitlines() == [",".join(attendance_export.EXPORT_COLUMNS)]
+
+    assert _export(client, dataset, "from=2025-02-01&to=2025-01-01").status_code == 400
+    assert _export(client, dataset, "from=01-02-2025").status_code == 422
+
+
+def test_exports_are_admin_only(client, dataset):
+    response = client.get("/exports/attendance", headers=dataset.auth(UserRole.TEACHER))
+    assert response.status_code == 403
+
+
+class _RecordingStorage:
+    """Stands in for the blob backend: keeps the uploaded artifact."""
+
+    def __init__(self):
+        self.uploads = {}
+
+    def upload_export(self, job_id, file_data, filename, content_type, requested_by):
+        blob_name = f"exports/{job_id}/{filename}"
+        self.uploads[blob_name] = file_data.read()
+        return blob_name
+
+
+def test_background_job_uploads_artifact(dataset, monkeypatch):
+    storage = _RecordingStorage()
+    monkeypatch.setattr(attendance_export, "azure_storage", storage)
+    filters = attendance_export.ExportFilters(class_id=dataset.class_ids[1])
+
+    db = SessionLocal()
+    try:
+        job = attendance_export.create_export_job(db, dataset.teacher_user_id, "csv", filters)
+        attendance_export.run_export_job(job.job_id)
+        db.expire_all()
+        job = db.query(ExportJob).filter(ExportJob.job_id == job.job_id).one()
+    finally:
+        db.close()
+
+    assert job.status == "done", job.error
+    assert job.row_count == CLASS_ROWS
+    assert job.finished_at is not None
+    assert len(storage.uploads[job.blob_name].decode().splitlines()) == 1 + CLASS_ROWS
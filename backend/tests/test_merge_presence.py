@@ -0,0 +1,72 @@
+"""
+POST /attendance/sessions/{id}/merge-presence: authorization comes before
+the BT sidecar is called, and face-recognition scores survive the merge.
+"""
+from app.auth.jwt import create_jwt
+from app.db import SessionLocal
+from app.models.attendance import AttendanceSession
+from app.models.user import User, UserRole
+from app.routes import attendance_routes
+
+
+def _session_id(class_id):
+    db = SessionLocal()
+    try:
+        return db.query(AttendanceSession.session_id).filter(
+            AttendanceSession.class_id == class_id
+        ).order_by(AttendanceSession.session_date).first()[0]
+    finally:
+        db.close()
+
+
+def _record_sidecar_calls(monkeypatch, present=frozenset()):
+    calls = []
+
+    async def fetch_present_emails(class_id):
+        calls.append(class_id)
+        return set(present)
+
+    monkeypatch.setattr(attendance_routes, "fetch_present_emails", fetch_present_emails)
+    return calls
+
+
+def test_other_teacher_is_rejected_before_sidecar_call(client, dataset, monkeypatch):
+    calls = _record_sidecar_calls(monkeypatch)
+    db = SessionLocal()
+    try:
+        other = User(email="other-teacher@test.local", name="Other Teacher", role=UserRole.TEACHER)
+        db.add(other)
+        db.commit()
+        token = create_jwt(other.uuid, other.email, other.role.value)
+    finally:
+        db.close()
+
+    response = client.post(
+        f"/attendance/sessions/{_session_id(dataset.class_ids[2])}/merge-presence",
+        json={"faceResults": [], "markAbsent": False},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+
+    assert response.status_code == 403, response.text
+    assert calls == []
+
+
+def test_zero_similarity_score_is_kept(client, dataset, monkeypatch):
+    calls = _record_sidecar_calls(monkeypatch)
+    class_id = dataset.class_ids[2]
+
+    response = client.post(
+        f"/attendance/sessions/{_session_id(class_id)}/merge-presence",
+        json={
+            "faceResults": [{"rollNo": "TS001", "status": "present", "recognizedByAi": True, "similarityScore": 0.0}],
+            "markAbsent": False,
+        },
+        headers=dataset.auth(UserRole.TEACHER),
+    )
+
+    assert response.status_code == 200, response.text
+    assert calls == [str(class_id)]
+    assert response.json()["statuses"] == [{
+        "rollNo": "TS001", "name": "Student 1", "status": "PRESENT",
+        "recognizedByAi": True, "similarityScore": 0.0,
+    }]
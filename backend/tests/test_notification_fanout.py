@@ -0,0 +1,135 @@
+"""
+Shared notifications: the low-attendance fan-out is one set-based statement
+that stores the message once, and broadcasts reach students through their
+inbox with per-student read markers.
+"""
+from sqlalchemy import func
+
+from app.db import SessionLocal
+from app.models.attendance import AttendanceSession, AttendanceStatus, AttendanceStatusRecord
+from app.models.class_model import ClassStudent
+from app.models.notification import Notification, NotificationReceipt
+from app.models.user import UserRole
+
+
+def _expected_recipients(class_id, threshold: float) -> set:
+    """The old per-enrollment rule, evaluated in Python."""
+    db = SessionLocal()
+    try:
+        held = db.query(func.count()).filter(AttendanceSession.class_id == class_id).scalar()
+        present = dict(
+            db.query(AttendanceStatusRecord.student_id, func.count())
+            .join(AttendanceSession, AttendanceSession.session_id == AttendanceStatusRecord.session_id)
+            .filter(AttendanceSession.class_id == class_id, AttendanceStatusRecord.status == AttendanceStatus.PRESENT)
+            .group_by(AttendanceStatusRecord.student_id)
+            .all()
+        )
+        enrolled = [row[0] for row in db.query(ClassStudent.student_id).filter(ClassStudent.class_id == class_id)]
+        return {
+            student_id for student_id in enrolled
+            if (present.get(student_id, 0) / held * 100 if held else 0) <= threshold
+        }
+    finally:
+        db.close()
+
+
+def test_send_writes_one_notification_per_low_student(client, dataset, query_counter):
+    class_id = dataset.class_ids[1]
+    title = "Low attendance fan-out"
+    expected = _expected_recipients(class_id, 40.0)
+    assert expected, "fixture should have students under the threshold"
+
+    query_counter.reset()
+    response = client.post(
+        "/notifications/admin/send",
+        json={"title": title, "message": "Please attend", "attendance_threshold": 40.0, "class_id": str(class_id)},
+        headers=dataset.auth(UserRole.ADMIN),
+    )
+
+    assert response.status_code == 200, response.text
+    assert response.json()["notifications_created"] == len(expected)
+    # User lookup, the fan-out statement and COMMIT
+    assert query_counter.count <= 3, query_counter.report()
+
+    db = SessionLocal()
+    try:
+        messages = db.query(Notification).filter(Notification.title == title).all()
+        recipients = [
+            row[0] for row in
+            db.query(NotificationReceipt.student_id).filter(NotificationReceipt.notification_id == messages[0].notification_id)
+        ]
+    finally:
+        db.close()
+    assert len(messages) == 1
+    assert messages[0].student_id is None and messages[0].audience == "recipients"
+    assert sorted(recipients) == sorted(expected)
+
+
+def test_send_is_admin_only(client, dataset):
+    response = client.post(
+        "/notifications/admin/send",
+        json={"title": "x", "message": "y", "attendance_threshold": 100.0},
+        headers=dataset.auth(UserRole.TEACHER),
+    )
+    assert response.status_code == 403
+
+
+def _inbox(client, dataset, **headers):
+    return client.get("/notifications/me", headers={**dataset.auth(UserRole.STUDENT), **headers})
+
+
+def _find(inbox, title):
+    return next((n for n in inbox.json() if n["title"] == title), None)
+
+
+def test_broadcast_reaches_inbox_and_tracks_reads(client, dataset):
+    before = _inbox(client, dataset)
+    response = client.post(
+        "/notifications/admin/broadcast",
+        json={"title": "Campus closed", "message": "Friday"},
+        headers=dataset.auth(UserRole.ADMIN),
+    )
+    assert response.status_code == 200, response.text
+
+    # The broadcast counter invalidates every student's inbox ETag
+    inbox = _inbox(client, dataset, **{"If-None-Match": before.headers["etag"]})
+    assert inbox.status_code == 200
+    broadcast = _find(inbox, "Campus closed")
+    assert broadcast["is_read"] is False
+    assert broadcast["student_id"] == dataset.student_id
+
+    read = client.post(f"/notifications/me/{broadcast['id']}/read", headers=dataset.auth(UserRole.STUDENT))
+    assert read.status_code == 200, read.text
+    assert _find(_inbox(client, dataset), "Campus closed")["is_read"] is True
+    assert _find(client.get("/notifications/me?unread_only=true", headers=dataset.auth(UserRole.STUDENT)), "Campus closed") is None
+
+    db = SessionLocal()
+    try:
+        receipts = db.query(NotificationReceipt).filter(NotificationReceipt.notification_id == broadcast["id"]).count()
+    finally:
+        db.close()
+    assert receipts == 1
+
+
+def test_class_broadcast_only_reaches_enrolled_students(client, dataset):
+    db = SessionLocal()
+    try:
+        notification = Notification(
+            title="Other class only", message="x", notification_type="manual",
+            is_read=False, audience="class", audience_class_id=dataset.class_ids[0],
+        )
+        db.add(notification)
+        db.commit()
+        other = notification.notification_id
+        # Student 0 is enrolled in every seeded class, so drop them from this one
+        db.query(ClassStudent).filter(
+            ClassStudent.class_id == dataset.class_ids[0], ClassStudent.student_id == dataset.student_id
+        ).delete()
+        db.commit()
+        assert _find(_inbox(client, dataset), "Other class only") is None
+        response = client.post(f"/notifications/me/{other}/read", headers=dataset.auth(UserRole.STUDENT))
+        assert response.status_code == 404
+    finally:
+        db.add(ClassStudent(class_id=dataset.class_ids[0], student_id=dataset.student_id))
+        db.commit()
+        db.close()
@@ -0,0 +1,99 @@
+"""
+SQL statement budgets per endpoint.
+
+Each request below must stay within a fixed number of statements no matter
+how many classes, students or sessions it touches; a per-row query loop
+(N+1) shows up here as a budget overrun. Budgets include the statement that
+loads the authenticated user and, for ETag-validated endpoints, the change
+counter lookup.
+"""
+import pytest
+
+from app.models.user import UserRole
+
+
+# (role, path template, budget)
+READ_BUDGETS = [
+    (UserRole.TEACHER, "/classes", 6),
+    (UserRole.ADMIN, "/classes", 6),
+    (UserRole.TEACHER, "/stats/classes/{class_id}/students", 4),
+    (UserRole.TEACHER, "/stats/classes/{class_id}/register", 3),
+    (UserRole.TEACHER, "/attendance/sessions?classId={class_id}", 4),
+    (UserRole.TEACHER, "/attendance/sessions?classId={class_id}&limit=2&format=columnar", 4),
+    (UserRole.STUDENT, "/students/me/classes", 4),
+    (UserRole.STUDENT, "/students/me/classes/{class_id}/attendance", 4),
+    (UserRole.STUDENT, "/leaderboard", 4),
+    (UserRole.STUDENT, "/notifications/me", 3),
+]
+
+
+@pytest.mark.parametrize("role,path,budget", READ_BUDGETS, ids=[f"{r.value} {p}" for r, p, _ in READ_BUDGETS])
+def test_read_endpoint_query_budget(client, dataset, query_counter, role, path, budget):
+    url = path.format(class_id=dataset.class_ids[0])
+
+    query_counter.reset()
+    response = client.get(url, headers=dataset.auth(role))
+
+    assert response.status_code == 200, response.text
+    assert query_counter.count <= budget, (
+        f"GET {path} ran {query_counter.count} statements (budget {budget}):\n{query_counter.report()}"
+    )
+
+
+def _roster(size: int, offset: int = 0):
+    return {
+        "students": [
+            {
+                "universityRoll": f"2K22/RB/{n}",
+                "rollNo": f"RB{n:04d}",
+                "name": f"Roster Student {n}",
+                "email": f"rb{n}@test.local",
+                "dtuEmail": f"rb{n}@dtu.test.local",
+            }
+            for n in range(offset, offset + size)
+        ]
+    }
+
+
+def test_roster_update_query_count_is_independent_of_size(client, dataset, query_counter):
+    url = f"/classes/{dataset.class_ids[2]}/students"
+    headers = dataset.auth(UserRole.TEACHER)
+
+    counts = []
+    for size, offset in ((5, 0), (60, 100)):
+        query_counter.reset()
+        response = client.put(url, json=_roster(size, offset), headers=headers)
+        assert response.status_code == 200, response.text
+        assert response.json()["summary"]["inserted"] == size
+        counts.append(query_counter.count)
+
+    assert counts[0] == counts[1], (
+        f"PUT /classes/{{id}}/students ran {counts[0]} statements for 5 students "
+        f"but {counts[1]} for 60:\n{query_counter.report()}"
+    )
+    assert counts[1] <= 16, query_counter.report()
+
+
+def test_status_update_query_count_is_independent_of_size(client, dataset, query_counter):
+    headers = dataset.auth(UserRole.TEACHER)
+    created = client.post(
+        "/attendance/sessions",
+        json={"classId": str(dataset.class_ids[1]), "sessionDate": "2025-03-10"},
+        headers=headers,
+    )
+    assert created.status_code == 200, created.text
+    url = f"/attendance/sessions/{created.json()['sessionId']}/statuses"
+
+    counts = []
+    for size in (5, 20):
+        updates = [{"rollNo": f"TS{n:03d}", "status": "present"} for n in range(size)]
+        query_counter.reset()
+        response = client.put(url, json={"updates": updates}, headers=headers)
+        assert response.status_code == 200, response.text
+        assert len(response.json()["statuses"]) == size
+        counts.append(query_counter.count)
+
+    assert counts[0] == counts[1], (
+        f"PUT /attendance/sessions/{{id}}/statuses ran {counts[0]} statements for 5 updates "
+        f"but {counts[1]} for 20:\n{query_counter.report()}"
+    )
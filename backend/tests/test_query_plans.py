@@ -0,0 +1,145 @@
+"""
+Query-plan checks for the hand-written SQL.
+
+Every text() query in the stats service and the student, leaderboard and
+notification routes is EXPLAINed with sequential scans, hash joins and
+merge joins disabled (on a few hundred test rows, hashing a whole table is
+always cheapest, which says nothing about production volume). The planner
+then only reads a whole table when no index can serve the access:
+a Seq Scan, or an index scan whose condition does not constrain the index's
+leading column (PostgreSQL walks the entire index for those). Either on a
+large table means the query lost, or never had, its index.
+"""
+import json
+import re
+from typing import Dict, Tuple
+
+import pytest
+from sqlalchemy import text
+
+from app.db import engine
+from app.routes import leaderboard_routes, notification_routes, student_routes
+from app.services import change_versions, stats_service
+
+
+# Tables that grow with students x sessions
+LARGE_TABLES = {"attendance", "sessions", "students", "class_students", "notifications", "notification_receipts", "change_versions"}
+
+# Steer the planner towards per-row index lookups wherever one exists
+PLANNER_SETTINGS = ("enable_seqscan", "enable_hashjoin", "enable_mergejoin")
+
+# Global rankings read every status by design
+WHOLE_TABLE = {"attendance", "sessions", "students", "class_students"}
+
+
+def _class(dataset):
+    return dataset.class_ids[0]
+
+
+def _send_params(dataset, class_id):
+    return {
+        "class_id": str(class_id) if class_id else None, "threshold": 75.0,
+        "sender_user_id": dataset.teacher_user_id, "title": "t", "message": "m",
+    }
+
+
+# (id, query, params(dataset), tables allowed to be scanned)
+PLAN_CASES = [
+    ("stats.class_summary", stats_service.CLASS_SUMMARY_QUERY,
+     lambda d: {"class_id": _class(d)}, set()),
+    ("stats.register", stats_service.REGISTER_QUERY,
+     lambda d: {"class_id": _class(d)}, set()),
+    ("stats.register_version", stats_service.CLASS_REGISTER_VERSION_QUERY,
+     lambda d: {"class_id": _class(d)}, set()),
+    ("stats.class_session_count", stats_service.CLASS_SESSION_COUNT_QUERY,
+     lambda d: {"class_id": _class(d)}, set()),
+    ("stats.student_summary", stats_service.STUDENT_SUMMARY_QUERY,
+     lambda d: {"student_id": d.student_id, "teacher_user_id": d.teacher_user_id}, set()),
+    ("students.classes", student_routes.STUDENT_CLASSES_QUERY,
+     lambda d: {"student_id": d.student_id}, set()),
+    ("students.class_schedules", student_routes.CLASS_SCHEDULES_QUERY,
+     lambda d: {"class_ids": d.class_ids}, set()),
+    ("students.class_records", student_routes.STUDENT_CLASS_RECORDS_QUERY,
+     lambda d: {"student_id": d.student_id, "class_id": _class(d)}, set()),
+    ("leaderboard.page", leaderboard_routes.LEADERBOARD_QUERY,
+     lambda d: {"limit": 50, "offset": 0}, WHOLE_TABLE),
+    ("leaderboard.self", leaderboard_routes.LEADERBOARD_SELF_QUERY,
+     lambda d: {"student_id": d.student_id}, WHOLE_TABLE),
+    ("notifications.send_low_attendance_class", notification_routes.SEND_LOW_ATTENDANCE_QUERY,
+     lambda d: _send_params(d, _class(d)), set()),
+    # Every enrollment is a candidate: grouped passes over whole tables
+    ("notifications.send_low_attendance_all", notification_routes.SEND_LOW_ATTENDANCE_QUERY,
+     lambda d: _send_params(d, None), WHOLE_TABLE),
+    ("notifications.inbox", notification_routes.MY_NOTIFICATIONS_QUERY,
+     lambda d: {"student_id": d.student_id, "unread_only": False}, set()),
+    ("notifications.mark_shared_read", notification_routes.MARK_SHARED_READ_QUERY,
+     lambda d: {"student_id": d.student_id, "notification_id": 1}, set()),
+    ("change_versions.class_list", change_versions.CLASS_LIST_FINGERPRINT_QUERY,
+     lambda d: {"user_id": d.teacher_user_id, "all_classes": False}, set()),
+    ("change_versions.student", change_versions.STUDENT_FINGERPRINT_QUERY,
+     lambda d: {"email": "s0@test.local", "class_id": str(_class(d))}, set()),
+]
+
+
+INDEX_SCANS = {"Index Scan", "Index Only Scan", "Bitmap Index Scan"}
+
+# Indexed column on the left of each comparison in an "Index Cond"
+CONDITION_COLUMN = re.compile(r"\(\s*(\w+)\s*(?:=|<>|<=|>=|<|>|~~)")
+
+INDEX_LEADING_COLUMNS = text("""
+    SELECT ic.relname AS index_name, tc.relname AS table_name, a.attname AS column_name
+    FROM pg_index i
+    JOIN pg_class ic ON ic.oid = i.indexrelid
+    JOIN pg_class tc ON tc.oid = i.indrelid
+    JOIN pg_namespace n ON n.oid = tc.relnamespace
+    JOIN pg_attribute a ON a.attrelid = i.indrelid AND a.attnum = i.indkey[0]
+    WHERE n.nspname = current_schema()
+""")
+
+
+def full_scans(plan: dict, indexes: Dict[str, Tuple[str, str]]):
+    """
+    Yield the table of every node in a JSON plan tree that reads all of it.
+
+    Args:
+        plan: A "Plan" node from EXPLAIN (FORMAT JSON)
+        indexes: Index name -> (table, leading column)
+    """
+    node_type = plan.get("Node Type")
+    if node_type == "Seq Scan":
+        yield plan["Relation Name"]
+    elif node_type in INDEX_SCANS:
+        table, leading = indexes[plan["Index Name"]]
+        if leading not in CONDITION_COLUMN.findall(plan.get("Index Cond", "")):
+            yield table
+    for child in plan.get("Plans", []):
+        yield from full_scans(child, indexes)
+
+
+@pytest.fixture(scope="module")
+def analyzed(dataset):
+    with engine.begin() as connection:
+        connection.exec_driver_sql("ANALYZE")
+    return dataset
+
+
+@pytest.fixture(scope="module")
+def indexes(dataset) -> Dict[str, Tuple[str, str]]:
+    with engine.connect() as connection:
+        rows = connection.execute(INDEX_LEADING_COLUMNS).fetchall()
+    return {row.index_name: (row.table_name, row.column_name) for row in rows}
+
+
+@pytest.mark.parametrize("query,params,allowed", [case[1:] for case in PLAN_CASES], ids=[case[0] for case in PLAN_CASES])
+def test_query_uses_indexes(analyzed, indexes, query, params, allowed):
+    with engine.connect() as connection:
+        with connection.begin():
+            for setting in PLANNER_SETTINGS:
+                connection.exec_driver_sql(f"SET LOCAL {setting} = off")
+            result = connection.execute(text(f"EXPLAIN (FORMAT JSON) {query.text}"), params(analyzed)).scalar()
+
+    plan = (json.loads(result) if isinstance(result, str) else result)[0]["Plan"]
+    offending = sorted(set(full_scans(plan, indexes)) & (LARGE_TABLES - allowed))
+    assert not offending, (
+        f"Full scan of {', '.join(offending)}:\n{json.dumps(plan, indent=2)}"
+    )
@@ -1,7 +1,30 @@
+"""
+BT check-in sidecar.
+
+Check-in flags and presence live in process memory (`PresenceState`), which
+is what every read is served from. Writes update memory first and are
+persisted to SQLite write-behind by a background flusher; on startup the
+in-memory state is rebuilt from SQLite.
+
+Deployment note: the in-memory state is per process. Run a single uvicorn
+worker per instance (the Dockerfile does). If more throughput is needed, run
+several single-worker instances and route each class_id to the same instance
+(e.g. consistent hashing at the load balancer), since two workers sharing one
+SQLite file would each serve their own, diverging, view of presence.
+
+Live presence is pushed to teacher clients over server-sent events
+(`GET /bt-checkin/{class_id}/present/stream`) through `PresenceHub`, a
+per-class fan-out with a bounded queue per subscriber.
+"""
 import os
-from typing import Dict
-from fastapi import FastAPI, HTTPException, Header, Depends
+import json
+import time
+import asyncio
+import logging
+from typing import Dict, List, Optional, Set, Tuple
+from fastapi import FastAPI, HTTPException, Header, Depends, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 import aiosqlite
 from pathlib import Path
 
@@ -9,6 +32,19 @@ from pathlib import Path
 API_KEY = os.getenv("API_KEY", "change-me")
 DB_PATH = os.getenv("DB_PATH", "/app/data/bt_checkin.db")
 ALLOWED_ORIGINS = os.getenv("ALLOWED_ORIGINS", "*")
+# Presence older than this is considered stale and is neither returned nor kept
+PRESENCE_TTL_SECONDS = int(os.getenv("PRESENCE_TTL_SECONDS", "5400"))
+# How often the sweeper runs and how many expired rows it deletes per statement
+SWEEP_INTERVAL_SECONDS = int(os.getenv("SWEEP_INTERVAL_SECONDS", "60"))
+SWEEP_BATCH_SIZE = int(os.getenv("SWEEP_BATCH_SIZE", "500"))
+# Maximum delay between an accepted write and its persistence to SQLite
+FLUSH_INTERVAL_SECONDS = float(os.getenv("FLUSH_INTERVAL_SECONDS", "1.0"))
+# Events buffered per stream subscriber before it is considered too slow
+STREAM_QUEUE_SIZE = int(os.getenv("STREAM_QUEUE_SIZE", "256"))
+# Idle streams get a comment line this often so proxies keep them open
+STREAM_HEARTBEAT_SECONDS = float(os.getenv("STREAM_HEARTBEAT_SECONDS", "15"))
+
+logger = logging.getLogger("bt_checkin")
 
 app = FastAPI(title="BT Check-in Sidecar", version="1.0.0")
 
@@ -23,6 +59,213 @@ app.add_middleware(
 )
 
 
+def _now() -> int:
+    return int(time.time())
+
+
+class PresenceState:
+    """
+    In-memory check-in flags and presence, plus the set of pending writes.
+
+    All methods are synchronous and only called from the event loop thread,
+    so no locking is needed; `flush` is the only coroutine and it snapshots
+    the pending writes before awaiting SQLite.
+    """
+
+    def __init__(self):
+        self.enabled: Dict[str, bool] = {}
+        self.started_at: Dict[str, int] = {}
+        # class_id -> email -> last seen (epoch seconds)
+        self.present: Dict[str, Dict[str, int]] = {}
+        self._dirty_classes: Set[str] = set()
+        # (class_id, email) -> updated_at, or None for a deletion
+        self._dirty_present: Dict[Tuple[str, str], Optional[int]] = {}
+
+    async def load(self, db) -> None:
+        """Rebuild state from SQLite, skipping presence that already expired."""
+        cur = await db.execute("SELECT class_id, enabled, started_at FROM bt_checkin")
+        for class_id, enabled, started_at in await cur.fetchall():
+            self.enabled[class_id] = bool(enabled)
+            self.started_at[class_id] = started_at
+        cur = await db.execute(
+            "SELECT class_id, email, updated_at FROM bt_checkin_present WHERE updated_at >= ?",
+            (_now() - PRESENCE_TTL_SECONDS,),
+        )
+        for class_id, email, updated_at in await cur.fetchall():
+            self.present.setdefault(class_id, {})[email] = updated_at
+
+    def set_enabled(self, class_id: str, enabled: bool) -> bool:
+        """Returns True if this opened a new session window."""
+        # Enabling opens a new session window; presence from earlier sessions
+        # stops counting. Re-enabling an already open window keeps its start.
+        opened = enabled and not self.enabled.get(class_id, False)
+        if opened:
+            self.started_at[class_id] = _now()
+        self.started_at.setdefault(class_id, 0)
+        self.enabled[class_id] = enabled
+        self._dirty_classes.add(class_id)
+        return opened
+
+    def mark_present(self, class_id: str, email: str) -> bool:
+        """Returns True if the email was not already present in the live window."""
+        seen = self.present.setdefault(class_id, {})
+        previous = seen.get(email)
+        seen_at = _now()
+        seen[email] = seen_at
+        self._dirty_present[(class_id, email)] = seen_at
+        return previous is None or previous < self.window_start(class_id)
+
+    def mark_absent(self, class_id: str, email: str) -> bool:
+        """Returns True if the email was present before."""
+        removed = self.present.get(class_id, {}).pop(email, None) is not None
+        self._dirty_present[(class_id, email)] = None
+        return removed
+
+    def window_start(self, class_id: str, since: Optional[int] = None) -> int:
+        """
+        Earliest last-seen time that still counts as present for a class.
+
+        The window opens when check-in was last enabled and never reaches further
+        back than PRESENCE_TTL_SECONDS; an explicit `since` can only narrow it.
+        """
+        start = max(self.started_at.get(class_id, 0), _now() - PRESENCE_TTL_SECONDS)
+        if since is not None:
+            start = max(start, since)
+        return start
+
+    def present_since(self, class_id: str, window_start: int) -> List[str]:
+        seen = self.present.get(class_id)
+        if not seen:
+            return []
+        return [email for email, seen_at in seen.items() if seen_at >= window_start]
+
+    def expire(self, cutoff: int) -> List[Tuple[str, str]]:
+        """
+        Drop presence last seen before `cutoff` from memory.
+
+        SQLite is cleaned up separately by `sweep_expired_presence`, so the
+        evictions are not queued as writes.
+        """
+        evicted = []
+        for class_id in list(self.present):
+            seen = self.present[class_id]
+            for email in [e for e, seen_at in seen.items() if seen_at < cutoff]:
+                del seen[email]
+                evicted.append((class_id, email))
+            if not seen:
+                del self.present[class_id]
+        return evicted
+
+    @property
+    def pending_writes(self) -> int:
+        return len(self._dirty_classes) + len(self._dirty_present)
+
+    async def flush(self, db) -> int:
+        """Persist pending writes in one transaction; returns how many were written."""
+        if not self.pending_writes:
+            return 0
+        dirty_classes, self._dirty_classes = self._dirty_classes, set()
+        dirty_present, self._dirty_present = self._dirty_present, {}
+
+        flags = [
+            (class_id, int(self.enabled.get(class_id, False)), self.started_at.get(class_id, 0))
+            for class_id in dirty_classes
+        ]
+        upserts = [(c, e, ts) for (c, e), ts in dirty_present.items() if ts is not None]
+        deletes = [(c, e) for (c, e), ts in dirty_present.items() if ts is None]
+        try:
+            if flags:
+                await db.executemany(
+                    """
+                    INSERT INTO bt_checkin (class_id, enabled, started_at)
+                    VALUES (?, ?, ?)
+                    ON CONFLICT(class_id) DO UPDATE SET
+                        enabled=excluded.enabled, started_at=excluded.started_at
+                    """,
+                    flags,
+                )
+            if upserts:
+                await db.executemany(
+                    """
+                    INSERT INTO bt_checkin_present (class_id, email, updated_at)
+                    VALUES (?, ?, ?)
+                    ON CONFLICT(class_id, email) DO UPDATE SET updated_at=excluded.updated_at
+                    """,
+                    upserts,
+                )
+            if deletes:
+                await db.executemany(
+                    "DELETE FROM bt_checkin_present WHERE class_id = ? AND email = ?",
+                    deletes,
+                )
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            # Requeue anything not superseded by a newer write in the meantime
+            self._dirty_classes |= dirty_classes
+            for key, value in dirty_present.items():
+                self._dirty_present.setdefault(key, value)
+            raise
+        return len(flags) + len(upserts) + len(deletes)
+
+
+state = PresenceState()
+
+
+class _Subscriber:
+    __slots__ = ("queue",)
+
+    def __init__(self, maxsize: int):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize)
+
+
+class PresenceHub:
+    """
+    Per-class fan-out of presence deltas to stream subscribers.
+
+    `publish` never blocks: a subscriber whose queue is full has its backlog
+    dropped and replaced by a single "resync" marker, after which its stream
+    sends a fresh snapshot instead of the deltas it missed.
+    """
+
+    def __init__(self, queue_size: int):
+        self._queue_size = queue_size
+        self._subscribers: Dict[str, Set[_Subscriber]] = {}
+
+    def subscribe(self, class_id: str) -> _Subscriber:
+        subscriber = _Subscriber(self._queue_size)
+        self._subscribers.setdefault(class_id, set()).add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, class_id: str, subscriber: _Subscriber) -> None:
+        subscribers = self._subscribers.get(class_id)
+        if subscribers is None:
+            return
+        subscribers.discard(subscriber)
+        if not subscribers:
+            del self._subscribers[class_id]
+
+    def publish(self, class_id: str, event: Dict) -> None:
+        for subscriber in self._subscribers.get(class_id, ()):
+            try:
+                subscriber.queue.put_nowait(event)
+            except asyncio.QueueFull:
+                while not subscriber.queue.empty():
+                    subscriber.queue.get_nowait()
+                subscriber.queue.put_nowait({"type": "resync"})
+
+    def close(self) -> None:
+        """Ask every open stream to finish, e.g. on shutdown."""
+        for subscribers in self._subscribers.values():
+            for subscriber in subscribers:
+                while not subscriber.queue.empty():
+                    subscriber.queue.get_nowait()
+                subscriber.queue.put_nowait({"type": "close"})
+
+
+hub = PresenceHub(STREAM_QUEUE_SIZE)
+
+
 async def get_db():
     if not hasattr(app.state, "db"):
         # Ensure parent directory exists
@@ -32,10 +275,18 @@ async def get_db():
             """
             CREATE TABLE IF NOT EXISTS bt_checkin (
                 class_id TEXT PRIMARY KEY,
-                enabled INTEGER NOT NULL
+                enabled INTEGER NOT NULL,
+                started_at INTEGER NOT NULL DEFAULT 0
             )
             """
         )
+        # Databases created before session windows existed lack started_at
+        cur = await app.state.db.execute("PRAGMA table_info(bt_checkin)")
+        columns = {row[1] for row in await cur.fetchall()}
+        if "started_at" not in columns:
+            await app.state.db.execute(
+                "ALTER TABLE bt_checkin ADD COLUMN started_at INTEGER NOT NULL DEFAULT 0"
+            )
         await app.state.db.execute(
             """
             CREATE TABLE IF NOT EXISTS bt_checkin_present (
@@ -46,10 +297,65 @@ async def get_db():
             )
             """
         )
+        # Sweeper scans by age; the startup load filters on it too
+        await app.state.db.execute(
+            "CREATE INDEX IF NOT EXISTS idx_bt_present_updated_at "
+            "ON bt_checkin_present (updated_at)"
+        )
+        await app.state.db.execute(
+            "CREATE INDEX IF NOT EXISTS idx_bt_present_class_updated_at "
+            "ON bt_checkin_present (class_id, updated_at)"
+        )
         await app.state.db.commit()
     return app.state.db
 
 
+async def sweep_expired_presence(db) -> int:
+    """Delete presence rows older than the TTL in bounded batches."""
+    cutoff = _now() - PRESENCE_TTL_SECONDS
+    removed = 0
+    while True:
+        cur = await db.execute(
+            """
+            DELETE FROM bt_checkin_present
+            WHERE rowid IN (
+                SELECT rowid FROM bt_checkin_present
+                WHERE updated_at < ?
+                LIMIT ?
+            )
+            """,
+            (cutoff, SWEEP_BATCH_SIZE),
+        )
+        await db.commit()
+        removed += cur.rowcount
+        if cur.rowcount < SWEEP_BATCH_SIZE:
+            return removed
+        # Yield between batches so request handlers are not starved
+        await asyncio.sleep(0)
+
+
+async def _sweeper_loop():
+    while True:
+        await asyncio.sleep(SWEEP_INTERVAL_SECONDS)
+        try:
+            for class_id, email in state.expire(_now() - PRESENCE_TTL_SECONDS):
+                hub.publish(class_id, {"type": "absent", "email": email, "reason": "expired"})
+            removed = await sweep_expired_presence(await get_db())
+            if removed:
+                logger.info("Evicted %d expired presence rows", removed)
+        except Exception:
+            logger.exception("Presence sweep failed")
+
+
+async def _flusher_loop():
+    while True:
+        await asyncio.sleep(FLUSH_INTERVAL_SECONDS)
+        try:
+            await state.flush(await get_db())
+        except Exception:
+            logger.exception("Write-behind flush failed; will retry")
+
+
 async def require_api_key(x_api_key: str = Header(None)):
     if API_KEY and API_KEY != "change-me":
         if x_api_key is None or x_api_key != API_KEY:
@@ -60,13 +366,24 @@ async def require_api_key(x_api_key: str = Header(None)):
 
 @app.on_event("startup")
 async def startup():
-    await get_db()
+    db = await get_db()
+    await sweep_expired_presence(db)
+    await state.load(db)
+    app.state.sweeper = asyncio.create_task(_sweeper_loop())
+    app.state.flusher = asyncio.create_task(_flusher_loop())
 
 
 @app.on_event("shutdown")
 async def shutdown():
+    hub.close()
+    for task_name in ("sweeper", "flusher"):
+        if hasattr(app.state, task_name):
+            getattr(app.state, task_name).cancel()
     if hasattr(app.state, "db"):
+        # Persist whatever the flusher had not written yet
+        await state.flush(app.state.db)
         await app.state.db.close()
+        del app.state.db
 
 
 @app.put("/bt-checkin/{class_id}")
@@ -74,18 +391,14 @@ async def set_bt_checkin(
     class_id: str,
     payload: Dict,
     _=Depends(require_api_key),
-    db=Depends(get_db),
 ):
     enabled = bool(payload.get("enabled", False))
-    await db.execute(
-        """
-        INSERT INTO bt_checkin (class_id, enabled)
-        VALUES (?, ?)
-        ON CONFLICT(class_id) DO UPDATE SET enabled=excluded.enabled
-        """,
-        (class_id, int(enabled)),
-    )
-    await db.commit()
+    opened = state.set_enabled(class_id, enabled)
+    hub.publish(class_id, {"type": "enabled", "enabled": enabled})
+    if opened:
+        # Presence from the previous window no longer counts; deltas cannot
+        # say that, so subscribers get a fresh snapshot of the new window
+        hub.publish(class_id, {"type": "resync"})
     return {"class_id": class_id, "enabled": enabled}
 
 
@@ -93,13 +406,8 @@ async def set_bt_checkin(
 async def get_bt_checkin(
     class_id: str,
     _=Depends(require_api_key),
-    db=Depends(get_db),
 ):
-    cur = await db.execute(
-        "SELECT enabled FROM bt_checkin WHERE class_id = ?", (class_id,)
-    )
-    row = await cur.fetchone()
-    return {"class_id": class_id, "enabled": bool(row[0]) if row else False}
+    return {"class_id": class_id, "enabled": state.enabled.get(class_id, False)}
 
 
 @app.post("/bt-checkin/{class_id}/present")
@@ -107,42 +415,88 @@ async def set_bt_present(
     class_id: str,
     payload: Dict,
     _=Depends(require_api_key),
-    db=Depends(get_db),
 ):
     email = payload.get("email")
     present = bool(payload.get("present", True))
     if not email:
         raise HTTPException(status_code=400, detail="email is required")
 
+    # Repeated check-ins from the same device only refresh the timestamp;
+    # subscribers hear about actual changes to the present set.
     if present:
-        await db.execute(
-            """
-            INSERT INTO bt_checkin_present (class_id, email, updated_at)
-            VALUES (?, ?, strftime('%s','now'))
-            ON CONFLICT(class_id, email) DO UPDATE SET updated_at=strftime('%s','now')
-            """,
-            (class_id, email),
-        )
+        if state.mark_present(class_id, email):
+            hub.publish(class_id, {"type": "present", "email": email})
     else:
-        await db.execute(
-            "DELETE FROM bt_checkin_present WHERE class_id = ? AND email = ?",
-            (class_id, email),
-        )
-    await db.commit()
+        if state.mark_absent(class_id, email):
+            hub.publish(class_id, {"type": "absent", "email": email})
     return {"class_id": class_id, "email": email, "present": present}
 
 
 @app.get("/bt-checkin/{class_id}/present")
 async def get_bt_present(
     class_id: str,
+    since: Optional[int] = Query(None, description="Only devices seen at or after this epoch second"),
     _=Depends(require_api_key),
-    db=Depends(get_db),
 ):
-    cur = await db.execute(
-        "SELECT email FROM bt_checkin_present WHERE class_id = ?", (class_id,)
-    )
-    rows = await cur.fetchall()
-    emails = [r[0] for r in rows] if rows else []
-    return {"class_id": class_id, "present": emails}
+    window_start = state.window_start(class_id, since)
+    emails = state.present_since(class_id, window_start)
+    return {"class_id": class_id, "present": emails, "since": window_start}
+
 
+def _sse(event: str, data: Dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
 
+
+def _snapshot(class_id: str) -> str:
+    window_start = state.window_start(class_id)
+    return _sse("snapshot", {
+        "class_id": class_id,
+        "enabled": state.enabled.get(class_id, False),
+        "present": state.present_since(class_id, window_start),
+        "since": window_start,
+    })
+
+
+@app.get("/bt-checkin/{class_id}/present/stream")
+async def stream_bt_present(
+    class_id: str,
+    request: Request,
+    _=Depends(require_api_key),
+):
+    """
+    Server-sent events for a class: one `snapshot` event with the current
+    present set, then `present` / `absent` / `enabled` deltas as they happen.
+    A client that falls behind receives a new `snapshot` instead of the
+    deltas it missed, and so does every client when enabling check-in opens
+    a new session window.
+    """
+    subscriber = hub.subscribe(class_id)
+
+    async def events():
+        try:
+            yield _snapshot(class_id)
+            while True:
+                try:
+                    event = await asyncio.wait_for(
+                        subscriber.queue.get(), timeout=STREAM_HEARTBEAT_SECONDS
+                    )
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        return
+                    yield ": keep-alive\n\n"
+                    continue
+                kind = event["type"]
+                if kind == "close":
+                    return
+                if kind == "resync":
+                    yield _snapshot(class_id)
+                    continue
+                yield _sse(kind, {k: v for k, v in event.items() if k != "type"})
+        finally:
+            hub.unsubscribe(class_id, subscriber)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -300,16 +300,30 @@ class HttpDataService extends ChangeNotifier implements IDataService {
         try {
           debugPrint(
               'Fetching attendance for class ${classModel.name} (${classModel.docId})...');
-          final historyResponse = await http.get(
-            Uri.parse(
-                '$baseUrl/attendance/sessions?classId=${classModel.docId}'),
-            headers: _buildHeaders(),
-          );
+          // Sessions come newest first, a page at a time; follow
+          // X-Next-Cursor until the backend stops sending it
+          String? cursor;
+          do {
+            final historyResponse = await http.get(
+              Uri.parse('$baseUrl/attendance/sessions').replace(
+                queryParameters: {
+                  'classId': classModel.docId!,
+                  'limit': '200',
+                  if (cursor != null) 'cursor': cursor,
+                },
+              ),
+              headers: _buildHeaders(),
+            );
 
-          debugPrint(
-              'Attendance response for ${classModel.name}: ${historyResponse.statusCode}');
+            debugPrint(
+                'Attendance response for ${classModel.name}: ${historyResponse.statusCode}');
+
+            if (historyResponse.statusCode != 200) {
+              debugPrint(
+                  'Failed to load attendance for ${classModel.name}: ${historyResponse.statusCode} - ${historyResponse.body}');
+              break;
+            }
 
-          if (historyResponse.statusCode == 200) {
             final List<dynamic> sessionsJson = jsonDecode(historyResponse.body);
 
             for (var session in sessionsJson) {
@@ -330,10 +344,9 @@ class HttpDataService extends ChangeNotifier implements IDataService {
                 processedImagePath: session['processedImageUrl'],
               ));
             }
-          } else {
-            debugPrint(
-                'Failed to load attendance for ${classModel.name}: ${historyResponse.statusCode} - ${historyResponse.body}');
-          }
+
+            cursor = historyResponse.headers['x-next-cursor'];
+          } while (cursor != null);
         } catch (e) {
           debugPrint('Error loading history for ${classModel.name}: $e');
           // Continue loading other classes